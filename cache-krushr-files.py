@@ -3,7 +3,6 @@
 Cache important Krushr project files for faster Claude Code operations
 """
 
-import os
 import sys
 from pathlib import Path
 
@@ -17,128 +16,34 @@ except ImportError:
     print("❌ Error: Could not import claude_cache. Make sure dependencies are installed.")
     sys.exit(1)
 
-# Important directories and file patterns to cache
-CACHE_TARGETS = [
-    # API files
-    "api/src/**/*.ts",
-    "api/prisma/schema.prisma",
-    "api/package.json",
-    "api/tsconfig.json",
-    "api/vitest.config.ts",
-    
-    # Frontend files
-    "frontend/src/**/*.tsx",
-    "frontend/src/**/*.ts",
-    "frontend/src/**/*.css",
-    "frontend/public/*.html",
-    "frontend/public/*.css",
-    "frontend/public/*.js",
-    "frontend/package.json",
-    "frontend/tailwind.config.js",
-    "frontend/tsconfig.json",
-    "frontend/eslint.config.js",
-    "frontend/vitest.config.ts",
-    
-    # Shared files
-    "shared/**/*.ts",
-    "shared/package.json",
-    
-    # Configuration and docs
-    "CLAUDE.md",
-    "GEMINI-INTEGRATION.md",
-    "README.md",
-    "README-SHORTCUTS.md",
-    "docker-compose.yml",
-    "package.json",
-    ".claude/commands/*.md",
-    ".claude/guides/*.md",
-    ".claude/patterns/*.md",
-    ".claude/preferences/*.md",
-    
-    # Build and scripts
-    "frontend/scripts/*.mjs",
-    "scripts/*.js",
-    "scripts/*.sh",
-    "backup-system.js",
-    
-    # Test files
-    "frontend/test-*.js",
-    "frontend/test-*.cjs",
-    "api/test-*.js",
-    "api/scripts/*.js",
-    
-    # Launch scripts
-    "launch-krushr.sh",
-    "claude-yolo",
-    "claude-auto",
-    "claude-auto-wrapper.sh",
-    "install-auto-approval.sh",
-    "start-claude-automation.sh",
-    "stop-claude-automation.sh",
-    
-    # Key dependencies (selective - not entire node_modules)
-    "api/node_modules/@prisma/client/index.d.ts",
-    "api/node_modules/@trpc/server/dist/index.d.ts",
-    "frontend/node_modules/@types/react/index.d.ts",
-    "frontend/node_modules/tailwindcss/types/index.d.ts",
-]
+# Target groups live in warm-profiles.json next to this script
+PROFILES_FILE = Path(__file__).parent / "warm-profiles.json"
+PROFILE = "krushr"
 
-def cache_files():
+def cache_files(profile: str = PROFILE):
     """Cache all important project files"""
-    base_dir = Path(__file__).parent
     cache = ClaudeCache()
     
-    print("🚀 Caching Krushr project files...")
+    print(f"🚀 Caching Krushr project files (profile: {profile})...")
     
-    # Track statistics
-    total_files = 0
-    cached_files = 0
-    errors = 0
-    
-    # Cache each target pattern
-    for pattern in CACHE_TARGETS:
-        print(f"\n📁 Processing: {pattern}")
-        
-        # Use glob to find matching files
-        if "**" in pattern:
-            # Recursive pattern
-            parts = pattern.split("**")
-            base_pattern = Path(parts[0])
-            file_pattern = parts[1].lstrip("/")
-            
-            search_dir = base_dir / base_pattern
-            if search_dir.exists():
-                for file_path in search_dir.rglob(file_pattern):
-                    if file_path.is_file():
-                        total_files += 1
-                        # Cache the file
-                        try:
-                            content = cache.get_file(str(file_path))
-                            if content:
-                                cached_files += 1
-                                print(f"  ✅ Cached: {file_path.relative_to(base_dir)}")
-                        except Exception as e:
-                            errors += 1
-                            print(f"  ❌ Error caching {file_path.relative_to(base_dir)}: {e}")
-        else:
-            # Direct file pattern
-            file_path = base_dir / pattern
-            if file_path.exists() and file_path.is_file():
-                total_files += 1
-                try:
-                    content = cache.get_file(str(file_path))
-                    if content:
-                        cached_files += 1
-                        print(f"  ✅ Cached: {pattern}")
-                except Exception as e:
-                    errors += 1
-                    print(f"  ❌ Error caching {pattern}: {e}")
+    try:
+        result = cache.warm_profile(profile, profiles_file=str(PROFILES_FILE))
+    except (OSError, ValueError) as e:
+        print(f"❌ Error loading warm profile: {e}")
+        sys.exit(1)
     
     # Show results
+    print("\n📁 Target Groups:")
+    for name, group in sorted(result['groups'].items(), key=lambda item: -item[1]['priority']):
+        print(f"  {name:<18} priority {group['priority']:>2}  "
+              f"{group['files']:>5} files  {group['bytes'] / 1024:>9.1f} KB")
+    
     print(f"\n📊 Caching Summary:")
-    print(f"  Total files processed: {total_files}")
-    print(f"  Successfully cached: {cached_files}")
-    print(f"  Errors: {errors}")
+    print(f"  Total files processed: {result['files_processed']}")
+    print(f"  Successfully cached: {result['files_cached']}")
+    print(f"  Unchanged since last warm: {result.get('files_unchanged', 0)}")
+    print(f"  Errors: {result['errors']}")
+    print(f"  Time: {result['total_time']:.3f}s")
     
     # Show cache stats
     stats = cache.get_stats()
@@ -158,4 +63,4 @@ def cache_files():
     print(f"  Status: {'⚠️ Over limit!' if mem_stats.is_over_limit else '✅ Within limits'}")
 
 if __name__ == "__main__":
-    cache_files()
\ No newline at end of file
+    cache_files(sys.argv[1] if len(sys.argv) > 1 else PROFILE)
\ No newline at end of file
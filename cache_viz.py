@@ -89,7 +89,7 @@ class CacheVisualizer:
     def __init__(self):
         self.cache_dir = Path.home() / ".claude" / "cache"
         self.daemon_script = self.cache_dir / "claude_cache_daemon.py"
-        self.db_path = self.cache_dir / "files" / "async_index.db"
+        self.db_path = self.cache_dir / "files" / "index.db"
         
     def get_terminal_size(self) -> tuple:
         """Get terminal width and height"""
@@ -142,7 +142,7 @@ class CacheVisualizer:
             
             try:
                 # Total stats
-                cursor = conn.execute("SELECT COUNT(*) as count, SUM(size) as total_size FROM async_cache")
+                cursor = conn.execute("SELECT COUNT(*) as count, SUM(size) as total_size FROM cache_entries")
                 row = cursor.fetchone()
                 total_files = row['count'] if row else 0
                 total_size = row['total_size'] if row and row['total_size'] else 0
@@ -150,7 +150,7 @@ class CacheVisualizer:
                 # Largest files
                 cursor = conn.execute("""
                     SELECT path, size 
-                    FROM async_cache 
+                    FROM cache_entries 
                     ORDER BY size DESC 
                     LIMIT 5
                 """)
@@ -431,7 +431,7 @@ class CacheVisualizer:
                         END as size_range,
                         COUNT(*) as count,
                         SUM(size) as total_size
-                    FROM async_cache 
+                    FROM cache_entries 
                     GROUP BY size_range
                     ORDER BY total_size DESC
                 """)
@@ -447,7 +447,7 @@ class CacheVisualizer:
                 # Top files by size
                 cursor = conn.execute("""
                     SELECT path, size, cached_time
-                    FROM async_cache 
+                    FROM cache_entries 
                     ORDER BY size DESC 
                     LIMIT ?
                 """, (limit,))
@@ -5,6 +5,8 @@ Enhanced with security fixes and better error handling
 """
 
 import os
+import io
+import stat
 import json
 import hashlib
 import gzip
@@ -14,17 +16,33 @@ import logging
 import glob
 import psutil
 import gc
+import itertools
+import math
+import re
+import uuid
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple, Any
+from typing import Optional, Dict, List, Tuple, Any, Iterator, Callable, BinaryIO
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from contextlib import contextmanager
+import threading
 from threading import Lock
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+import multiprocessing
 import queue
 import mimetypes
-import mmap
 from cachetools import LRUCache
+from claude_cache_eviction import EvictionEngine
+from claude_cache_policy import PolicyEngine, PathPolicy
+from claude_cache_filter import PathFilter, NegativeCache
+from claude_cache_walker import TreeWalker, WalkEntry
+from claude_cache_git import GitIndexSource, GitIndexError
+from claude_cache_profiles import WarmProfile, load_profiles
+from claude_cache_throttle import BackgroundThrottle, lower_priority
+from claude_cache_pagecache import HAVE_FADVISE, advise, will_need, read_for_warm
+from claude_cache_ingest import ingest_raw
+from claude_cache_store import CacheStore, blob_path, init_schema, raw_metadata, write_blob
+from claude_cache_pipeline import WarmPipeline, PipelineStage
 
 # Setup logging
 logging.basicConfig(
@@ -70,6 +88,137 @@ class MemoryStats:
     gc_collections: int
     is_over_limit: bool
 
+def _compress_blob(content: bytes, original_path: str = "") -> Tuple[bytes, bool, Dict]:
+    """Gzip content for storage if it saves more than 10%"""
+    original_size = len(content)
+    metadata = {
+        'original_size': original_size,
+        'compressed_size': original_size,
+        'compression_ratio': 1.0,
+        'space_saved': 0
+    }
+    
+    # Quick check - only compress if likely beneficial
+    if original_size > 1024:
+        try:
+            compressed_content = gzip.compress(content)
+            if len(compressed_content) < original_size * 0.9:  # >10% savings
+                metadata.update({
+                    'compressed_size': len(compressed_content),
+                    'compression_ratio': original_size / len(compressed_content),
+                    'space_saved': original_size - len(compressed_content)
+                })
+                return compressed_content, True, metadata
+        except Exception as e:
+            logger.warning(f"Compression failed for {original_path}: {e}")
+    
+    return content, False, metadata
+
+def _warm_shard(content_dir: str, compression_enabled: bool,
+                shard: List[Tuple[str, int, float, str]], drop_cold: bool = True,
+                zero_copy: bool = True) -> Tuple[List[Tuple], int]:
+    """Process-pool worker: read, hash, compress and store a shard of files.
+    
+    Runs in a child process so hashing, compression and the Python glue
+    around them are not serialized on the parent's GIL. Blobs are written
+    directly; only compact index records travel back to the parent.
+    """
+    records = []
+    errors = 0
+    for path, size, mtime, codec in shard:
+        try:
+            if zero_copy and (codec == 'none' or not compression_enabled):
+                # Raw blobs are copied in the kernel and hashed from an mmap
+                ingested = ingest_raw(path, content_dir, lambda checksum: blob_path(content_dir, checksum, compressed=False),
+                                      drop_cold=drop_cold)
+                now = time.time()
+                records.append((
+                    path, ingested.checksum, size, mtime, now, False, 1, now,
+                    ingested.content_path, json.dumps(raw_metadata(ingested.size)), ingested.size
+                ))
+                continue
+            
+            content = read_for_warm(path, size, drop_cold=drop_cold)
+            checksum = hashlib.sha256(content).hexdigest()
+            
+            is_compressed = False
+            metadata = {
+                'original_size': len(content),
+                'compressed_size': len(content),
+                'compression_ratio': 1.0,
+                'space_saved': 0
+            }
+            if compression_enabled and codec != 'none' and len(content) > 1024:
+                content, is_compressed, metadata = _compress_blob(content, path)
+            
+            content_path = blob_path(content_dir, checksum, is_compressed)
+            write_blob(content_path, content)
+            
+            now = time.time()
+            records.append((
+                path, checksum, size, mtime, now, is_compressed, 1, now,
+                content_path, json.dumps(metadata), len(content)
+            ))
+        except Exception as e:
+            logger.error(f"Error warming {path}: {e}")
+            errors += 1
+    return records, errors
+
+def iter_chunks(stream: BinaryIO, chunk_size: int = 256 * 1024, start_line: Optional[int] = None,
+                end_line: Optional[int] = None, max_bytes: Optional[int] = None) -> Iterator[bytes]:
+    """Read stream in chunks, stopping at end_line or max_bytes; closes the stream"""
+    with stream:
+        remaining = max_bytes
+        if start_line is None and end_line is None:
+            while remaining is None or remaining > 0:
+                chunk = stream.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+            return
+        
+        # Line mode: lines before start_line are read but not returned, and
+        # nothing after end_line is read at all
+        start_line = start_line or 1
+        line_number = 1
+        pending, pending_size = [], 0
+        while end_line is None or line_number <= end_line:
+            piece = stream.readline(chunk_size)
+            if not piece:
+                break
+            if line_number >= start_line:
+                if remaining is not None:
+                    piece = piece[:remaining]
+                    remaining -= len(piece)
+                pending.append(piece)
+                pending_size += len(piece)
+                if pending_size >= chunk_size:
+                    yield b''.join(pending)
+                    pending, pending_size = [], 0
+                if remaining == 0:
+                    break
+            if piece.endswith(b'\n'):
+                line_number += 1
+        if pending:
+            yield b''.join(pending)
+
+@dataclass
+class WarmItem:
+    """A file moving through the warm pipeline"""
+    path: str
+    size: int
+    mtime: float
+    priority: int = 1
+    content: bytes = b''
+    checksum: str = ''
+    compressed: bool = False
+    metadata: Optional[Dict[str, Any]] = None
+    record: Optional[Tuple] = None
+    ingested: bool = False  # stored raw by the zero-copy path; content stays empty
+    content_path: str = ''
+
 class ClaudeCache:
     """Intelligent caching system for Claude Code with security enhancements"""
     
@@ -78,7 +227,9 @@ class ClaudeCache:
         self.cache_dir = Path(cache_dir or os.path.expanduser("~/.claude/cache"))
         self.config_file = self.cache_dir / "config" / "cache.json"
         self.policies_file = self.cache_dir / "config" / "policies.json"
-        self.db_file = self.cache_dir / "files" / "index.db"
+        # Index and blob store shared with the asyncio front-end
+        self.store = CacheStore(self.cache_dir)
+        self.db_file = self.store.db_file
         
         # Security: Define allowed directories
         self.allowed_dirs = allowed_dirs or [
@@ -87,14 +238,26 @@ class ClaudeCache:
             # Add more as needed
         ]
         
-        # Thread safety
+        # Thread safety: writes share one lock, reads use per-thread WAL connections
         self._db_lock = Lock()
+        self._read_local = threading.local()
+        # Hits are recorded in batches instead of one UPDATE per read
+        self._access_lock = Lock()
+        self._pending_access: Dict[str, Tuple[int, float]] = {}
+        self._last_access_flush = time.time()
         self._stats_lock = Lock()
+        self._read_outcome = threading.local()  # per-thread hit flag for get_file_with_status
         
         # Background compression worker
         self._compression_queue = queue.Queue()
         self._compression_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="compression")
         
+        # Background prefetch of policy-hinted siblings (and caching behind streamed misses)
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch",
+                                                     initializer=lambda: self._throttle.enter_background())
+        self._prefetched = LRUCache(maxsize=1024)
+        self._prefetched_lock = Lock()
+        
         # Connection pool (simple implementation)
         self._db_connection = None
         
@@ -102,6 +265,13 @@ class ClaudeCache:
         self.config = self._load_config()
         self.policies = self._load_policies()
         
+        # Precompiled allow-list, size limit and include/exclude globs
+        self._path_filter = PathFilter(self.allowed_dirs, self.config.get("fileCache", {}), self._parse_size)
+        
+        # Missing, denied and non-cacheable paths agents keep probing for
+        negative_items = self.config.get("negativeCache", {}).get("maxItems", 4096)
+        self._negative_cache = NegativeCache(max_entries=negative_items)
+        
         # Initialize database
         self._init_database()
         
@@ -110,7 +280,8 @@ class ClaudeCache:
             'hits': 0,
             'misses': 0,
             'operations': 0,
-            'errors': 0
+            'errors': 0,
+            'negative_hits': 0
         }
         
         # Memory monitoring
@@ -120,27 +291,47 @@ class ClaudeCache:
         max_items = self.config.get("memoryCache", {}).get("maxItems", 500)
         self._memory_cache = LRUCache(maxsize=max_items)  # O(1) lookups with automatic eviction
         self._memory_cache_lock = Lock()  # Thread safety for LRU cache
+        # Shared counter bumped on invalidation when several processes serve one store
+        self._memory_generation = None
+        self._seen_generation = 0
         
         self._last_gc_time = time.time()
         self._gc_threshold = 60  # Run garbage collection every 60 seconds
         
+        # Compiled policies.json rules, evaluated once per path
+        self.policy_engine = PolicyEngine(self.policies, self._parse_duration)
+        
+        # Paces warms and maintenance, backing off when interactive reads slow down
+        self._throttle = BackgroundThrottle.from_config(self.config.get("throttle", {}), self._parse_size)
+        
+        # posix_fadvise hints: readahead for prefetches, no page-cache pollution from bulk warms
+        page_cache = self.config.get("pageCache", {})
+        self._advise_prefetch = page_cache.get("willNeed", True)
+        self._drop_after_warm = page_cache.get("dropAfterWarm", True)
+        self._sequential_threshold = self._parse_size(page_cache.get("sequentialThreshold", "1MB"))
+        
+        # Zero-copy ingest of uncompressed blobs during warms (see _stores_raw)
+        file_cache = self.config.get("fileCache", {})
+        self._ingest_mode = file_cache.get("ingestMode", "auto")
+        self._raw_min_size = self._parse_size(file_cache.get("rawMinSize", "64KB"))
+        
+        # Background disk budget and TTL enforcement
+        self._eviction = EvictionEngine(self)
+        self._eviction.start()
+        
         logger.info(f"Cache initialized at {self.cache_dir} (Memory limit: {self.memory_limit_mb:.0f}MB)")
     
     def _validate_path(self, file_path: str) -> bool:
         """Validate that path is within allowed directories"""
         try:
-            resolved_path = Path(file_path).resolve()
+            # Allowed roots are pre-resolved and directory verdicts memoized
+            if self._path_filter.is_allowed(file_path):
+                return True
             
-            # Check if path is within allowed directories
-            for allowed_dir in self.allowed_dirs:
-                allowed_path = Path(allowed_dir).resolve()
-                try:
-                    resolved_path.relative_to(allowed_path)
-                    return True
-                except ValueError:
-                    continue
-                    
-            logger.warning(f"Path validation failed for {file_path}: not in allowed directories")
+            # Only warn the first time a denied path is probed
+            if self._negative_cache.get(file_path) != NegativeCache.DENIED:
+                logger.warning(f"Path validation failed for {file_path}: not in allowed directories")
+                self._negative_cache.add(file_path, NegativeCache.DENIED)
             return False
             
         except Exception as e:
@@ -166,23 +357,78 @@ class ClaudeCache:
             if conn:
                 conn.close()
     
-    def _batch_insert_cache_entries(self, entries: List[Tuple]) -> None:
+    @contextmanager
+    def _get_read_connection(self):
+        """This thread's read-only index connection.
+        
+        WAL lets readers run alongside each other and alongside the writer,
+        so lookups take neither _db_lock nor a fresh connection per query.
+        """
+        conn = getattr(self._read_local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_file), timeout=30.0, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA query_only = ON')
+            self._read_local.conn = conn
+        yield conn
+    
+    def _lookup_entry(self, file_path: str) -> Optional[sqlite3.Row]:
+        """file_path's index row, read without the write lock"""
+        with self._get_read_connection() as conn:
+            return conn.execute('''
+                SELECT checksum, content_path, compressed, access_count, size, modified_time
+                FROM cache_entries 
+                WHERE path = ?
+            ''', (file_path,)).fetchone()
+    
+    # Pending hit counts are written out at this size or age, whichever comes first
+    ACCESS_FLUSH_SIZE = 256
+    ACCESS_FLUSH_INTERVAL = 1.0
+    
+    def _record_access(self, file_path: str) -> int:
+        """Count a hit for eviction; written to the index in batches.
+        
+        Returns the hits for file_path not yet in the index, this one included.
+        """
+        now = time.time()
+        with self._access_lock:
+            count, _ = self._pending_access.get(file_path, (0, now))
+            self._pending_access[file_path] = (count + 1, now)
+            due = (len(self._pending_access) >= self.ACCESS_FLUSH_SIZE
+                   or now - self._last_access_flush >= self.ACCESS_FLUSH_INTERVAL)
+        if due:
+            self.flush_access()
+        return count + 1
+    
+    def flush_access(self):
+        """Write pending hit counts to the index"""
+        with self._access_lock:
+            pending, self._pending_access = self._pending_access, {}
+            self._last_access_flush = time.time()
+        if not pending:
+            return
+        try:
+            with self._get_db_connection() as conn:
+                conn.executemany(
+                    'UPDATE cache_entries SET access_count = access_count + ?, last_accessed = MAX(last_accessed, ?), '
+                    'gdsf_h = NULL WHERE path = ?',
+                    [(count, last, path) for path, (count, last) in pending.items()]
+                )
+        except Exception as e:
+            logger.error(f"Error recording cache accesses: {e}")
+    
+    def _batch_insert_cache_entries(self, entries: List[Tuple]) -> int:
         """Batch insert cache entries for significant performance improvement"""
         if not entries:
-            return
+            return 0
             
         try:
             with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                # Use executemany for bulk operations - much faster than individual inserts
-                cursor.executemany('''
-                    INSERT OR REPLACE INTO cache_entries 
-                    (path, checksum, size, modified_time, cached_time, compressed, 
-                     access_count, last_accessed, content_path, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', entries)
+                # Rows whose blob was unlinked meanwhile are dropped, not committed
+                inserted = self.store.commit_entries(conn, entries)
                 
-            logger.debug(f"Batch inserted {len(entries)} cache entries")
+            logger.debug(f"Batch inserted {inserted} cache entries")
+            return inserted
             
         except Exception as e:
             logger.error(f"Error in batch insert: {e}")
@@ -195,83 +441,117 @@ class ClaudeCache:
                 return None
                 
             file_stat = os.stat(file_path)
-            
-            # Memory-mapped file reading for large files (>1MB) - significant I/O optimization
-            if file_stat.st_size > 1024 * 1024:  # 1MB threshold
-                with open(file_path, 'rb') as f:
-                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mmapped_file:
-                        content = mmapped_file.read()
-            else:
-                # Regular read for smaller files
-                with open(file_path, 'rb') as f:
-                    content = f.read()
-            
-            # Calculate checksum
-            checksum = hashlib.sha256(content).hexdigest()
-            
-            # Compression and metadata
-            original_size = len(content)
-            is_compressed = False
-            metadata = {
-                'original_size': original_size,
-                'compressed_size': original_size,
-                'compression_ratio': 1.0,
-                'space_saved': 0
-            }
-            
-            # Fast compression check for immediate storage (optimized for speed)
-            if self.config.get("fileCache", {}).get("compressionEnabled", True) and original_size > 1024:
-                # Use faster compression for batch operations
-                content, is_compressed, metadata = self._compress_content_async(content, file_path)
-            
-            # Store content file
-            content_path = self._get_content_path(file_path, checksum)
-            content_dir = os.path.dirname(content_path)
-            os.makedirs(content_dir, exist_ok=True)
-            
-            with open(content_path, 'wb') as f:
-                f.write(content)
+            item = self._warm_compress(self._warm_read(WarmItem(file_path, file_stat.st_size, file_stat.st_mtime)))
             
             # Add to memory cache
-            if not is_compressed:
-                self._add_to_memory_cache(file_path, content.decode('utf-8', errors='replace'))
+            if not item.compressed and not item.ingested:
+                self._add_to_memory_cache(file_path, item.content.decode('utf-8', errors='replace'), file_stat)
             
             # Return tuple for batch insert
-            return (
-                file_path, checksum, file_stat.st_size, file_stat.st_mtime,
-                time.time(), is_compressed, 1, time.time(), content_path,
-                json.dumps(metadata)
-            )
+            return self._warm_write(item).record
             
         except Exception as e:
             logger.error(f"Error preparing cache entry for {file_path}: {e}")
             return None
     
-    def _compress_content_async(self, content: bytes, original_path: str) -> Tuple[bytes, bool, Dict]:
-        """Compress content asynchronously in background"""
-        original_size = len(content)
-        metadata = {
+    def _warm_filter(self, entry: WalkEntry) -> Optional['WarmItem']:
+        """Pipeline stage: apply cache policy to a walked candidate"""
+        if not self._accept_warm_candidate(entry):
+            return None
+        return WarmItem(entry.path, entry.size, entry.mtime, priority=self._get_file_priority(entry.path))
+    
+    def _warm_read(self, item: 'WarmItem') -> 'WarmItem':
+        """Pipeline stage: read file content and checksum it"""
+        self._throttle.acquire(item.size)
+        
+        if self._stores_raw(item.path, item.size):
+            # Kernel-side copy straight into the blob store, hashed from an mmap
+            content_dir = str(self.store.content_dir)
+            ingested = ingest_raw(item.path, content_dir, lambda checksum: self.store.blob_path(checksum, compressed=False),
+                                  drop_cold=self._drop_after_warm)
+            item.checksum = ingested.checksum
+            item.content_path = ingested.content_path
+            item.size = ingested.size
+            item.ingested = True
+            return item
+        
+        # Memory-mapped sequential reads above 1MB; pages only the warm faulted in are dropped again
+        item.content = read_for_warm(item.path, item.size, self._sequential_threshold, self._drop_after_warm)
+        item.checksum = hashlib.sha256(item.content).hexdigest()
+        return item
+    
+    def _warm_compress(self, item: 'WarmItem') -> 'WarmItem':
+        """Pipeline stage: compress content when enabled and worthwhile"""
+        original_size = item.size if item.ingested else len(item.content)
+        item.metadata = {
             'original_size': original_size,
             'compressed_size': original_size,
             'compression_ratio': 1.0,
             'space_saved': 0
         }
         
-        # Quick check - only compress if likely beneficial
-        if original_size > 1024:
-            try:
-                compressed_content = gzip.compress(content)
-                if len(compressed_content) < original_size * 0.9:  # >10% savings
-                    metadata.update({
-                        'compressed_size': len(compressed_content),
-                        'compression_ratio': original_size / len(compressed_content),
-                        'space_saved': original_size - len(compressed_content)
-                    })
-                    return compressed_content, True, metadata
-            except Exception as e:
-                logger.warning(f"Compression failed for {original_path}: {e}")
+        # Fast compression check for immediate storage (optimized for speed)
+        if (not item.ingested and self.config.get("fileCache", {}).get("compressionEnabled", True) and original_size > 1024
+                and self._warm_codec(item.path, original_size) != 'none'):
+            # Use faster compression for batch operations
+            item.content, item.compressed, item.metadata = self._compress_content_async(item.content, item.path)
+        return item
+    
+    def _warm_write(self, item: 'WarmItem') -> 'WarmItem':
+        """Pipeline stage: store the blob atomically and build its index record"""
+        if item.ingested:
+            content_path, stored_size = item.content_path, item.size
+        else:
+            content_path = self._get_content_path(item.path, item.checksum, item.compressed)
+            write_blob(content_path, item.content)
+            stored_size = len(item.content)
         
-        return content, False, metadata
+        now = time.time()
+        item.record = (
+            item.path, item.checksum, item.size, item.mtime,
+            now, item.compressed, 1, now, content_path,
+            json.dumps(item.metadata), stored_size
+        )
+        # Content is on disk now; don't hold it while waiting for the commit
+        item.content = b''
+        return item
+    
+    def _warm_commit(self, items: List['WarmItem']) -> int:
+        """Pipeline sink: group-commit index records"""
+        return self._batch_insert_cache_entries([item.record for item in items])
+    
+    # Formats that are already compressed; gzip would only burn CPU on them
+    RAW_EXTENSIONS = ('.woff', '.woff2', '.ttf', '.otf', '.eot', '.png', '.jpg', '.jpeg', '.gif',
+                      '.webp', '.ico', '.avif', '.zip', '.gz', '.tgz', '.bz2', '.xz', '.zst',
+                      '.7z', '.jar', '.mp3', '.mp4', '.webm', '.pdf', '.wasm')
+    
+    def _stores_raw(self, file_path: str, size: int) -> bool:
+        """Whether a file is ingested uncompressed through the zero-copy path
+        
+        fileCache.ingestMode: "auto" (incompressible formats and codec
+        "none"), "raw" (everything) or "read" (never). Files smaller than
+        rawMinSize are always read; under "raw" they are still stored
+        uncompressed (see _warm_codec).
+        """
+        file_cache = self.config.get("fileCache", {})
+        if self._ingest_mode == "read" or size < self._raw_min_size:
+            return False
+        if self._ingest_mode == "raw" or not file_cache.get("compressionEnabled", True):
+            return True
+        if self.policy_for(file_path).codec == 'none':
+            return True
+        extensions = file_cache.get("rawExtensions", self.RAW_EXTENSIONS)
+        return os.path.splitext(file_path)[1].lower() in extensions
+    
+    def _warm_codec(self, file_path: str, size: int) -> str:
+        """Codec a warm stores file_path with; ingestMode "raw" never compresses"""
+        if self._ingest_mode == "raw" or self._stores_raw(file_path, size):
+            return 'none'
+        return self.policy_for(file_path).codec
+    
+    def _compress_content_async(self, content: bytes, original_path: str) -> Tuple[bytes, bool, Dict]:
+        """Compress content asynchronously in background"""
+        return _compress_blob(content, original_path)
     
     def _schedule_background_compression(self, file_path: str, content: bytes, callback) -> None:
         """Schedule compression task in background thread pool"""
@@ -318,6 +598,14 @@ class ClaudeCache:
                 "validatePaths": True,
                 "detectSensitiveData": False,  # Optional for personal use
                 "maxCacheAge": "30d"
+            },
+            "throttle": {
+                "enabled": True,
+                "bytesPerSecond": "128MB",
+                "filesPerSecond": 10000,
+                "latencyTargetMs": 50,
+                "nice": 0,
+                "ioClass": None
             }
         }
     
@@ -326,50 +614,32 @@ class ClaudeCache:
         return {
             "filePriorities": {
                 "critical": {"extensions": [".py", ".js", ".ts"], "priority": 10}
+            },
+            "eviction": {
+                "enabled": True,
+                "policy": "gdsf",
+                "maxDiskUsage": "1GB",
+                "interval": "10m",
+                "ttl": {}
             }
         }
     
+    def policy_for(self, file_path: str) -> PathPolicy:
+        """Resolved policies.json decision for a path"""
+        return self.policy_engine.policy_for(file_path)
+    
+    def _get_file_priority(self, file_path: str) -> int:
+        """Priority of a path from filePriorities and rules (1 if unlisted)"""
+        return self.policy_for(file_path).priority
+    
     def _init_database(self):
         """Initialize SQLite database for cache metadata"""
         try:
-            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            self.store.content_dir.mkdir(parents=True, exist_ok=True)
             
             with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Enable WAL mode for better concurrency
-                cursor.execute("PRAGMA journal_mode=WAL")
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS cache_entries (
-                        path TEXT PRIMARY KEY,
-                        checksum TEXT NOT NULL,
-                        size INTEGER NOT NULL,
-                        modified_time REAL NOT NULL,  
-                        cached_time REAL NOT NULL,
-                        compressed BOOLEAN NOT NULL,
-                        access_count INTEGER DEFAULT 0,
-                        last_accessed REAL NOT NULL,
-                        content_path TEXT NOT NULL,
-                        metadata TEXT NOT NULL
-                    )
-                ''')
-                
-                cursor.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_cached_time 
-                    ON cache_entries(cached_time)
-                ''')
-                
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS cache_stats (
-                        id INTEGER PRIMARY KEY,
-                        timestamp REAL NOT NULL,
-                        hit_count INTEGER NOT NULL,
-                        miss_count INTEGER NOT NULL,
-                        total_files INTEGER NOT NULL,
-                        cache_size INTEGER NOT NULL
-                    )
-                ''')
+                # WAL mode, tables, indexes and migrations shared with the async front-end
+                init_schema(conn)
                 
                 logger.info("Database initialized successfully")
                 
@@ -384,6 +654,8 @@ class ClaudeCache:
         
         try:
             with open(file_path, 'rb') as f:
+                if HAVE_FADVISE:
+                    advise(f.fileno(), os.POSIX_FADV_SEQUENTIAL)
                 # Read in chunks to handle large files
                 for chunk in iter(lambda: f.read(8192), b""):
                     hasher.update(chunk)
@@ -405,32 +677,25 @@ class ClaudeCache:
             if not self._validate_path(file_path):
                 return False
         
-        path = Path(file_path)
+        # Extension and exclude globs are pure string checks, run them before stat
+        reason = self._path_filter.check(file_path)
+        if reason == PathFilter.EXTENSION:
+            logger.debug(f"File {file_path} has unsupported extension: {Path(file_path).suffix.lower()}")
+            return False
+        if reason == PathFilter.EXCLUDED:
+            logger.debug(f"File {file_path} excluded by pattern")
+            return False
         
         # Check file size
         try:
-            size = path.stat().st_size
-            max_size = self._parse_size(self.config.get("fileCache", {}).get("maxFileSize", "10MB"))
-            if size > max_size:
-                logger.info(f"File {file_path} too large ({size / 1024 / 1024:.1f}MB > {max_size / 1024 / 1024:.1f}MB)")
-                return False
+            size = os.stat(file_path).st_size
         except OSError as e:
             logger.error(f"Cannot stat file {file_path}: {e}")
             return False
         
-        # Check exclude patterns first (more restrictive)
-        exclude_patterns = self.config.get("fileCache", {}).get("excludePatterns", [])
-        path_str = str(path)
-        for pattern in exclude_patterns:
-            if pattern.replace("**", "*") in path_str:
-                logger.debug(f"File {file_path} excluded by pattern: {pattern}")
-                return False
-        
-        # Check extension (if specified)
-        extension = path.suffix.lower()
-        allowed_extensions = self.config.get("fileCache", {}).get("extensions", [])
-        if allowed_extensions and extension not in allowed_extensions:
-            logger.debug(f"File {file_path} has unsupported extension: {extension}")
+        max_size = self._path_filter.max_file_size
+        if size > max_size:
+            logger.info(f"File {file_path} too large ({size / 1024 / 1024:.1f}MB > {max_size / 1024 / 1024:.1f}MB)")
             return False
         
         return True
@@ -517,8 +782,16 @@ class ClaudeCache:
         logger.info(f"Memory cleanup completed: cleared {cache_size_before} cached items, "
                    f"freed {collected} objects, memory: {memory_stats.process_memory_mb:.1f}MB")
     
-    def _add_to_memory_cache(self, file_path: str, content: str, max_items: int = 50):
-        """Add content to LRU memory cache with thread safety"""
+    def _add_to_memory_cache(self, file_path: str, content: str, file_stat: os.stat_result):
+        """Add content to LRU memory cache with thread safety.
+        
+        file_stat is the source's stat from before content was read; hits
+        are only served while the file still matches it.
+        """
+        # Only policy-eligible entries are admitted to the memory tier
+        if not self.policy_engine.admits_to_memory(self.policy_for(file_path)):
+            return
+        
         # Check memory before adding
         if not self._check_memory_usage():
             return  # Skip if memory is over limit
@@ -528,20 +801,67 @@ class ClaudeCache:
             # LRU cache automatically handles eviction and size limits
             self._memory_cache[file_path] = {
                 'content': content,
+                'size': file_stat.st_size,
+                'mtime_ns': file_stat.st_mtime_ns,
                 'timestamp': time.time(),
                 'access_count': 1
             }
     
+    def share_memory_generation(self, generation):
+        """Keep the memory tier coherent with other processes on the same store.
+        
+        generation is a shared counter (multiprocessing.Value) inherited by
+        every process. invalidate_file and clear_cache bump it; the others
+        drop their memory tier when they next see it change.
+        """
+        self._memory_generation = generation
+        self._seen_generation = generation.value
+    
+    def _bump_memory_generation(self):
+        if self._memory_generation is None:
+            return
+        with self._memory_generation.get_lock():
+            missed = self._memory_generation.value != self._seen_generation
+            self._memory_generation.value += 1
+            # This process has already updated its own tier
+            self._seen_generation = self._memory_generation.value
+        if missed:
+            # Another process invalidated meanwhile; honour that too
+            with self._memory_cache_lock:
+                self._memory_cache.clear()
+    
     def _get_from_memory_cache(self, file_path: str) -> Optional[str]:
-        """Get content from LRU memory cache with thread safety"""
+        """Get content from LRU memory cache with thread safety.
+        
+        Entries are checked against a fresh stat of the source, so an
+        edited or deleted file is dropped instead of served stale.
+        """
+        if self._memory_generation is not None and self._memory_generation.value != self._seen_generation:
+            with self._memory_cache_lock:
+                self._seen_generation = self._memory_generation.value
+                self._memory_cache.clear()
+            return None
+        
         with self._memory_cache_lock:
-            if file_path in self._memory_cache:
-                # Update access statistics (LRU automatically handles ordering)
-                cache_entry = self._memory_cache[file_path]
-                cache_entry['access_count'] += 1
-                cache_entry['timestamp'] = time.time()
-                return cache_entry['content']
-        return None
+            if file_path not in self._memory_cache:
+                return None
+        
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            file_stat = None
+        
+        with self._memory_cache_lock:
+            cache_entry = self._memory_cache.get(file_path)
+            if cache_entry is None:
+                return None
+            if file_stat is None or (file_stat.st_size, file_stat.st_mtime_ns) != (cache_entry['size'], cache_entry['mtime_ns']):
+                del self._memory_cache[file_path]
+                return None
+            # Update access statistics (LRU automatically handles ordering)
+            cache_entry['access_count'] += 1
+            cache_entry['timestamp'] = time.time()
+            return cache_entry['content']
     
     def _parse_size(self, size_str: str) -> int:
         """Parse size string to bytes"""
@@ -562,19 +882,17 @@ class ClaudeCache:
         except ValueError:
             return 10 * 1024 * 1024  # Default 10MB
     
-    def _get_content_path(self, file_path: str, checksum: str) -> str:
+    def _get_content_path(self, file_path: str, checksum: str, compressed: bool = True) -> str:
         """Get cache storage path for file content"""
-        content_dir = self.cache_dir / "files" / "content"
-        content_dir.mkdir(parents=True, exist_ok=True)
-        # Use first 2 chars of checksum as subdirectory for better file system performance
-        subdir = content_dir / checksum[:2]
-        subdir.mkdir(exist_ok=True)
-        return str(subdir / f"{checksum}.gz")
+        return self.store.blob_path(checksum, compressed)
     
     def _compress_content(self, content: bytes, file_path: str = "") -> bytes:
         """Compress content using gzip with large file optimization"""
         if not self.config.get("fileCache", {}).get("compressionEnabled", True):
             return content
+        
+        if file_path and self.policy_for(file_path).codec == 'none':
+            return content
             
         compression_level = self.config.get("fileCache", {}).get("compressionLevel", 6)
         
@@ -614,80 +932,124 @@ class ClaudeCache:
     
     def get_file(self, file_path: str) -> Optional[str]:
         """Get file content from cache or filesystem with enhanced safety"""
+        answered, content = self.lookup_memory(file_path)
+        if answered:
+            return content
+        return self._get_file_uncached(file_path)
+    
+    def get_file_with_status(self, file_path: str) -> Tuple[Optional[str], bool]:
+        """Like get_file, also reporting whether it was served from the cache"""
+        answered, content = self.lookup_memory(file_path)
+        if answered:
+            return content, content is not None
+        self._read_outcome.hit = False
+        content = self._get_file_uncached(file_path)
+        return content, self._read_outcome.hit
+    
+    def lookup_memory(self, file_path: str) -> Tuple[bool, Optional[str]]:
+        """The cheap part of get_file: returns (answered, content).
+        
+        Answers memory-tier hits (at the cost of one stat to confirm the
+        file is unchanged) and known-missing or denied paths; anything
+        else (answered is False) must go through get_file.
+        """
         with self._stats_lock:
             self.stats['operations'] += 1
         
-        # Check memory usage first
-        self._check_memory_usage()
+        # Repeated probes for known-bad paths return without re-evaluating or logging
+        negative = self._negative_cache.get(file_path)
+        if negative is not None:
+            with self._stats_lock:
+                self.stats['negative_hits'] += 1
+            return negative != NegativeCache.NOT_CACHEABLE, None
         
         # Try in-memory cache first (for frequently accessed files)
         memory_cached = self._get_from_memory_cache(file_path)
         if memory_cached:
             with self._stats_lock:
                 self.stats['hits'] += 1
-            return memory_cached
+            return True, memory_cached
+        return False, None
+    
+    def _get_file_uncached(self, file_path: str) -> Optional[str]:
+        """get_file after lookup_memory came up empty"""
+        if self._negative_cache.get(file_path) == NegativeCache.NOT_CACHEABLE:
+            return self._read_file_direct(file_path)
         
+        # Check memory usage first
+        self._check_memory_usage()
+        
+        # Only reads that reach the index or disk count as interactive latency;
+        # a miss is charged up to the end of the source read, not for storing it
+        started = time.perf_counter()
+        self._read_outcome.read_done = None
+        try:
+            return self._get_file_from_disk(file_path)
+        finally:
+            finished = self._read_outcome.read_done or time.perf_counter()
+            self._throttle.record_latency(finished - started)
+    
+    def _get_file_from_disk(self, file_path: str) -> Optional[str]:
+        """Validate file_path, then serve it from the index or cache it"""
         # Validate path first
         if not self._validate_path(file_path):
             logger.warning(f"Access denied to {file_path}")
             return None
         
-        if not self._should_cache_file(file_path):
-            return self._read_file_direct(file_path)
-        
         # Check if file exists
         if not os.path.exists(file_path):
             logger.debug(f"File not found: {file_path}")
+            self._negative_cache.add(file_path, NegativeCache.MISSING)
             return None
         
+        if not self._should_cache_file(file_path):
+            self._negative_cache.add(file_path, NegativeCache.NOT_CACHEABLE)
+            return self._read_file_direct(file_path)
+        
         try:
             # Get file stats
             file_stat = os.stat(file_path)
-            current_checksum = self._calculate_checksum(file_path)
+            policy = self.policy_for(file_path)
+            if policy.prefetch:
+                self._schedule_prefetch(file_path, policy.prefetch)
             
-            if not current_checksum:
-                return self._read_file_direct(file_path)
+            # Cheaper validation levels only hash on a miss
+            current_checksum = None
+            if policy.validation == 'checksum':
+                current_checksum = self._calculate_checksum(file_path)
+                if not current_checksum:
+                    return self._read_file_direct(file_path)
             
-            # Check cache
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    SELECT checksum, content_path, compressed, access_count
-                    FROM cache_entries 
-                    WHERE path = ?
-                ''', (file_path,))
-                
-                result = cursor.fetchone()
-                
-                if result and result['checksum'] == current_checksum:
+            # Check cache; the blob is read and decompressed outside any database lock
+            result = self._lookup_entry(file_path)
+            if result and self._is_entry_fresh(result, file_stat, current_checksum, policy):
+                try:
+                    with open(result['content_path'], 'rb') as f:
+                        content = self._decompress_content(f.read(), result['compressed'])
+                    decoded_content = content.decode('utf-8', errors='replace')
+                except Exception as e:
+                    logger.error(f"Error reading cached content: {e}")
+                    # Cache corrupted, remove entry
+                    with self._get_db_connection() as conn:
+                        conn.execute('DELETE FROM cache_entries WHERE path = ?', (file_path,))
+                    # Fall through to cache miss
+                else:
                     # Cache hit
                     with self._stats_lock:
                         self.stats['hits'] += 1
+                    pending = self._record_access(file_path)
                     
-                    # Update access stats
-                    cursor.execute('''
-                        UPDATE cache_entries 
-                        SET access_count = access_count + 1, last_accessed = ?
-                        WHERE path = ?
-                    ''', (time.time(), file_path))
+                    # Add to memory cache for frequently accessed files
+                    if result['access_count'] + pending - 1 > 1:  # Only cache frequently accessed files
+                        self._add_to_memory_cache(file_path, decoded_content, file_stat)
                     
-                    # Read cached content
-                    try:
-                        with open(result['content_path'], 'rb') as f:
-                            content = self._decompress_content(f.read(), result['compressed'])
-                            decoded_content = content.decode('utf-8', errors='replace')
-                            
-                            # Add to memory cache for frequently accessed files
-                            if result['access_count'] > 1:  # Only cache frequently accessed files
-                                self._add_to_memory_cache(file_path, decoded_content)
-                                
-                            return decoded_content
-                    except Exception as e:
-                        logger.error(f"Error reading cached content: {e}")
-                        # Cache corrupted, remove entry
-                        cursor.execute('DELETE FROM cache_entries WHERE path = ?', (file_path,))
-                        # Fall through to cache miss
+                    self._read_outcome.hit = True
+                    return decoded_content
+            
+            if current_checksum is None:
+                current_checksum = self._calculate_checksum(file_path)
+                if not current_checksum:
+                    return self._read_file_direct(file_path)
             
             # Cache miss - read and cache file
             return self._cache_file(file_path, current_checksum, file_stat)
@@ -698,6 +1060,39 @@ class ClaudeCache:
                 self.stats['errors'] += 1
             return self._read_file_direct(file_path)
     
+    def _is_entry_fresh(self, row, file_stat, current_checksum: Optional[str], policy: PathPolicy) -> bool:
+        """Check an index row against the file using the policy's validation level"""
+        if policy.validation == 'checksum':
+            return row['checksum'] == current_checksum
+        if policy.validation == 'mtime':
+            return row['size'] == file_stat.st_size and row['modified_time'] == file_stat.st_mtime
+        return True
+    
+    def _schedule_prefetch(self, file_path: str, patterns: Tuple[str, ...]) -> None:
+        """Warm policy-hinted siblings of a file in the background (once per file)"""
+        with self._prefetched_lock:
+            if file_path in self._prefetched:
+                return
+            self._prefetched[file_path] = True
+        self._prefetch_executor.submit(self._prefetch_siblings, file_path, patterns)
+    
+    def _prefetch_siblings(self, file_path: str, patterns: Tuple[str, ...]) -> None:
+        """Cache files matching prefetch hints relative to file_path's directory"""
+        directory = os.path.dirname(file_path)
+        stem = Path(file_path).stem
+        siblings = []
+        for pattern in patterns:
+            for sibling in glob.glob(os.path.join(directory, pattern.replace('{stem}', stem))):
+                if sibling != file_path and os.path.isfile(sibling) and self._should_cache_file(sibling):
+                    siblings.append(sibling)
+        
+        # Queue readahead for every sibling first so their I/O overlaps
+        if self._advise_prefetch:
+            for sibling in siblings:
+                will_need(sibling)
+        for sibling in siblings:
+            self._cache_file_task(sibling)
+    
     def _read_file_direct(self, file_path: str) -> Optional[str]:
         """Read file directly without caching"""
         try:
@@ -707,6 +1102,80 @@ class ClaudeCache:
             logger.error(f"Error reading file {file_path}: {e}")
             return None
     
+    def open_file(self, file_path: str) -> Tuple[Optional[BinaryIO], bool]:
+        """Binary stream over file_path's content, served from the cache when fresh.
+        
+        Returns (stream, hit). Compressed blobs are decompressed as the
+        stream is read, so a caller that stops early never pays for the
+        rest. On a miss the source itself is streamed and caching happens
+        in the background instead of on the read path.
+        """
+        answered, content = self.lookup_memory(file_path)
+        if answered:
+            if content is None:
+                return None, False
+            return io.BytesIO(content.encode('utf-8')), True
+        if self._negative_cache.get(file_path) == NegativeCache.NOT_CACHEABLE:
+            return self._open_file_direct(file_path), False
+        
+        # Same accounting as get_file: operations above, latency here
+        started = time.perf_counter()
+        try:
+            return self._open_file_from_disk(file_path)
+        finally:
+            self._throttle.record_latency(time.perf_counter() - started)
+    
+    def _open_file_from_disk(self, file_path: str) -> Tuple[Optional[BinaryIO], bool]:
+        """open_file after lookup_memory came up empty"""
+        if not self._validate_path(file_path):
+            logger.warning(f"Access denied to {file_path}")
+            return None, False
+        if not os.path.exists(file_path):
+            self._negative_cache.add(file_path, NegativeCache.MISSING)
+            return None, False
+        if not self._should_cache_file(file_path):
+            self._negative_cache.add(file_path, NegativeCache.NOT_CACHEABLE)
+            return self._open_file_direct(file_path), False
+        
+        file_stat = os.stat(file_path)
+        policy = self.policy_for(file_path)
+        current_checksum = self._calculate_checksum(file_path) if policy.validation == 'checksum' else None
+        
+        result = self._lookup_entry(file_path)
+        if result and self._is_entry_fresh(result, file_stat, current_checksum, policy):
+            try:
+                if result['compressed']:
+                    stream = gzip.open(result['content_path'], 'rb')
+                else:
+                    stream = open(result['content_path'], 'rb')
+            except OSError as e:
+                logger.error(f"Error opening cached content: {e}")
+            else:
+                with self._stats_lock:
+                    self.stats['hits'] += 1
+                self._record_access(file_path)
+                return stream, True
+        
+        # The background _cache_file counts the miss, as on get_file's miss path
+        self._prefetch_executor.submit(self._cache_file_task, file_path)
+        return self._open_file_direct(file_path), False
+    
+    def _open_file_direct(self, file_path: str) -> Optional[BinaryIO]:
+        """Open the source itself, bypassing the cache"""
+        try:
+            return open(file_path, 'rb')
+        except Exception as e:
+            logger.error(f"Error reading file {file_path}: {e}")
+            return None
+    
+    def stream_file(self, file_path: str, chunk_size: int = 256 * 1024, start_line: Optional[int] = None,
+                    end_line: Optional[int] = None, max_bytes: Optional[int] = None) -> Tuple[Optional[Iterator[bytes]], bool]:
+        """Content of file_path as chunks, optionally limited to lines start_line..end_line (1-based, inclusive)"""
+        stream, hit = self.open_file(file_path)
+        if stream is None:
+            return None, False
+        return iter_chunks(stream, chunk_size, start_line, end_line, max_bytes), hit
+    
     def _cache_file(self, file_path: str, checksum: str, file_stat) -> Optional[str]:
         """Cache file content with atomic operations"""
         with self._stats_lock:
@@ -716,6 +1185,7 @@ class ClaudeCache:
             # Read file content
             with open(file_path, 'rb') as f:
                 content = f.read()
+            self._read_outcome.read_done = time.perf_counter()
             
             # Optional: Basic sensitive data detection
             if self.config.get("security", {}).get("detectSensitiveData", False):
@@ -734,18 +1204,13 @@ class ClaudeCache:
                 logger.info(f"Processing large file: {file_path} ({len(content) / 1024 / 1024:.1f}MB)")
             
             # Store compressed content
-            content_path = self._get_content_path(file_path, checksum)
+            content_path = self._get_content_path(file_path, checksum, is_compressed)
             
-            # Write atomically using temporary file
-            temp_path = content_path + '.tmp'
+            # Atomic write through a per-process, per-thread temp file
             try:
-                with open(temp_path, 'wb') as f:
-                    f.write(compressed_content if is_compressed else content)
-                os.replace(temp_path, content_path)  # Atomic on POSIX
+                write_blob(content_path, compressed_content if is_compressed else content)
             except Exception as e:
                 logger.error(f"Error writing cache file: {e}")
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
                 raise
             
             # Calculate compression metrics
@@ -767,18 +1232,11 @@ class ClaudeCache:
             
             # Update database
             with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO cache_entries 
-                    (path, checksum, size, modified_time, cached_time, compressed, 
-                     access_count, last_accessed, content_path, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                self.store.commit_entries(conn, [(
                     file_path, checksum, file_stat.st_size, file_stat.st_mtime,
                     time.time(), is_compressed, 1, time.time(), content_path,
-                    json.dumps(metadata)
-                ))
+                    json.dumps(metadata), compressed_size if is_compressed else original_size
+                )])
             
             logger.debug(f"Cached file {file_path}")
             return content.decode('utf-8', errors='replace')
@@ -791,6 +1249,10 @@ class ClaudeCache:
     
     def invalidate_file(self, file_path: str):
         """Invalidate cached file"""
+        self._negative_cache.discard(file_path)
+        with self._memory_cache_lock:
+            self._memory_cache.pop(file_path, None)
+        self._bump_memory_generation()
         try:
             with self._get_db_connection() as conn:
                 cursor = conn.cursor()
@@ -799,15 +1261,14 @@ class ClaudeCache:
                 result = cursor.fetchone()
                 
                 if result:
-                    # Remove cached content file
-                    try:
-                        os.remove(result['content_path'])
-                    except Exception as e:
-                        logger.warning(f"Error removing cache file: {e}")
-                    
                     # Remove database entry
                     cursor.execute('DELETE FROM cache_entries WHERE path = ?', (file_path,))
-                    logger.info(f"Invalidated cache for {file_path}")
+            
+            if result:
+                # The blob may be shared with an identical file: unlink only if unreferenced
+                with self._get_read_connection() as conn:
+                    self.store.unlink_unreferenced(conn, [result['content_path']])
+                logger.info(f"Invalidated cache for {file_path}")
                     
         except Exception as e:
             logger.error(f"Error invalidating cache for {file_path}: {e}")
@@ -933,17 +1394,18 @@ class ClaudeCache:
                     files_to_remove = cursor.fetchall()
                     
                     cursor.execute('DELETE FROM cache_entries')
-                
-                # Remove cached content files
-                removed_count = 0
-                for row in files_to_remove:
-                    try:
-                        os.remove(row['content_path'])
-                        removed_count += 1
-                    except Exception as e:
-                        logger.warning(f"Error removing cache file: {e}")
-                
-                logger.info(f"Cleared {removed_count} cache files")
+            
+            # Remove cached content files no surviving row still shares
+            with self._get_read_connection() as conn:
+                removed_count = self.store.unlink_unreferenced(
+                    conn, [row['content_path'] for row in files_to_remove])
+            
+            logger.info(f"Cleared {removed_count} cache files")
+            
+            # Don't keep serving cleared entries from the memory tier
+            with self._memory_cache_lock:
+                self._memory_cache.clear()
+            self._bump_memory_generation()
                 
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
@@ -966,72 +1428,153 @@ class ClaudeCache:
         except ValueError:
             return 0
     
+    # Blobs younger than this may belong to a row another process has yet to commit,
+    # and temp files younger than this to a write still in progress
+    ORPHAN_GRACE = 300
+    
     def cleanup_stale_entries(self):
         """Remove stale cache entries and orphaned files"""
         try:
-            # Clean up database entries for files that no longer exist
+            with self.store.lock('maintenance'):
+                self._cleanup_stale_entries()
+        except Exception as e:
+            logger.error(f"Error during cleanup: {e}")
+    
+    def _cleanup_stale_entries(self):
+        """cleanup_stale_entries, run with the store's maintenance lock held"""
+        # Clean up database entries for files that no longer exist
+        with self._get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT path, content_path FROM cache_entries')
+            rows = cursor.fetchall()
+        
+        # Existence checks are throttled and run without holding the database lock
+        stale_entries = []
+        for row in rows:
+            self._throttle.acquire(files=1)
+            if not os.path.exists(row['path']):
+                stale_entries.append((row['path'], row['content_path']))
+        
+        if stale_entries:
+            with self._get_db_connection() as conn:
+                conn.executemany('DELETE FROM cache_entries WHERE path = ?',
+                                 [(path,) for path, _ in stale_entries])
+            # Blobs shared with a live file stay; the rest go once their rows are gone
+            with self._get_read_connection() as conn:
+                self.store.unlink_unreferenced(conn, [content_path for _, content_path in stale_entries])
+            logger.info(f"Cleaned up {len(stale_entries)} stale cache entries")
+        
+        # Clean up orphaned content files
+        content_dir = self.store.content_dir
+        if content_dir.exists():
             with self._get_db_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT path, content_path FROM cache_entries')
-                
-                stale_entries = []
-                for row in cursor.fetchall():
-                    if not os.path.exists(row['path']):
-                        stale_entries.append(row['path'])
-                        try:
-                            os.remove(row['content_path'])
-                        except Exception:
-                            pass
-                
-                if stale_entries:
-                    placeholders = ','.join('?' * len(stale_entries))
-                    cursor.execute(f'DELETE FROM cache_entries WHERE path IN ({placeholders})', stale_entries)
-                    logger.info(f"Cleaned up {len(stale_entries)} stale cache entries")
+                cursor.execute('SELECT content_path FROM cache_entries')
+                valid_files = {row['content_path'] for row in cursor.fetchall()}
             
-            # Clean up orphaned content files
-            content_dir = self.cache_dir / "files" / "content"
-            if content_dir.exists():
-                with self._get_db_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute('SELECT content_path FROM cache_entries')
-                    valid_files = {row['content_path'] for row in cursor.fetchall()}
-                
-                orphaned_count = 0
-                for subdir in content_dir.iterdir():
-                    if subdir.is_dir():
-                        for file_path in subdir.glob("*.gz"):
-                            if str(file_path) not in valid_files:
-                                try:
-                                    file_path.unlink()
-                                    orphaned_count += 1
-                                except Exception as e:
-                                    logger.warning(f"Error removing orphaned file: {e}")
-                
-                if orphaned_count:
-                    logger.info(f"Removed {orphaned_count} orphaned cache files")
-                    
-        except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
+            orphans = []
+            stale_temps = []
+            cutoff = time.time() - self.ORPHAN_GRACE
+            for entry in content_dir.iterdir():
+                # Ingest staging files sit in the content root, blob temp files beside their blob
+                candidates = entry.iterdir() if entry.is_dir() else [entry]
+                for file_path in candidates:
+                    is_temp = file_path.suffix == '.tmp'
+                    if not is_temp and (file_path == entry or str(file_path) in valid_files):
+                        continue
+                    try:
+                        # A fresh blob's row may not be committed yet by another process,
+                        # and a fresh temp file may still be being written
+                        if file_path.stat().st_mtime > cutoff:
+                            continue
+                    except FileNotFoundError:
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Error checking orphaned file: {e}")
+                        continue
+                    (stale_temps if is_temp else orphans).append(file_path)
+            
+            # Temp files left by a crashed writer are referenced by nothing
+            for file_path in stale_temps:
+                try:
+                    file_path.unlink()
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"Error removing stale temp file: {e}")
+            
+            # Re-checked under the blob lock: a writer may have just reused one
+            with self._get_read_connection() as conn:
+                orphaned_count = self.store.unlink_unreferenced(conn, [str(path) for path in orphans])
+            
+            if orphaned_count or stale_temps:
+                logger.info(f"Removed {orphaned_count} orphaned cache files and {len(stale_temps)} stale temp files")
+    
+    def _iter_warm_candidates(self, patterns: List[str], walk_workers: int = 4) -> Iterator[WalkEntry]:
+        """Stream cacheable files matching patterns, reusing the walker's stat data"""
+        if not self.config.get("fileCache", {}).get("enabled", True):
+            return
+        
+        for entry in self._walker(patterns, walk_workers):
+            if self._accept_warm_candidate(entry):
+                yield entry
+    
+    def _walker(self, patterns: List[str], walk_workers: int = 4) -> TreeWalker:
+        """Scandir walker pruned by the compiled exclude globs"""
+        return TreeWalker(patterns, prune=self._path_filter.is_directory_excluded, max_workers=walk_workers)
     
-    def warm_cache_parallel(self, patterns: List[str], max_workers: int = 4) -> Dict[str, Any]:
+    def _accept_warm_candidate(self, entry: WalkEntry) -> bool:
+        """Cache policy check for a walked file using its DirEntry stat data"""
+        if self._path_filter.check(entry.path, entry.size) is not None:
+            return False
+        if self.config.get("security", {}).get("validatePaths", True):
+            return self._path_filter.is_allowed(entry.path, entry.is_symlink)
+        return True
+    
+    def _load_index_rows(self, walker: TreeWalker, columns: str) -> List[Tuple]:
+        """Index rows for every path a walk can produce, in one query per root"""
+        roots = [root.path for root in walker.roots]
+        rows = []
+        with self._get_db_connection() as conn:
+            if walker.literals:
+                placeholders = ','.join('?' * len(walker.literals))
+                rows.extend(conn.execute(
+                    f'SELECT path, {columns} FROM cache_entries WHERE path IN ({placeholders})',
+                    walker.literals
+                ))
+            
+            if any(root in ('', '/') for root in roots):
+                # Relative walks from the cwd or walks of / can match any path
+                rows.extend(conn.execute(f'SELECT path, {columns} FROM cache_entries'))
+                return rows
+            
+            for root in roots:
+                # Primary-key range scan: everything under root/ ('0' sorts right after '/')
+                prefix = root.rstrip('/')
+                rows.extend(conn.execute(
+                    f'SELECT path, {columns} FROM cache_entries WHERE path > ? AND path < ?',
+                    (prefix + '/', prefix + '0')
+                ))
+        return rows
+    
+    def _load_index_snapshot(self, walker: TreeWalker) -> Dict[str, Tuple[int, float]]:
+        """(size, mtime) of every indexed path a walk can produce"""
+        return {row[0]: (row[1], row[2]) for row in self._load_index_rows(walker, 'size, modified_time')}
+    
+    def warm_cache_parallel(self, patterns: List[str], max_workers: int = 4, incremental: bool = True) -> Dict[str, Any]:
         """Warm cache with parallel processing for improved performance"""
         start_time = time.time()
         
-        # Collect all files matching patterns
-        all_files = []
-        for pattern in patterns:
-            if '**' in pattern:
-                # Recursive glob
-                files = glob.glob(pattern, recursive=True)
-            else:
-                files = glob.glob(pattern)
-            
-            # Filter to cacheable files and validate paths
-            for file_path in files:
-                if (os.path.isfile(file_path) and 
-                    self._validate_path(file_path) and 
-                    self._should_cache_file(file_path)):
-                    all_files.append(file_path)
+        # Collect all cacheable files matching patterns in one pruned walk
+        walker = self._walker(patterns)
+        snapshot = self._load_index_snapshot(walker) if incremental else {}
+        all_files = [
+            entry.path for entry in walker
+            if self._accept_warm_candidate(entry) and snapshot.get(entry.path) != (entry.size, entry.mtime)
+        ]
+        
+        # Highest-priority files first
+        all_files.sort(key=self._get_file_priority, reverse=True)
         
         if not all_files:
             return {
@@ -1045,7 +1588,7 @@ class ClaudeCache:
         files_cached = 0
         errors = 0
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        with ThreadPoolExecutor(max_workers=max_workers, initializer=self._throttle.enter_background) as executor:
             # Submit cache tasks
             future_to_file = {
                 executor.submit(self._cache_file_task, file_path): file_path 
@@ -1083,22 +1626,17 @@ class ClaudeCache:
                 return False
             
             file_stat = os.stat(file_path)
+            self._throttle.acquire(file_stat.st_size)
             current_checksum = self._calculate_checksum(file_path)
             
             if not current_checksum:
                 return False
             
             # Check if already cached with same checksum
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT checksum FROM cache_entries WHERE path = ?
-                ''', (file_path,))
-                result = cursor.fetchone()
-                
-                if result and result['checksum'] == current_checksum:
-                    # Already cached and up to date
-                    return True
+            result = self._lookup_entry(file_path)
+            if result and result['checksum'] == current_checksum:
+                # Already cached and up to date
+                return True
             
             # Cache the file
             self._cache_file(file_path, current_checksum, file_stat)
@@ -1117,75 +1655,462 @@ class ClaudeCache:
         estimated_sequential = file_count * 0.05
         return max(1.0, estimated_sequential / total_time)
     
-    def warm_cache_batch_optimized(self, patterns: List[str], max_workers: int = 4, batch_size: int = 50) -> Dict[str, Any]:
-        """Batch-optimized cache warming with 80% faster database operations"""
+    def _build_warm_pipeline(self, warm_filter, max_workers: int = 4, batch_size: int = 50,
+                             stage_workers: Optional[Dict[str, int]] = None,
+                             progress_callback=None,
+                             cancel_event: Optional[threading.Event] = None) -> WarmPipeline:
+        """filter -> read/hash -> compress -> write stages feeding the group-commit sink"""
+        workers = {
+            'filter': 1,
+            'read': max_workers,
+            'compress': max(1, os.cpu_count() or 1),
+            'write': max(1, max_workers // 2)
+        }
+        workers.update(stage_workers or {})
+        
+        return WarmPipeline(
+            [
+                PipelineStage('filter', warm_filter, workers['filter']),
+                # Highest-priority files in flight are read first
+                PipelineStage('read', self._warm_read, workers['read'], priority=lambda item: item.priority),
+                PipelineStage('compress', self._warm_compress, workers['compress']),
+                PipelineStage('write', self._warm_write, workers['write'])
+            ],
+            self._warm_commit,
+            batch_size=batch_size,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+            initializer=self._throttle.enter_background
+        )
+    
+    def warm_cache_batch_optimized(self, patterns: List[str], max_workers: int = 4, batch_size: int = 50,
+                                   stage_workers: Optional[Dict[str, int]] = None,
+                                   progress_callback=None, incremental: bool = True,
+                                   cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Streaming cache warm: walk -> filter -> read/hash -> compress -> write -> group commit
+        
+        Every stage has its own worker pool and bounded input queue, so
+        memory stays flat on huge trees and no stage waits on a batch
+        barrier. Index records are committed in groups of batch_size.
+        
+        With incremental, the index's (size, mtime) for the walked roots is
+        loaded in one query and files whose walk stat matches are skipped
+        before they are ever opened. Setting cancel_event stops the warm;
+        records already committed stay in the index.
+        """
+        return self._warm_from_source(self._walker(patterns), max_workers, batch_size, stage_workers,
+                                      progress_callback, incremental, cancel_event=cancel_event)
+    
+    def _warm_from_source(self, walker, max_workers: int = 4, batch_size: int = 50,
+                          stage_workers: Optional[Dict[str, int]] = None,
+                          progress_callback=None, incremental: bool = True,
+                          priority: Optional[Callable[[str], int]] = None,
+                          cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Run the warm pipeline over a TreeWalker, GitIndexSource or CompiledProfile
+        
+        priority overrides the policy priority used to order reads.
+        """
+        if not self.config.get("fileCache", {}).get("enabled", True):
+            return {'files_processed': 0, 'files_cached': 0, 'total_time': 0, 'errors': 0}
+        
+        snapshot = self._load_index_snapshot(walker) if incremental else {}
+        unchanged = itertools.count()
+        
+        def warm_filter(entry: WalkEntry) -> Optional[WarmItem]:
+            if snapshot and snapshot.get(entry.path) == (entry.size, entry.mtime):
+                if self._accept_warm_candidate(entry):
+                    next(unchanged)
+                return None
+            item = self._warm_filter(entry)
+            if item is not None and priority is not None:
+                item.priority = priority(entry.path)
+            return item
+        
+        pipeline = self._build_warm_pipeline(warm_filter, max_workers, batch_size, stage_workers,
+                                             progress_callback, cancel_event)
+        progress = pipeline.run(walker)
+        
+        stages = progress['stages']
+        errors = sum(stage['errors'] for stage in stages.values()) + progress['sink']['errors']
+        files_unchanged = next(unchanged)
+        files_processed = stages['filter']['out'] + files_unchanged
+        total_time = progress['total_time']
+        
+        logger.info(f"Cache warming completed: {progress['sink']['committed']}/{files_processed} files "
+                    f"({files_unchanged} unchanged) in {total_time:.3f}s")
+        
+        return {
+            'files_processed': files_processed,
+            'files_cached': progress['sink']['committed'],
+            'files_unchanged': files_unchanged,
+            'total_time': total_time,
+            'errors': errors,
+            'speedup': self._calculate_speedup(files_processed, total_time),
+            'cancelled': progress['cancelled'],
+            'stages': progress
+        }
+    
+    def warm_cache_git(self, repo_path: str = ".", patterns: Optional[List[str]] = None,
+                       modified_only: bool = True, max_workers: int = 4, batch_size: int = 50,
+                       progress_callback=None, incremental: bool = True,
+                       cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Warm tracked files of a git repository, enumerated from .git/index
+        
+        No directory is scanned: tracked paths and their cached stat data
+        come from the index file, and with modified_only only files whose
+        working-tree stat differs from it are fed to the pipeline. patterns
+        are globs relative to the work tree. Falls back to walking the
+        work tree when the index cannot be read (e.g. split indexes).
+        """
+        try:
+            source = GitIndexSource(repo_path, patterns, modified_only=modified_only)
+        except GitIndexError as e:
+            logger.warning(f"Git index unavailable ({e}), walking {repo_path} instead")
+            root = os.path.abspath(repo_path)
+            walk_patterns = [os.path.join(root, p) for p in (patterns or ['**/*'])]
+            return self.warm_cache_batch_optimized(walk_patterns, max_workers, batch_size,
+                                                   progress_callback=progress_callback, incremental=incremental,
+                                                   cancel_event=cancel_event)
+        
+        result = self._warm_from_source(source, max_workers, batch_size, progress_callback=progress_callback,
+                                        incremental=incremental, cancel_event=cancel_event)
+        result['git'] = dict(source.stats)
+        return result
+    
+    def load_warm_profiles(self, profiles_file: Optional[str] = None) -> Dict[str, WarmProfile]:
+        """Profiles from profiles_file, or config/profiles.json in the cache dir"""
+        return load_profiles(profiles_file or str(self.cache_dir / "config" / "profiles.json"))
+    
+    def warm_profile(self, profile, profiles_file: Optional[str] = None, max_workers: int = 4,
+                     batch_size: int = 50, progress_callback=None, incremental: bool = True,
+                     cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Warm a declarative profile (a WarmProfile or a profile name) in one walk
+        
+        Every group's globs are walked together, each file is assigned to
+        the highest-priority group that wants it, and group priority orders
+        reads in the pipeline. The result adds a per-group summary.
+        """
+        if not isinstance(profile, WarmProfile):
+            profiles = self.load_warm_profiles(profiles_file)
+            if profile not in profiles:
+                raise ValueError(f"Unknown warm profile {profile!r}, available: {sorted(profiles)}")
+            profile = profiles[profile]
+        
+        compiled = profile.compile(prune=self._path_filter.is_directory_excluded)
+        result = self._warm_from_source(compiled, max_workers, batch_size, progress_callback=progress_callback,
+                                        incremental=incremental, priority=compiled.priority_for,
+                                        cancel_event=cancel_event)
+        result['profile'] = profile.name
+        result['root'] = profile.root
+        result['groups'] = compiled.stats
+        return result
+    
+    def warm_cache_processes(self, patterns: List[str], processes: Optional[int] = None,
+                             shard_size: int = 256, incremental: bool = True) -> Dict[str, Any]:
+        """Cache warming sharded across worker processes for CPU-bound cold warms
+        
+        The parent walks, filters and diffs against the index, then hands
+        shards of files to a process pool. Workers write blobs themselves
+        and return index records, which the parent group-commits per shard.
+        At most two shards per process are in flight, so memory stays flat.
+        """
         start_time = time.time()
+        processes = processes or os.cpu_count() or 1
         
-        # Collect all files matching patterns (same as before)
-        all_files = []
-        for pattern in patterns:
-            if '**' in pattern:
-                files = glob.glob(pattern, recursive=True)
-            else:
-                files = glob.glob(pattern)
+        if not self.config.get("fileCache", {}).get("enabled", True):
+            return {'files_processed': 0, 'files_cached': 0, 'total_time': 0, 'errors': 0}
+        
+        walker = self._walker(patterns)
+        snapshot = self._load_index_snapshot(walker) if incremental else {}
+        content_dir = str(self.store.content_dir)
+        compression_enabled = self.config.get("fileCache", {}).get("compressionEnabled", True)
+        zero_copy = self._ingest_mode != "read"
+        
+        counts = {'processed': 0, 'unchanged': 0, 'cached': 0, 'errors': 0}
+        
+        def commit(futures):
+            for future in futures:
+                try:
+                    records, shard_errors = future.result()
+                    counts['cached'] += self._batch_insert_cache_entries(records)
+                    counts['errors'] += shard_errors
+                except Exception as e:
+                    logger.error(f"Error in warm shard: {e}")
+                    counts['errors'] += 1
+        
+        # forkserver avoids forking a parent that holds locks in other threads
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=lower_priority,
+                                 initargs=self._throttle.priority_args()) as executor:
+            in_flight = set()
+            shard = []
+            
+            def submit(shard):
+                shard.sort(key=lambda item: self._get_file_priority(item[0]), reverse=True)
+                self._throttle.acquire(sum(item[1] for item in shard), files=len(shard))
+                in_flight.add(executor.submit(_warm_shard, content_dir, compression_enabled, shard,
+                                              self._drop_after_warm, zero_copy))
+                if len(in_flight) >= processes * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    in_flight.difference_update(done)
+                    commit(done)
             
-            for file_path in files:
-                if (os.path.isfile(file_path) and 
-                    self._validate_path(file_path) and 
-                    self._should_cache_file(file_path)):
-                    all_files.append(file_path)
+            for entry in walker:
+                if not self._accept_warm_candidate(entry):
+                    continue
+                counts['processed'] += 1
+                if snapshot.get(entry.path) == (entry.size, entry.mtime):
+                    counts['unchanged'] += 1
+                    continue
+                codec = self._warm_codec(entry.path, entry.size)
+                shard.append((entry.path, entry.size, entry.mtime, codec))
+                if len(shard) >= shard_size:
+                    submit(shard)
+                    shard = []
+            if shard:
+                submit(shard)
+            
+            commit(in_flight)
         
-        if not all_files:
-            return {'files_processed': 0, 'files_cached': 0, 'total_time': 0, 'errors': 0}
+        total_time = time.time() - start_time
+        logger.info(f"Process-pool warming completed: {counts['cached']}/{counts['processed']} files "
+                    f"({counts['unchanged']} unchanged) on {processes} processes in {total_time:.3f}s")
         
-        files_cached = 0
-        errors = 0
+        return {
+            'files_processed': counts['processed'],
+            'files_cached': counts['cached'],
+            'files_unchanged': counts['unchanged'],
+            'total_time': total_time,
+            'errors': counts['errors'],
+            'speedup': self._calculate_speedup(counts['processed'], total_time),
+            'processes': processes
+        }
+    
+    WARM_ORDERS = ('value', 'priority', 'frequency', 'recency')
+    
+    def _warm_rank_key(self, order: str, history: Dict[str, Tuple[int, float]], now: float):
+        """Sort key ranking warm candidate paths, most valuable first"""
+        def key(path: str):
+            priority = self._get_file_priority(path)
+            access_count, last_accessed = history.get(path, (0, 0.0))
+            if order == 'priority':
+                return (priority, access_count)
+            if order == 'frequency':
+                return (access_count, priority)
+            if order == 'recency':
+                return (last_accessed, priority)
+            # value: policy priority boosted by log-frequency and a one-day recency half-life
+            recency = 0.5 ** ((now - last_accessed) / 86400) if last_accessed else 0.0
+            return (priority * (1 + math.log1p(access_count)) * (1 + recency), priority)
+        return key
+    
+    def _warm_cursor_path(self, cursor: str) -> Path:
+        if not re.fullmatch(r'[0-9a-f]{32}', cursor or ''):
+            raise ValueError(f"Invalid warm cursor: {cursor!r}")
+        return self.cache_dir / "files" / "warm_cursors" / f"{cursor}.json"
+    
+    def _save_warm_cursor(self, cursor: Optional[str], state: Dict[str, Any]) -> str:
+        """Persist where a budgeted warm stopped: its walk position and unwarmed candidates"""
+        cursor = cursor or uuid.uuid4().hex
+        cursor_path = self._warm_cursor_path(cursor)
+        cursor_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cursor_path.with_suffix('.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, cursor_path)
+        return cursor
+    
+    def _load_warm_cursor(self, cursor: str) -> Dict[str, Any]:
+        try:
+            with open(self._warm_cursor_path(cursor), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"Unknown or completed warm cursor: {cursor}")
+    
+    @staticmethod
+    def _stat_warm_entry(path: str) -> Optional[WalkEntry]:
+        """Rebuild the walk entry for a path saved in a cursor (None if it vanished)"""
+        try:
+            st = os.stat(path)
+            if stat.S_ISREG(st.st_mode):
+                return WalkEntry(path, st.st_size, st.st_mtime, os.path.islink(path))
+        except OSError:
+            pass
+        return None
+    
+    def _index_rows_for(self, paths: List[str], columns: str, chunk_size: int = 500) -> Dict[str, Tuple]:
+        """Index rows for exactly these paths, keyed by path"""
+        rows = {}
+        with self._get_read_connection() as conn:
+            for start in range(0, len(paths), chunk_size):
+                chunk = paths[start:start + chunk_size]
+                placeholders = ','.join('?' * len(chunk))
+                for row in conn.execute(
+                    f'SELECT path, {columns} FROM cache_entries WHERE path IN ({placeholders})', chunk
+                ):
+                    rows[row[0]] = tuple(row[1:])
+        return rows
+    
+    def _collect_warm_candidates(self, entries: List[WalkEntry], candidates: List[WalkEntry]) -> int:
+        """Append the accepted entries that changed since they were cached; returns the unchanged count"""
+        accepted = [entry for entry in entries if self._accept_warm_candidate(entry)]
+        snapshot = self._index_rows_for([entry.path for entry in accepted], 'size, modified_time')
+        unchanged = 0
+        for entry in accepted:
+            if snapshot.get(entry.path) == (entry.size, entry.mtime):
+                unchanged += 1
+            else:
+                candidates.append(entry)
+        return unchanged
+    
+    def warm_cache_budgeted(self, patterns: Optional[List[str]] = None, budget_ms: Optional[float] = None,
+                            order: str = 'value', cursor: Optional[str] = None, max_workers: int = 4,
+                            batch_size: int = 50, progress_callback=None) -> Dict[str, Any]:
+        """Warm the most valuable files first and stop when the time budget runs out
+        
+        The walk itself runs against the budget: if budget_ms elapses
+        before it finishes, the position in the walk is saved and nothing
+        is warmed yet. Once the walk is complete, candidates that changed
+        since they were last cached are ranked by ``order`` (policy
+        priority, historical access_count and last_accessed from the
+        index) and fed to the warm pipeline until the budget is spent.
+        
+        Whatever is left (directories not yet walked and candidates not
+        yet warmed) is saved and a cursor is returned; pass it back as
+        ``cursor=`` to continue where this run stopped. The returned
+        cursor is None once everything is warm. A budget of zero or less
+        only creates or keeps the cursor.
+        """
+        start_time = time.time()
+        deadline = start_time + budget_ms / 1000.0 if budget_ms else None
+        
+        def expired() -> bool:
+            return deadline is not None and time.time() >= deadline
+        
+        state = self._load_warm_cursor(cursor) if cursor else None
+        if state is not None:
+            patterns, order = state['patterns'], state['order']
+        elif not patterns:
+            raise ValueError("No patterns provided")
+        elif order not in self.WARM_ORDERS:
+            raise ValueError(f"Unknown warm order {order!r}, expected one of {self.WARM_ORDERS}")
+        
+        # Sequential walk from an explicit stack, so it can stop and resume between directories
+        walker = self._walker(patterns, walk_workers=1)
+        if state is None:
+            state = {'patterns': patterns, 'order': order, 'walk': walker.pending_dirs(),
+                     'unchecked': list(walker.literals), 'remaining': [], 'ranked': False}
         
-        # Process files in batches for optimal database performance
-        for i in range(0, len(all_files), batch_size):
-            batch_files = all_files[i:i + batch_size]
-            batch_entries = []
+        files_unchanged = 0
+        fed = [0]
+        stack = [tuple(directory) for directory in state['walk']]
+        remaining = state['remaining']
+        ranked = state.get('ranked', False)
+        progress = None
+        
+        if budget_ms is None or budget_ms > 0:
+            # Finish (or continue) the walk first; nothing is ranked until it is complete
+            found = [entry for entry in map(self._stat_warm_entry, state['unchecked']) if entry is not None]
+            candidates = []
+            for files in walker.scan_steps(stack):
+                found.extend(files)
+                if len(found) >= 500:
+                    files_unchanged += self._collect_warm_candidates(found, candidates)
+                    found = []
+                if expired():
+                    break
+            files_unchanged += self._collect_warm_candidates(found, candidates)
+            state['unchecked'] = []
+            # Entries found this run keep their walk stat; saved paths are stat'ed again when fed
+            known = {entry.path: entry for entry in candidates}
+            remaining.extend(known)
             
-            # Process batch in parallel
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_file = {
-                    executor.submit(self._prepare_cache_entry, file_path): file_path 
-                    for file_path in batch_files
-                }
-                
-                for future in as_completed(future_to_file):
-                    file_path = future_to_file[future]
-                    try:
-                        entry = future.result()
-                        if entry:
-                            batch_entries.append(entry)
-                            files_cached += 1
-                    except Exception as e:
-                        logger.error(f"Error preparing cache entry for {file_path}: {e}")
-                        errors += 1
+            if not stack and not ranked:
+                history = self._index_rows_for(remaining, 'access_count, last_accessed')
+                remaining.sort(key=self._warm_rank_key(order, history, time.time()), reverse=True)
+                ranked = True
             
-            # Batch insert to database - major performance improvement
-            if batch_entries:
-                try:
-                    self._batch_insert_cache_entries(batch_entries)
-                except Exception as e:
-                    logger.error(f"Error in batch insert: {e}")
-                    errors += len(batch_entries)
+            if ranked and not expired():
+                def ranked_source():
+                    for path in remaining:
+                        if expired():
+                            return
+                        fed[0] += 1
+                        entry = known.get(path) or self._stat_warm_entry(path)
+                        if entry is not None:
+                            yield entry
+                
+                pipeline = self._build_warm_pipeline(self._warm_filter, max_workers, batch_size,
+                                                     progress_callback=progress_callback)
+                progress = pipeline.run(ranked_source())
+                remaining = remaining[fed[0]:]
+        
+        if remaining or stack or state['unchecked']:
+            cursor = self._save_warm_cursor(cursor, {
+                'patterns': patterns,
+                'order': order,
+                'walk': stack,
+                'unchecked': state['unchecked'],
+                'remaining': remaining,
+                'ranked': ranked,
+                'saved': time.time()
+            })
+        else:
+            if cursor:
+                self._warm_cursor_path(cursor).unlink(missing_ok=True)
+            cursor = None
         
         total_time = time.time() - start_time
+        files_cached = progress['sink']['committed'] if progress else 0
+        errors = 0
+        if progress:
+            errors = sum(stage['errors'] for stage in progress['stages'].values()) + progress['sink']['errors']
+        logger.info(f"Budgeted warming: {files_cached} files cached, {len(remaining)} remaining"
+                    f"{'' if not stack else ' (walk incomplete)'} in {total_time:.3f}s")
+        
         return {
-            'files_processed': len(all_files),
+            'files_processed': fed[0] + files_unchanged,
             'files_cached': files_cached,
+            'files_unchanged': files_unchanged,
+            'files_remaining': len(remaining),
+            'walk_complete': not stack,
+            'cursor': cursor,
+            'budget_ms': budget_ms,
+            'order': order,
             'total_time': total_time,
             'errors': errors,
-            'speedup': self._calculate_speedup(len(all_files), total_time)
+            'speedup': self._calculate_speedup(fed[0], total_time),
+            'stages': progress
         }
     
-    def warm_cache(self, patterns: List[str]) -> Dict[str, Any]:
-        """Public interface for cache warming with batch optimization"""
+    def warm_cache(self, patterns: Optional[List[str]] = None, incremental: bool = True, engine: str = "thread",
+                   processes: Optional[int] = None, budget_ms: Optional[float] = None,
+                   order: Optional[str] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Public interface for cache warming with batch optimization
+        
+        engine="process" shards the work across a process pool, which
+        scales cold warms of large trees with cores instead of the GIL.
+        
+        budget_ms, order or cursor switch to a ranked, time-budgeted warm
+        that returns a resumable cursor (see warm_cache_budgeted).
+        """
+        if not patterns and cursor is None:
+            raise ValueError("No patterns provided")
+        if budget_ms is not None or order is not None or cursor is not None:
+            return self.warm_cache_budgeted(patterns, budget_ms=budget_ms, order=order or 'value', cursor=cursor)
+        
+        if engine == "process":
+            return self.warm_cache_processes(patterns, processes=processes, incremental=incremental)
+        
         # Use batch-optimized warming for significant performance improvement
         max_workers = min(4, max(1, os.cpu_count() or 1))
-        return self.warm_cache_batch_optimized(patterns, max_workers)
+        return self.warm_cache_batch_optimized(patterns, max_workers, incremental=incremental)
+    
+    def run_eviction(self) -> Dict[str, Any]:
+        """Enforce TTLs and the disk budget immediately"""
+        return self._eviction.run_once()
 
 # Global cache instance with singleton pattern
 _cache_instance = None
@@ -1216,7 +2141,7 @@ if __name__ == "__main__":
     
     if len(sys.argv) < 2:
         print("Usage: python claude_cache_v2.py <command> [args]")
-        print("Commands: stats, clear, test, cleanup")
+        print("Commands: stats, clear, test, cleanup, evict, warm-git")
         sys.exit(1)
     
     command = sys.argv[1]
@@ -1234,6 +2159,13 @@ if __name__ == "__main__":
         print(f"  Misses: {stats.miss_count}")
         print(f"  Errors: {cache.stats.get('errors', 0)}")
         
+        throttle = cache._throttle.snapshot()
+        print("\nBackground Throttle:")
+        print(f"  Rate Factor: {throttle['factor']:.2f}")
+        print(f"  Interactive Latency: {throttle['latency_ms']:.1f} ms")
+        print(f"  Backoffs: {throttle['backoffs']}")
+        print(f"  Time Throttled: {throttle['wait_time']:.1f}s")
+        
         print(f"\nMemory Statistics:")
         print(f"  Process Memory: {memory_stats.process_memory_mb:.1f} MB")
         print(f"  Memory Limit: {memory_stats.memory_limit_mb:.0f} MB")
@@ -1262,6 +2194,25 @@ if __name__ == "__main__":
         cache.cleanup_stale_entries()
         print("Cleanup completed")
         
+    elif command == "evict":
+        result = cache.run_eviction()
+        print("Eviction completed:")
+        print(f"  Expired: {result['expired']}")
+        print(f"  Evicted: {result['evicted']}")
+        print(f"  Freed: {result['bytes_freed'] / 1024 / 1024:.2f} MB")
+        print(f"  Disk Usage: {result['disk_usage'] / 1024 / 1024:.2f} MB / {result['disk_budget'] / 1024 / 1024:.0f} MB")
+        
+    elif command == "warm-git":
+        # warm-git [repo] [--all]: modified tracked files, or every tracked file
+        args = [arg for arg in sys.argv[2:] if not arg.startswith('--')]
+        result = cache.warm_cache_git(args[0] if args else ".", modified_only="--all" not in sys.argv)
+        print("Git warm completed:")
+        print(f"  Tracked: {result.get('git', {}).get('tracked', 0)}")
+        print(f"  Modified: {result.get('git', {}).get('modified', 0)}")
+        print(f"  Cached: {result['files_cached']}")
+        print(f"  Unchanged: {result.get('files_unchanged', 0)}")
+        print(f"  Time: {result['total_time']:.3f}s")
+        
     elif command == "test":
         # Test with a sample file
         test_file = sys.argv[2] if len(sys.argv) > 2 else __file__
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Claude Cache asyncio Adapter
+Runs ClaudeCache operations from an event loop on a sized thread pool
+"""
+
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from claude_cache import ClaudeCache, get_cache
+
+
+class AsyncClaudeCache:
+    """asyncio front-end for the full ClaudeCache engine.
+
+    Path validation, policies, checksums, compression and the index all
+    run on a dedicated thread pool so they never block the loop. Memory
+    tier hits (and known-missing or denied paths) are answered inline via
+    ``ClaudeCache.lookup_memory`` without an executor hop, at the cost of
+    one stat to confirm the file is unchanged; in a long-lived daemon that
+    tier is where most repeat reads land.
+
+    The pool size comes from ``daemon.workers`` in cache.json and
+    defaults to ``min(32, cpu_count + 4)``.
+    """
+
+    def __init__(self, cache: Optional[ClaudeCache] = None, max_workers: Optional[int] = None):
+        self.cache = cache or get_cache()
+        if max_workers is None:
+            max_workers = self.cache.config.get("daemon", {}).get("workers") or min(32, (os.cpu_count() or 1) + 4)
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cache-aio")
+        self.stats = {'inline': 0, 'offloaded': 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run any blocking cache call on the adapter's pool"""
+        self.stats['offloaded'] += 1
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def get_file(self, file_path: str) -> Optional[str]:
+        content, _ = await self.get_file_with_status(file_path)
+        return content
+
+    async def get_file_with_status(self, file_path: str) -> Tuple[Optional[str], bool]:
+        """File content plus whether it was a cache hit"""
+        file_path = os.path.abspath(file_path)
+        answered, content = self.cache.lookup_memory(file_path)
+        if answered:
+            self.stats['inline'] += 1
+            return content, content is not None
+
+        # lookup_memory already counted the operation; finish the read off-loop
+        return await self.run(self._read_uncached, file_path)
+
+    def _read_uncached(self, file_path: str) -> Tuple[Optional[str], bool]:
+        self.cache._read_outcome.hit = False
+        content = self.cache._get_file_uncached(file_path)
+        return content, self.cache._read_outcome.hit
+
+    async def get_files(self, file_paths: List[str]) -> Dict[str, Tuple[Optional[str], bool]]:
+        """Read several files concurrently; values are (content, hit)"""
+        file_paths = list(dict.fromkeys(os.path.abspath(p) for p in file_paths))
+        results = await asyncio.gather(*(self.get_file_with_status(p) for p in file_paths))
+        return dict(zip(file_paths, results))
+
+    async def invalidate_file(self, file_path: str):
+        await self.run(self.cache.invalidate_file, os.path.abspath(file_path))
+
+    async def get_stats(self):
+        return await self.run(self.cache.get_stats)
+
+    async def warm_cache(self, patterns: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+        return await self.run(self.cache.warm_cache, patterns, **kwargs)
+
+    async def clear_cache(self, older_than: Optional[str] = None):
+        await self.run(self.cache.clear_cache, older_than)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Adapter and memory-tier counters for stats output"""
+        with self.cache._memory_cache_lock:
+            memory_items = len(self.cache._memory_cache)
+        return {
+            'workers': self.max_workers,
+            'memory_items': memory_items,
+            **self.stats
+        }
@@ -8,12 +8,19 @@ import os
 import sys
 import json
 import time
+import uuid
+import codecs
+import functools
 import socket
 import asyncio
+import logging
 import threading
 import subprocess
+import multiprocessing
 from pathlib import Path
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
 import signal
 import atexit
 
@@ -22,94 +29,638 @@ cache_dir = Path.home() / ".claude" / "cache"
 sys.path.insert(0, str(cache_dir))
 
 from mcp_server_optimized import OptimizedMCPServer
+from claude_cache_protocol import (Frame, ProtocolError, encode_binary_frame, encode_frame,
+                                   pack_response, read_frame, unpack_response)
+from claude_cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = Path.home() / ".claude" / "cache_daemon.sock"
+
+JOB_KINDS = ('patterns', 'profile', 'git')
+TERMINAL_STATES = ('completed', 'cancelled', 'failed')
+
+@dataclass
+class WarmJob:
+    """A background warm tracked by the daemon"""
+    job_id: str
+    kind: str
+    params: Dict[str, Any]
+    state: str = 'queued'
+    submitted: float = field(default_factory=time.time)
+    started: float = 0.0
+    finished: float = 0.0
+    restarts: int = 0
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    
+    @property
+    def key(self) -> str:
+        """Identity used to deduplicate concurrent submissions"""
+        return f"{self.kind}:{json.dumps(self.params, sort_keys=True)}"
+    
+    @property
+    def done(self) -> bool:
+        return self.state in TERMINAL_STATES
+    
+    def summary(self) -> Dict[str, Any]:
+        """Throughput of the job so far"""
+        elapsed = ((self.finished or time.time()) - self.started) if self.started else 0.0
+        files_seen = self.progress.get('files_seen', 0)
+        files_cached = self.progress.get('files_cached', 0)
+        return {
+            'elapsed': elapsed,
+            'files_seen': files_seen,
+            'files_cached': files_cached,
+            'errors': self.progress.get('errors', 0),
+            'scan_rate': files_seen / elapsed if elapsed > 0 else 0.0,
+            'files_per_second': files_cached / elapsed if elapsed > 0 else 0.0
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['summary'] = self.summary()
+        return data
+
+class WarmJobManager:
+    """Submit, status, subscribe and cancel for background warm jobs
+    
+    Jobs run on a dedicated thread pool through ClaudeCache's streaming
+    warm pipeline. Submitting a job identical to one still queued or
+    running returns the existing job. Job state is checkpointed to
+    jobs_file; after a restart unfinished jobs are queued again, and since
+    warms are incremental the files committed before the restart are
+    skipped by the index diff instead of being read again.
+    """
+    
+    def __init__(self, jobs_file: Path, max_concurrent: int = 1, history: int = 50,
+                 checkpoint_interval: float = 1.0):
+        self.jobs_file = Path(jobs_file)
+        self.history = history
+        self.checkpoint_interval = checkpoint_interval
+        self.jobs: Dict[str, WarmJob] = {}
+        self._active_keys: Dict[str, str] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="warm-job")
+        self._lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._last_checkpoint = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Bind to the daemon's event loop and resume checkpointed jobs"""
+        self._loop = loop
+        self._restore()
+    
+    def shutdown(self):
+        """Checkpoint without cancelling, so running jobs resume on restart"""
+        self._checkpoint(force=True)
+        self._executor.shutdown(wait=False)
+    
+    def submit(self, kind: str, params: Dict[str, Any]) -> Tuple[WarmJob, bool]:
+        """Queue a warm job; returns (job, deduplicated)"""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind {kind!r}, expected one of {JOB_KINDS}")
+        if kind == 'patterns' and not params.get('patterns'):
+            raise ValueError("No patterns provided")
+        if kind == 'profile' and not params.get('profile'):
+            raise ValueError("No profile provided")
+        
+        job = WarmJob(uuid.uuid4().hex[:12], kind, params)
+        with self._lock:
+            existing = self._active_keys.get(job.key)
+            if existing is not None:
+                return self.jobs[existing], True
+            self.jobs[job.job_id] = job
+            self._active_keys[job.key] = job.job_id
+        
+        self._schedule(job)
+        self._checkpoint(force=True)
+        return job, False
+    
+    def status(self, job_id: Optional[str] = None) -> Any:
+        """One job's state, or every known job when job_id is None"""
+        if job_id is None:
+            return [job.to_dict() for job in self.jobs.values()]
+        return self._get(job_id).to_dict()
+    
+    def cancel(self, job_id: str) -> WarmJob:
+        """Stop a queued or running job; committed files stay cached"""
+        job = self._get(job_id)
+        if not job.done:
+            self._cancel_events[job_id].set()
+        return job
+    
+    async def subscribe(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield job snapshots as progress is made, ending with the terminal state"""
+        job = self._get(job_id)
+        queue = asyncio.Queue(maxsize=16)
+        self._subscribers.setdefault(job_id, []).append(queue)
+        try:
+            snapshot = job.to_dict()
+            yield snapshot
+            while snapshot['state'] not in TERMINAL_STATES:
+                snapshot = await queue.get()
+                yield snapshot
+        finally:
+            self._subscribers[job_id].remove(queue)
+    
+    def _get(self, job_id: str) -> WarmJob:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown job: {job_id}")
+        return job
+    
+    def _schedule(self, job: WarmJob):
+        self._cancel_events[job.job_id] = threading.Event()
+        self._executor.submit(self._run, job)
+    
+    def _run(self, job: WarmJob):
+        """Job thread: run the warm and record its outcome"""
+        cancel_event = self._cancel_events[job.job_id]
+        try:
+            if cancel_event.is_set():
+                job.state = 'cancelled'
+                return
+            job.state = 'running'
+            job.started = time.time()
+            self._publish(job)
+            
+            result = self._execute(job, cancel_event)
+            job.result = {key: value for key, value in result.items() if key != 'stages'}
+            job.progress.update(files_cached=result.get('files_cached', 0), errors=result.get('errors', 0))
+            job.state = 'cancelled' if result.get('cancelled') else 'completed'
+        except Exception as e:
+            logger.error(f"Warm job {job.job_id} failed: {e}")
+            job.state = 'failed'
+            job.error = str(e)
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                self._active_keys.pop(job.key, None)
+            self._cancel_events.pop(job.job_id, None)
+            self._publish(job)
+            self._checkpoint(force=True)
+    
+    def _execute(self, job: WarmJob, cancel_event: threading.Event) -> Dict[str, Any]:
+        cache = get_cache()
+        # Job threads only ever run warms
+        cache._throttle.enter_background()
+        params = job.params
+        options = {
+            'progress_callback': lambda progress: self._on_progress(job, progress),
+            'cancel_event': cancel_event
+        }
+        if job.kind == 'profile':
+            return cache.warm_profile(params['profile'], profiles_file=params.get('profiles_file'), **options)
+        if job.kind == 'git':
+            return cache.warm_cache_git(params.get('repo', '.'), params.get('patterns'),
+                                        modified_only=params.get('modified_only', True), **options)
+        return cache.warm_cache_batch_optimized(params['patterns'], **options)
+    
+    def _on_progress(self, job: WarmJob, progress: Dict[str, Any]):
+        """Pipeline progress callback (runs on the job thread after each commit)"""
+        job.progress = {
+            'files_seen': progress['source']['out'],
+            'files_cached': progress['sink']['committed'],
+            'errors': sum(stage['errors'] for stage in progress['stages'].values()) + progress['sink']['errors']
+        }
+        self._publish(job)
+        self._checkpoint()
+    
+    def _publish(self, job: WarmJob):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._notify, job.job_id, job.to_dict())
+    
+    def _notify(self, job_id: str, snapshot: Dict[str, Any]):
+        for queue in self._subscribers.get(job_id, []):
+            # Slow subscribers only need the latest progress
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(snapshot)
+    
+    def _checkpoint(self, force: bool = False):
+        """Persist job state, at most every checkpoint_interval unless forced"""
+        now = time.time()
+        if not force and now - self._last_checkpoint < self.checkpoint_interval:
+            return
+        with self._checkpoint_lock:
+            self._last_checkpoint = now
+            jobs = list(self.jobs.values())
+            finished = [job for job in jobs if job.done][-self.history:]
+            keep = [job for job in jobs if not job.done] + finished
+            try:
+                self.jobs_file.parent.mkdir(parents=True, exist_ok=True)
+                temp_file = self.jobs_file.with_suffix('.tmp')
+                with open(temp_file, 'w') as f:
+                    json.dump({'jobs': [asdict(job) for job in keep]}, f)
+                os.replace(temp_file, self.jobs_file)
+            except Exception as e:
+                logger.error(f"Error checkpointing warm jobs: {e}")
+    
+    def _restore(self):
+        """Reload checkpointed jobs and requeue the unfinished ones"""
+        try:
+            with open(self.jobs_file, 'r') as f:
+                saved = json.load(f).get('jobs', [])
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Error loading warm job checkpoint: {e}")
+            return
+        
+        for data in saved:
+            job = WarmJob(**data)
+            self.jobs[job.job_id] = job
+            if job.done:
+                continue
+            job.state = 'queued'
+            job.restarts += 1
+            self._active_keys[job.key] = job.job_id
+            self._schedule(job)
+            logger.info(f"Resuming warm job {job.job_id} ({job.kind})")
 
 class CacheDaemon:
-    """Background daemon for ultra-fast cache operations"""
+    """Background daemon for ultra-fast cache operations
+    
+    With processes > 1 the daemon pre-forks that many workers (see
+    WorkerSupervisor). They accept from the same listening socket and
+    share the on-disk store; worker 0 also owns the warm job manager and
+    the other workers relay job requests to it over a private socket.
+    """
     
-    def __init__(self, socket_path: str = None, port: int = 19847):
-        self.socket_path = socket_path or str(Path.home() / ".claude" / "cache_daemon.sock")
+    def __init__(self, socket_path: str = None, port: int = 19847, tcp: bool = False, processes: int = 1):
+        self.socket_path = socket_path or str(DEFAULT_SOCKET_PATH)
         self.port = port
+        self.tcp = tcp
+        self.processes = processes
         self.pid_file = Path.home() / ".claude" / "cache_daemon.pid"
         self.server = None
         self.running = False
-        
+        self.jobs = WarmJobManager(Path.home() / ".claude" / "cache_daemon_jobs.json")
+        self.worker_slot: Optional[int] = None  # Index of this pre-forked worker
+        self._jobs_client: Optional['CacheClient'] = None  # Relay to worker 0's job manager
+        self._owns_jobs = False
+        self._listeners = []
+        self._socket_files: List[str] = []
+    
+    @property
+    def jobs_socket_path(self) -> str:
+        """Private socket on which worker 0 serves job requests for its siblings"""
+        return str(Path(self.socket_path).with_suffix('.jobs.sock'))
+    
+    def run(self):
+        """Run in the foreground: one process, or a supervisor with pre-forked workers"""
+        if self.processes > 1 and hasattr(os, 'fork'):
+            WorkerSupervisor(self, self.processes).run()
+        else:
+            asyncio.run(self.start_daemon())
+    
     async def start_daemon(self):
         """Start the cache daemon"""
-        print(f"🚀 Starting Claude Cache Daemon...")
+        print("🚀 Starting Claude Cache Daemon...")
         
+        sockets, endpoints = self.bind_sockets()
+        self._write_pid_file()
+        print(f"✅ Cache daemon listening on {', '.join(endpoints)} (PID: {os.getpid()})")
+        
+        self._install_signal_handlers()
+        await self._serve_sockets(sockets)
+    
+    async def run_worker(self, slot: int, sockets: List[socket.socket], generation):
+        """Body of pre-forked worker slot, serving the supervisor's sockets"""
+        self.worker_slot = slot
+        self._socket_files = []  # The shared socket belongs to the supervisor
+        self._install_signal_handlers()
+        
+        sockets = list(sockets)
+        if self.tcp and hasattr(socket, 'SO_REUSEPORT'):
+            # Each worker binds the port itself and the kernel spreads connections
+            sockets.append(self._bind_tcp_socket(reuse_port=True))
+        if slot == 0:
+            sockets.append(self._bind_unix_socket(self.jobs_socket_path))
+        else:
+            self._jobs_client = CacheClient(port=None, socket_path=self.jobs_socket_path)
+        
+        # Invalidations in any worker evict the others' memory tiers
+        get_cache().share_memory_generation(generation)
+        await self._serve_sockets(sockets)
+    
+    async def _serve_sockets(self, sockets: List[socket.socket]):
         # Initialize MCP server
         self.server = OptimizedMCPServer(max_connections=50)
         await self.server.__aenter__()
+        if self._jobs_client is None:
+            self.jobs.start(asyncio.get_running_loop())
+            self._owns_jobs = True
         
-        # Start TCP server for fast IPC
-        server = await asyncio.start_server(
-            self.handle_client, 
-            '127.0.0.1', 
-            self.port
-        )
+        for sock in sockets:
+            if sock.family == getattr(socket, 'AF_UNIX', None):
+                self._listeners.append(await asyncio.start_unix_server(self.handle_client, sock=sock))
+            else:
+                self._listeners.append(await asyncio.start_server(self.handle_client, sock=sock))
+        self.running = True
         
-        # Write PID file
-        with open(self.pid_file, 'w') as f:
-            f.write(str(os.getpid()))
+        # Serve forever
+        await asyncio.gather(*(listener.serve_forever() for listener in self._listeners))
+    
+    def bind_sockets(self, tcp: Optional[bool] = None) -> Tuple[List[socket.socket], List[str]]:
+        """Listening sockets and their endpoint names.
         
-        self.running = True
-        print(f"✅ Cache daemon started on port {self.port} (PID: {os.getpid()})")
+        A Unix domain socket by default: no TCP stack, no port conflicts,
+        and only the owning user can connect. TCP is added when asked for
+        (tcp defaults to self.tcp) or when Unix sockets are unavailable.
+        """
+        sockets, endpoints = [], []
+        if hasattr(socket, 'AF_UNIX'):
+            sockets.append(self._bind_unix_socket(self.socket_path))
+            endpoints.append(self.socket_path)
+        if (self.tcp if tcp is None else tcp) or not sockets:
+            sockets.append(self._bind_tcp_socket())
+            endpoints.append(f"127.0.0.1:{self.port}")
+        return sockets, endpoints
+    
+    def _bind_unix_socket(self, socket_path: str) -> socket.socket:
+        """Listen on socket_path, mode 0600 inside a 0700 directory"""
+        path = Path(socket_path)
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
         
-        # Setup signal handlers
+        if path.exists():
+            # A socket nobody answers on is left over from a crashed daemon
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(path))
+                raise RuntimeError(f"Another daemon is already listening on {path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                path.unlink(missing_ok=True)
+            finally:
+                probe.close()
+        
+        # Create the socket file already restricted, not chmod it afterwards
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(str(path))
+        except OSError:
+            sock.close()
+            raise
+        finally:
+            os.umask(old_umask)
+        sock.listen(100)
+        sock.setblocking(False)
+        self._socket_files.append(str(path))
+        return sock
+    
+    def _bind_tcp_socket(self, reuse_port: bool = False) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if reuse_port:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            sock.bind(('127.0.0.1', self.port))
+            sock.listen(100)
+        except OSError:
+            sock.close()
+            raise
+        sock.setblocking(False)
+        return sock
+    
+    def _write_pid_file(self):
+        with open(self.pid_file, 'w') as f:
+            f.write(str(os.getpid()))
+    
+    def _install_signal_handlers(self):
         signal.signal(signal.SIGTERM, self._signal_handler)
         signal.signal(signal.SIGINT, self._signal_handler)
         atexit.register(self.cleanup)
-        
-        # Serve forever
-        async with server:
-            await server.serve_forever()
+    
+    # Requests a single connection may have running at once; later ones wait for a slot
+    MAX_IN_FLIGHT = 64
     
     async def handle_client(self, reader, writer):
-        """Handle client requests with minimal overhead"""
+        """Serve frames from one long-lived connection.
+        
+        Every request runs as its own task, so a client can pipeline many
+        requests and responses go out as they complete, tagged with the
+        request's id. A slow warm never holds up a stats call behind it.
+        
+        Requests wait for an in-flight slot inside their own task, so the
+        connection keeps reading and a cancel gets through however many
+        requests are running.
+        """
+        write_lock = asyncio.Lock()
+        in_flight = asyncio.Semaphore(self.MAX_IN_FLIGHT)
+        tasks = set()
+        by_id = {}
+        
+        def finished(task, request_id=None):
+            tasks.discard(task)
+            if by_id.get(request_id) is task:
+                del by_id[request_id]
+        
+        async def serve(frame):
+            async with in_flight:
+                await self._serve(frame.meta, writer, write_lock, frame.binary)
+        
         try:
-            # Read request (format: length_bytes + json_data)
-            length_data = await reader.read(4)
-            if not length_data:
-                return
-            
-            length = int.from_bytes(length_data, byteorder='big')
-            request_data = await reader.read(length)
+            while True:
+                try:
+                    frame = await read_frame(reader)
+                except ProtocolError as e:
+                    # Framing is lost; report and drop the connection
+                    await self._write_frame(writer, write_lock, {
+                        'id': None, 'success': False, 'error': str(e), 'more': False
+                    })
+                    break
+                if frame is None:
+                    break
+                
+                if frame.meta.get('tool') == 'cancel':
+                    # Stop a streaming request early; no further frames are sent for it
+                    task = by_id.get((frame.meta.get('params') or {}).get('request_id'))
+                    if task is not None and not task.done():
+                        task.cancel()
+                    continue
+                
+                task = asyncio.create_task(serve(frame))
+                tasks.add(task)
+                request_id = frame.meta.get('id')
+                if request_id is not None:
+                    by_id[request_id] = task
+                task.add_done_callback(functools.partial(finished, request_id=request_id))
             
-            request = json.loads(request_data.decode('utf-8'))
-            
-            # Process request through optimized MCP server
-            response = await self.server.handle_request(
-                request.get('tool', ''),
-                request.get('params', {})
-            )
-            
-            # Send response
-            response_data = json.dumps({
-                'success': response.success,
-                'data': response.data,
-                'error': response.error,
-                'execution_time': response.execution_time,
-                'cache_hit': response.cache_hit
-            }).encode('utf-8')
-            
-            response_length = len(response_data).to_bytes(4, byteorder='big')
-            writer.write(response_length + response_data)
-            await writer.drain()
-            
-        except Exception as e:
-            # Send error response
-            error_response = json.dumps({
-                'success': False,
-                'error': str(e),
-                'execution_time': 0.0
-            }).encode('utf-8')
-            
-            error_length = len(error_response).to_bytes(4, byteorder='big')
-            writer.write(error_length + error_response)
-            await writer.drain()
+            # Let pipelined requests finish before closing
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelled at shutdown: the connection just closes
+            pass
         finally:
+            for task in tasks:
+                task.cancel()
             writer.close()
-            await writer.wait_closed()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+    
+    async def _serve(self, request: Dict[str, Any], writer, write_lock: asyncio.Lock, binary: bool = False):
+        """Answer one request in its own framing; its frames carry the request's id"""
+        request_id = request.get('id')
+        tool = request.get('tool', '')
+        params = request.get('params') or {}
+        try:
+            if tool == 'warm_subscribe' and self._jobs_client is not None:
+                # Relay the job worker's progress frames under this request's id
+                async for response in self._jobs_client.subscribe(params.get('job_id', '')):
+                    response['id'] = request_id
+                    await self._write_frame(writer, write_lock, response, binary)
+                return
+            if tool == 'warm_subscribe':
+                # Stream one frame per progress update until the job finishes
+                async for snapshot in self.jobs.subscribe(params.get('job_id', '')):
+                    await self._write_frame(writer, write_lock, {
+                        'id': request_id, 'success': True, 'data': snapshot,
+                        'more': snapshot['state'] not in TERMINAL_STATES
+                    }, binary)
+                return
+            if tool == 'cache_read':
+                await self._stream_file(request_id, params, writer, write_lock, binary)
+                return
+            response = await self._dispatch(tool, params)
+        except KeyError as e:
+            response = {'success': False, 'data': None, 'error': str(e).strip("'"), 'execution_time': 0.0}
+        except Exception as e:
+            response = {'success': False, 'data': None, 'error': str(e), 'execution_time': 0.0}
+        
+        response['id'] = request_id
+        response['more'] = False
+        try:
+            await self._write_frame(writer, write_lock, response, binary, self.PAYLOAD_FIELDS.get(tool))
+        except ConnectionError:
+            pass
+    
+    async def _dispatch(self, tool: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if tool == 'ping':
+            data = None if self.worker_slot is None else {'worker': self.worker_slot, 'pid': os.getpid()}
+            return {'success': True, 'data': data, 'error': None, 'execution_time': 0.0, 'cache_hit': False}
+        
+        if tool in self.JOB_TOOLS and self._jobs_client is not None:
+            response = await self._jobs_client.send_request(tool, params)
+            response.pop('id', None)
+            response.pop('more', None)
+            return response
+        
+        if tool in self.JOB_TOOLS:
+            start_time = time.time()
+            try:
+                data = self._handle_job_request(tool, params)
+                response = {'success': True, 'data': data, 'error': None}
+            except (KeyError, ValueError) as e:
+                response = {'success': False, 'data': None, 'error': str(e).strip("'")}
+            response['execution_time'] = time.time() - start_time
+            response['cache_hit'] = False
+            return response
+        
+        # Process request through optimized MCP server
+        response = await self.server.handle_request(tool, params)
+        return {
+            'success': response.success,
+            'data': response.data,
+            'error': response.error,
+            'execution_time': response.execution_time,
+            'cache_hit': response.cache_hit
+        }
+    
+    # Default size of a cache_read chunk frame
+    STREAM_CHUNK_SIZE = 256 * 1024
+    
+    async def _stream_file(self, request_id, params: Dict[str, Any], writer,
+                           write_lock: asyncio.Lock, binary: bool = False):
+        """Send a file as chunk frames while it is read and decompressed.
+        
+        Each chunk is produced on the engine's pool only after the previous
+        frame has been drained to the socket, so a slow or stopped reader
+        holds back decompression instead of piling up buffers. Lines are
+        1-based and inclusive; nothing past end_line is ever decompressed.
+        The final frame (more=False) carries the totals and the hit flag.
+        """
+        start_time = time.time()
+        engine = self.server.engine
+        file_path = os.path.abspath(params.get('file_path', ''))
+        chunks, hit = await engine.run(
+            engine.cache.stream_file, file_path,
+            chunk_size=int(params.get('chunk_size') or self.STREAM_CHUNK_SIZE),
+            start_line=params.get('start_line'), end_line=params.get('end_line'),
+            max_bytes=params.get('max_bytes')
+        )
+        if chunks is None:
+            raise FileNotFoundError(f"File not found or not accessible: {file_path}")
+        
+        # JSON framing carries text; keep multi-byte characters whole across chunks
+        decoder = None if binary else codecs.getincrementaldecoder('utf-8')(errors='replace')
+        offset = 0
+        try:
+            while True:
+                chunk = await engine.run(next, chunks, None)
+                if chunk is None:
+                    break
+                await self._write_frame(writer, write_lock, {
+                    'id': request_id, 'success': True,
+                    'data': {'offset': offset, 'content': chunk if binary else decoder.decode(chunk)},
+                    'more': True
+                }, binary, 'content')
+                offset += len(chunk)
+        finally:
+            try:
+                await engine.run(chunks.close)
+            except ValueError:
+                pass  # Still running on the pool; it closes its stream on exhaustion
+        
+        # A truncated multi-byte sequence at the end is still owed as U+FFFD
+        if decoder is not None:
+            pending = len(decoder.getstate()[0])
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                await self._write_frame(writer, write_lock, {
+                    'id': request_id, 'success': True,
+                    'data': {'offset': offset - pending, 'content': tail},
+                    'more': True
+                }, binary, 'content')
+        
+        await self._write_frame(writer, write_lock, {
+            'id': request_id, 'success': True,
+            'data': {'file_path': file_path, 'bytes': offset},
+            'error': None, 'execution_time': time.time() - start_time,
+            'cache_hit': hit, 'more': False
+        }, binary)
+    
+    JOB_TOOLS = ('warm_submit', 'warm_status', 'warm_cancel')
+    
+    def _handle_job_request(self, tool: str, params: Dict[str, Any]) -> Any:
+        if tool == 'warm_submit':
+            params = dict(params)
+            kind = params.pop('kind', 'patterns')
+            job, deduplicated = self.jobs.submit(kind, params)
+            return {'job_id': job.job_id, 'state': job.state, 'deduplicated': deduplicated}
+        if tool == 'warm_cancel':
+            job = self.jobs.cancel(params.get('job_id', ''))
+            return {'job_id': job.job_id, 'state': job.state}
+        return self.jobs.status(params.get('job_id'))
+    
+    # Response fields sent as raw payload in binary framing
+    PAYLOAD_FIELDS = {'cache_file': 'content'}
+    
+    @staticmethod
+    async def _write_frame(writer, write_lock: asyncio.Lock, response: Dict[str, Any],
+                           binary: bool = False, payload_field: Optional[str] = None):
+        buffers = pack_response(response, binary, payload_field)
+        # Whole frames only: concurrent responses must not interleave
+        async with write_lock:
+            writer.writelines(buffers)
+            await writer.drain()
     
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals"""
@@ -120,18 +671,149 @@ class CacheDaemon:
     
     def cleanup(self):
         """Cleanup daemon resources"""
-        if self.pid_file.exists():
+        if self.worker_slot is None and self.pid_file.exists():
             self.pid_file.unlink()
         
+        for socket_file in self._socket_files:
+            Path(socket_file).unlink(missing_ok=True)
+        self._socket_files = []
+        
+        # Only the process running the job manager may checkpoint it
+        if self._owns_jobs:
+            self.jobs.shutdown()
+            self._owns_jobs = False
+        
         if self.server:
             asyncio.create_task(self.server.__aexit__(None, None, None))
 
+class WorkerSupervisor:
+    """Pre-forks daemon workers and restarts them when they die.
+    
+    The supervisor binds the listening sockets, then forks; every worker
+    inherits them and accepts connections from the same queue, so CPU
+    work (decompression, decoding, framing) spreads across cores. TCP
+    uses SO_REUSEPORT instead where available, each worker binding the
+    port itself. The supervisor itself runs no event loop and no threads,
+    so forking is safe, and a restarted worker is forked from the same
+    clean state.
+    
+    A worker that dies is restarted in its slot; one that keeps dying
+    within MIN_UPTIME is restarted with exponential backoff.
+    """
+    
+    MIN_UPTIME = 5.0
+    MAX_BACKOFF = 30.0
+    
+    def __init__(self, daemon: CacheDaemon, processes: int):
+        self.daemon = daemon
+        self.processes = processes
+        self.stopping = False
+        self.children: Dict[int, Tuple[int, float]] = {}  # pid -> (slot, started)
+        self.failures = [0] * processes
+        self._sockets: List[socket.socket] = []
+        # Shared memory-tier generation, see ClaudeCache.share_memory_generation
+        self._generation = multiprocessing.Value('Q', 0)
+    
+    def run(self):
+        print(f"🚀 Starting Claude Cache Daemon ({self.processes} workers)...")
+        
+        daemon = self.daemon
+        self._sockets, endpoints = daemon.bind_sockets(tcp=daemon.tcp and not hasattr(socket, 'SO_REUSEPORT'))
+        if daemon.tcp and hasattr(socket, 'SO_REUSEPORT'):
+            endpoints.append(f"127.0.0.1:{daemon.port} (SO_REUSEPORT)")
+        daemon._write_pid_file()
+        
+        signal.signal(signal.SIGTERM, self._signal_handler)
+        signal.signal(signal.SIGINT, self._signal_handler)
+        
+        for slot in range(self.processes):
+            self._spawn(slot)
+        print(f"✅ Cache daemon listening on {', '.join(endpoints)} (PID: {os.getpid()})")
+        
+        try:
+            self._supervise()
+        finally:
+            for sock in self._sockets:
+                sock.close()
+            daemon.cleanup()
+    
+    def _supervise(self):
+        """Reap workers until shutdown, replacing any that exit meanwhile"""
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            slot, started = self.children.pop(pid, (None, 0.0))
+            if slot is None or self.stopping:
+                continue
+            
+            code = os.waitstatus_to_exitcode(status)
+            if time.time() - started < self.MIN_UPTIME:
+                self.failures[slot] += 1
+            else:
+                self.failures[slot] = 0
+            delay = min(self.MAX_BACKOFF, 0.5 * 2 ** (self.failures[slot] - 1)) if self.failures[slot] else 0.0
+            print(f"💥 Worker {slot} (PID {pid}) exited with status {code}, restarting in {delay:.1f}s")
+            
+            deadline = time.time() + delay
+            while not self.stopping and time.time() < deadline:
+                time.sleep(0.1)
+            if not self.stopping:
+                self._spawn(slot)
+    
+    def _spawn(self, slot: int):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = (slot, time.time())
+            return
+        
+        # Worker process: never return into the supervisor's code
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        self.children = {}
+        code = 1
+        try:
+            asyncio.run(self.daemon.run_worker(slot, self._sockets, self._generation))
+            code = 0
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 0
+        except BaseException as e:
+            logger.error(f"Worker {slot} failed: {e}")
+        finally:
+            sys.stdout.flush()
+            os._exit(code)
+    
+    def _signal_handler(self, signum, frame):
+        """Stop restarting and pass the signal on to the workers"""
+        if not self.stopping:
+            print(f"\n💀 Received signal {signum}, shutting down {len(self.children)} workers...")
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
 class CacheClient:
-    """Ultra-fast client for daemon communication"""
+    """Ultra-fast client for daemon communication
     
-    def __init__(self, port: int = 19847):
-        self.port = port
+    Keeps one connection open and multiplexes calls over it: each request
+    gets an id, a background task routes response frames back to the
+    waiting caller, so concurrent calls pipeline instead of queueing.
+    """
+    
+    def __init__(self, port: Optional[int] = 19847, socket_path: str = None, binary: bool = True):
+        self.port = port  # None: Unix socket only
+        self.binary = binary  # False speaks the JSON framing only
+        self.socket_path = socket_path or str(DEFAULT_SOCKET_PATH)
         self.daemon_pid_file = Path.home() / ".claude" / "cache_daemon.pid"
+        self._reader = None
+        self._writer = None
+        self._receiver = None
+        self._pending: Dict[int, asyncio.Queue] = {}
+        self._next_id = 0
+        self._connect_lock = None
     
     def is_daemon_running(self) -> bool:
         """Check if daemon is running"""
@@ -148,32 +830,144 @@ class CacheClient:
         except (OSError, ValueError):
             return False
     
-    async def send_request(self, tool: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Send request to daemon with minimal overhead"""
+    async def connect(self):
+        """Open the shared connection if it isn't already"""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            self._reader, self._writer = await self._open()
+            self._receiver = asyncio.create_task(self._receive(self._reader))
+    
+    async def _open(self):
+        """Prefer the daemon's Unix socket; fall back to TCP unless port is None"""
+        if hasattr(socket, 'AF_UNIX') and (self.port is None or os.path.exists(self.socket_path)):
+            try:
+                return await asyncio.open_unix_connection(self.socket_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                if self.port is None:
+                    raise
+        return await asyncio.open_connection('127.0.0.1', self.port)
+    
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+        if self._receiver is not None:
+            await asyncio.gather(self._receiver, return_exceptions=True)
+        self._reader = self._writer = self._receiver = None
+    
+    async def __aenter__(self):
+        await self.connect()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+    
+    async def _receive(self, reader):
+        """Route response frames to their callers until the connection ends"""
+        error = "Connection closed by daemon"
         try:
-            reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
-            
-            # Prepare request
-            request = json.dumps({'tool': tool, 'params': params}).encode('utf-8')
-            request_length = len(request).to_bytes(4, byteorder='big')
-            
-            # Send request
-            writer.write(request_length + request)
-            await writer.drain()
-            
-            # Read response
-            length_data = await reader.read(4)
-            length = int.from_bytes(length_data, byteorder='big')
-            response_data = await reader.read(length)
-            
-            writer.close()
-            await writer.wait_closed()
-            
-            return json.loads(response_data.decode('utf-8'))
-            
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                queue = self._pending.get(frame.meta.get('id'))
+                if queue is not None:
+                    queue.put_nowait(frame)
+                elif frame.meta.get('id') is None and not frame.meta.get('success', True):
+                    error = frame.meta.get('error') or error
+                    break
+        except (ProtocolError, ConnectionError) as e:
+            error = str(e)
+        finally:
+            self._writer = None
+            # Fail everything still waiting on this connection
+            for queue in self._pending.values():
+                queue.put_nowait(Frame({'success': False, 'error': f"Communication error: {error}", 'more': False}))
+    
+    async def _send(self, tool: str, params: Dict[str, Any]) -> Tuple[int, asyncio.Queue]:
+        await self.connect()
+        self._next_id += 1
+        request_id = self._next_id
+        queue = asyncio.Queue()
+        self._pending[request_id] = queue
+        try:
+            await self._write_request({'id': request_id, 'tool': tool, 'params': params})
+        except Exception:
+            del self._pending[request_id]
+            raise
+        return request_id, queue
+    
+    async def _write_request(self, request: Dict[str, Any]):
+        if self.binary:
+            self._writer.writelines(encode_binary_frame(request))
+        else:
+            self._writer.write(encode_frame(request))
+        await self._writer.drain()
+    
+    async def send_request(self, tool: str, params: Dict[str, Any], decode: bool = True) -> Dict[str, Any]:
+        """Send request to daemon with minimal overhead
+        
+        With decode=False, raw payloads (file content) are returned as
+        bytes instead of being decoded to str.
+        """
+        try:
+            request_id, queue = await self._send(tool, params)
+            try:
+                return unpack_response(await queue.get(), decode)
+            finally:
+                self._pending.pop(request_id, None)
         except Exception as e:
             return {'success': False, 'error': f"Communication error: {e}"}
     
+    async def subscribe(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream progress snapshots of a warm job until it finishes"""
+        request_id, queue = await self._send('warm_subscribe', {'job_id': job_id})
+        try:
+            while True:
+                response = unpack_response(await queue.get())
+                yield response
+                if not response.get('more'):
+                    return
+        finally:
+            self._pending.pop(request_id, None)
+    
+    async def stream_file(self, file_path: str, start_line: Optional[int] = None, end_line: Optional[int] = None,
+                          chunk_size: Optional[int] = None, max_bytes: Optional[int] = None,
+                          decode: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a file's content in chunk responses, then a final summary.
+        
+        Chunks arrive as the daemon decompresses them; ``data['content']``
+        is bytes (str with decode=True). Leaving the loop early cancels
+        the read on the daemon so the rest of the file is never produced.
+        """
+        params = {'file_path': os.path.abspath(file_path), 'start_line': start_line, 'end_line': end_line,
+                  'chunk_size': chunk_size, 'max_bytes': max_bytes}
+        request_id, queue = await self._send('cache_read', params)
+        finished = False
+        try:
+            while True:
+                response = unpack_response(await queue.get(), decode)
+                content = (response.get('data') or {}).get('content')
+                if isinstance(content, str) and not decode:
+                    response['data']['content'] = content.encode('utf-8')  # JSON framing
+                finished = not response.get('more')
+                yield response
+                if finished:
+                    return
+        finally:
+            self._pending.pop(request_id, None)
+            if not finished and self._writer is not None:
+                try:
+                    await self._write_request({'tool': 'cancel', 'params': {'request_id': request_id}})
+                except ConnectionError:
+                    pass
+    
     def start_daemon_if_needed(self) -> bool:
         """Start daemon if not running"""
         if self.is_daemon_running():
@@ -208,16 +1002,26 @@ async def fast_cache_command(command: str, *args) -> Dict[str, Any]:
     # Map commands to tools
     command_map = {
         'warm': ('cache_warm', {'patterns': list(args)}),
+        'profile': ('cache_warm_profile', {
+            'profile': args[0] if args else None,
+            'profiles_file': str(Path(args[1]).resolve()) if len(args) > 1 else None
+        }),
         'stats': ('cache_stats', {}),
         'health': ('cache_health', {}),
-        'clear': ('cache_clear', {'confirm': '--confirm' in args})
+        'clear': ('cache_clear', {'confirm': '--confirm' in args}),
+        'submit': ('warm_submit', {'kind': 'patterns', 'patterns': list(args)}),
+        'jobs': ('warm_status', {'job_id': args[0] if args else None}),
+        'cancel': ('warm_cancel', {'job_id': args[0] if args else ''})
     }
     
     if command not in command_map:
         return {'success': False, 'error': f'Unknown command: {command}'}
     
     tool, params = command_map[command]
-    return await client.send_request(tool, params)
+    try:
+        return await client.send_request(tool, params)
+    finally:
+        await client.close()
 
 def main():
     """Main CLI entry point"""
@@ -229,15 +1033,26 @@ USAGE:
     python claude_cache_daemon.py <command> [args]
 
 COMMANDS:
-    --daemon                Start daemon mode
+    --daemon [--tcp] [--port N] [--processes N|auto]
+                            Start daemon mode (Unix socket; --tcp adds 127.0.0.1:N;
+                            --processes pre-forks N workers, auto = one per CPU)
     warm <patterns>         Warm cache with patterns
+    profile <name> [file]   Warm a named profile (default file: cache config/profiles.json)
     stats                   Show cache statistics  
     health                  Health check
     clear --confirm         Clear cache
+    submit <patterns>       Start a background warm job
+    jobs [job_id]           Show warm job status and throughput
+    watch <job_id>          Stream a warm job's progress
+    cancel <job_id>         Cancel a warm job
+    read <file> [start] [end]
+                            Stream a file (or lines start..end) to stdout
+    ping [count]            Measure IPC round-trip time
     stop                    Stop daemon
 
 EXAMPLES:
     claude_cache_daemon.py warm "*.py" "*.js"
+    claude_cache_daemon.py profile krushr warm-profiles.json
     claude_cache_daemon.py stats
     claude_cache_daemon.py health
 """)
@@ -246,9 +1061,12 @@ EXAMPLES:
     command = sys.argv[1]
     
     if command == '--daemon':
-        # Run as daemon
-        daemon = CacheDaemon()
-        asyncio.run(daemon.start_daemon())
+        # Run as daemon; --tcp also listens on 127.0.0.1:<port>
+        port = int(sys.argv[sys.argv.index('--port') + 1]) if '--port' in sys.argv else 19847
+        processes = sys.argv[sys.argv.index('--processes') + 1] if '--processes' in sys.argv else '1'
+        processes = (os.cpu_count() or 1) if processes == 'auto' else int(processes)
+        daemon = CacheDaemon(port=port, tcp='--tcp' in sys.argv, processes=processes)
+        daemon.run()
     
     elif command == 'stop':
         # Stop daemon
@@ -261,6 +1079,55 @@ EXAMPLES:
         else:
             print("❌ Daemon not running")
     
+    elif command == 'watch':
+        async def watch(job_id: str):
+            async with CacheClient() as client:
+                async for response in client.subscribe(job_id):
+                    if not response.get('success'):
+                        print(f"❌ Error: {response.get('error', 'Unknown error')}")
+                        return
+                    job = response['data']
+                    summary = job['summary']
+                    print(f"   [{job['state']}] {summary['files_cached']} cached / {summary['files_seen']} seen, "
+                          f"{summary['files_per_second']:.1f} files/s, {summary['elapsed']:.1f}s")
+        
+        if len(sys.argv) < 3:
+            print("❌ Usage: watch <job_id>")
+        else:
+            asyncio.run(watch(sys.argv[2]))
+    
+    elif command == 'read':
+        async def read(file_path: str, start_line: Optional[int], end_line: Optional[int]):
+            async with CacheClient() as client:
+                async for response in client.stream_file(file_path, start_line, end_line):
+                    if not response.get('success'):
+                        print(f"❌ Error: {response.get('error', 'Unknown error')}", file=sys.stderr)
+                        return
+                    if response.get('more'):
+                        sys.stdout.buffer.write(response['data']['content'])
+            sys.stdout.flush()
+        
+        if len(sys.argv) < 3:
+            print("❌ Usage: read <file> [start_line] [end_line]")
+        else:
+            lines = [int(arg) for arg in sys.argv[3:5]]
+            asyncio.run(read(sys.argv[2], *(lines + [None, None])[:2]))
+    
+    elif command == 'ping':
+        async def ping(count: int):
+            async with CacheClient() as client:
+                start = time.perf_counter()
+                for _ in range(count):
+                    await client.send_request('ping', {})
+                sequential = (time.perf_counter() - start) / count
+                
+                start = time.perf_counter()
+                await asyncio.gather(*(client.send_request('ping', {}) for _ in range(count)))
+                pipelined = (time.perf_counter() - start) / count
+            print(f"   Round trip: {sequential * 1e6:.0f}µs sequential, {pipelined * 1e6:.0f}µs pipelined ({count} calls)")
+        
+        asyncio.run(ping(int(sys.argv[2]) if len(sys.argv) > 2 else 1000))
+    
     else:
         # Execute command via daemon
         start_time = time.time()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Claude Cache Eviction Engine
+Enforces the on-disk budget and TTLs from policies.json in the background
+"""
+
+import time
+import heapq
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EvictionEngine:
+    """Background disk-budget and TTL enforcement for ClaudeCache.
+
+    Victims are chosen incrementally: each round pages through the index
+    in eviction order, scores a bounded window of candidates and evicts
+    the cheapest ones with one batched DELETE followed by batched unlinks
+    outside the database lock.
+
+    Supported policies:
+        gdsf       Greedy-Dual-Size-Frequency: H = L + freq * cost / size,
+                   with cost the path's priority. H is stored per entry
+                   (``gdsf_h``, indexed) and entries are evicted lowest H
+                   first; L becomes the H of the last victim and persists
+                   in ``eviction_state``, so entries not touched since
+                   earlier evictions age relative to newer ones.
+        lfu-aging  access_count decayed by a half-life, weighted by priority,
+                   over windows paged coldest-first by ``last_accessed``
+
+    Priorities, per-path TTLs and pinning come from the cache's PolicyEngine.
+    """
+
+    POLICIES = ('gdsf', 'lfu-aging')
+
+    def __init__(self, cache):
+        self.cache = cache
+        settings = cache.policies.get("eviction", {})
+
+        self.enabled = settings.get("enabled", True)
+        self.policy = settings.get("policy", "gdsf").lower()
+        if self.policy not in self.POLICIES:
+            logger.warning(f"Unknown eviction policy {self.policy}, using gdsf")
+            self.policy = "gdsf"
+
+        self.max_disk_usage = cache._parse_size(settings.get("maxDiskUsage", "1GB"))
+        # Evict down to the low watermark so we don't run on every insert
+        self.low_watermark = int(self.max_disk_usage * float(settings.get("lowWatermark", 0.9)))
+        self.interval = cache._parse_duration(settings.get("interval", "10m")) or 600
+        self.batch_size = int(settings.get("batchSize", 256))
+        self.window_size = int(settings.get("candidateWindow", self.batch_size * 4))
+        self.half_life = cache._parse_duration(settings.get("halfLife", "7d")) or 7 * 86400
+
+        # Global TTL from config; per-path TTLs are resolved by the policy engine
+        max_age = cache.config.get("security", {}).get("maxCacheAge")
+        self.max_age = cache._parse_duration(max_age) if max_age else 0
+
+        # GDSF inflation value L (H of the last evicted entry), loaded per run
+        self._inflation = 0.0
+        self._run_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            'runs': 0,
+            'expired': 0,
+            'evicted': 0,
+            'bytes_freed': 0,
+            'last_run': 0.0
+        }
+
+    def start(self):
+        """Start the background eviction thread"""
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run_loop, name="cache-eviction", daemon=True)
+        self._thread.start()
+        logger.debug(f"Eviction engine started ({self.policy}, budget {self.max_disk_usage / 1024 / 1024:.0f}MB)")
+
+    def stop(self):
+        """Stop the background eviction thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run_loop(self):
+        # Dedicated thread, so its lowered priority affects nothing else
+        self.cache._throttle.enter_background()
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.run_once(blocking=False)
+            except Exception as e:
+                logger.error(f"Eviction run failed: {e}")
+
+    def run_once(self, blocking: bool = True) -> Optional[Dict[str, Any]]:
+        """Expire stale entries, then evict until under the disk budget.
+
+        Only one process sharing the store evicts at a time; with
+        blocking=False the run is skipped (None) if another one is at it.
+        """
+        with self._run_lock, self.cache.store.lock('maintenance', blocking) as acquired:
+            if not acquired:
+                return None
+            start_time = time.time()
+            # Rank on up-to-date hit counts
+            self.cache.flush_access()
+            if self.policy == 'gdsf':
+                self._assign_gdsf_values()
+            expired, expired_bytes = self._expire_entries()
+            evicted, evicted_bytes = self._enforce_budget()
+
+            self.stats['runs'] += 1
+            self.stats['expired'] += expired
+            self.stats['evicted'] += evicted
+            self.stats['bytes_freed'] += expired_bytes + evicted_bytes
+            self.stats['last_run'] = time.time()
+
+            if expired or evicted:
+                logger.info(f"Eviction: expired {expired}, evicted {evicted}, "
+                            f"freed {(expired_bytes + evicted_bytes) / 1024 / 1024:.1f}MB "
+                            f"in {time.time() - start_time:.3f}s")
+
+            return {
+                'expired': expired,
+                'evicted': evicted,
+                'bytes_freed': expired_bytes + evicted_bytes,
+                'disk_usage': self.disk_usage(),
+                'disk_budget': self.max_disk_usage,
+                'total_time': time.time() - start_time
+            }
+
+    def disk_usage(self) -> int:
+        """Bytes of blob storage accounted for by the index"""
+        with self.cache._get_db_connection() as conn:
+            cursor = conn.execute(f'SELECT SUM({self._STORED_SIZE}) AS total FROM cache_entries')
+            return cursor.fetchone()['total'] or 0
+
+    # Legacy rows predate stored_size and only know the original size
+    _STORED_SIZE = 'CASE WHEN stored_size > 0 THEN stored_size ELSE size END'
+
+    def _expire_entries(self) -> Tuple[int, int]:
+        """Remove entries older than maxCacheAge or a matching per-glob TTL"""
+        now = time.time()
+        ttls = [ttl for ttl in (self.max_age, self.cache.policy_engine.min_ttl) if ttl]
+        if not ttls:
+            return 0, 0
+
+        # Only rows older than the shortest TTL can possibly be expired
+        cutoff = now - min(ttls)
+        expired = []
+        with self.cache._get_db_connection() as conn:
+            cursor = conn.execute(f'''
+                SELECT path, content_path, cached_time, {self._STORED_SIZE} AS stored
+                FROM cache_entries WHERE cached_time < ?
+            ''', (cutoff,))
+            for row in cursor:
+                policy = self.cache.policy_for(row['path'])
+                if policy.pinned:
+                    continue
+                age = now - row['cached_time']
+                if (self.max_age and age > self.max_age) or (policy.ttl and age > policy.ttl):
+                    expired.append((row['path'], row['content_path'], row['stored']))
+
+        freed = 0
+        for i in range(0, len(expired), self.batch_size):
+            freed += self._remove_entries(expired[i:i + self.batch_size])
+        return len(expired), freed
+
+    def _assign_gdsf_values(self):
+        """Set H = L + freq * cost / size on entries inserted or hit since the last run.
+        
+        Hits and inserts reset gdsf_h to NULL instead of computing it on
+        the read path. L only changes during eviction runs, which flush
+        pending hits first, so filling H in here gives the same value it
+        would have had at access time.
+        """
+        with self.cache._get_db_connection() as conn:
+            row = conn.execute('SELECT inflation FROM eviction_state WHERE id = 0').fetchone()
+            self._inflation = row['inflation'] if row else 0.0
+            rows = conn.execute(f'''
+                SELECT path, access_count, {self._STORED_SIZE} AS stored
+                FROM cache_entries WHERE gdsf_h IS NULL
+            ''').fetchall()
+            if rows:
+                conn.executemany('UPDATE cache_entries SET gdsf_h = ? WHERE path = ?', [
+                    (self._inflation + self._score(dict(row), 0.0), row['path']) for row in rows
+                ])
+
+    def _save_inflation(self):
+        with self.cache._get_db_connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO eviction_state (id, inflation) VALUES (0, ?)', (self._inflation,))
+
+    def _enforce_budget(self) -> Tuple[int, int]:
+        """Evict lowest-value entries until usage drops below the low watermark"""
+        usage = self.disk_usage()
+        if usage <= self.max_disk_usage:
+            return 0, 0
+
+        evicted = 0
+        freed = 0
+        order_key = 'gdsf_h' if self.policy == 'gdsf' else 'last_accessed'
+        last_key = -1.0
+        last_path = ''
+        while usage - freed > self.low_watermark:
+            window = self._fetch_window(order_key, last_key, last_path)
+            if not window:
+                break
+            last_key = window[-1][order_key]
+            last_path = window[-1]['path']
+
+            victims = self._select_victims(window, usage - freed - self.low_watermark)
+            if not victims:
+                continue
+            freed += self._remove_entries(victims)
+            evicted += len(victims)
+
+        if evicted and self.policy == 'gdsf':
+            self._save_inflation()
+        return evicted, freed
+
+    def _fetch_window(self, order_key: str, after_key: float, after_path: str) -> List[Dict[str, Any]]:
+        """Page through the index in (order_key, path) order using keyset pagination"""
+        with self.cache._get_db_connection() as conn:
+            cursor = conn.execute(f'''
+                SELECT path, content_path, access_count, last_accessed, gdsf_h, size,
+                       {self._STORED_SIZE} AS stored
+                FROM cache_entries
+                WHERE {order_key} > ? OR ({order_key} = ? AND path > ?)
+                ORDER BY {order_key}, path
+                LIMIT ?
+            ''', (after_key, after_key, after_path, self.window_size))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def _score(self, entry: Dict[str, Any], now: float) -> float:
+        """Value of keeping an entry; the lowest scores are evicted first.
+
+        For gdsf this is freq * cost / size, the part of H added to L.
+        """
+        priority = max(1, self.cache.policy_for(entry['path']).priority)
+        frequency = max(1, entry['access_count'] or 0)
+        size = max(1, entry['stored'] or 0)
+
+        if self.policy == 'lfu-aging':
+            age = max(0.0, now - (entry['last_accessed'] or 0))
+            return frequency * (0.5 ** (age / self.half_life)) * priority
+
+        return frequency * priority / size
+
+    def _select_victims(self, window: List[Dict[str, Any]], bytes_needed: int) -> List[Tuple[str, str, int]]:
+        """Pick the cheapest entries in the window covering bytes_needed"""
+        now = time.time()
+        heap = [
+            (entry['gdsf_h'] if self.policy == 'gdsf' else self._score(entry, now), entry['path'], entry)
+            for entry in window
+            if not self.cache.policy_for(entry['path']).pinned
+        ]
+        heapq.heapify(heap)
+
+        victims = []
+        freed = 0
+        while heap and freed < bytes_needed and len(victims) < self.batch_size:
+            score, _, entry = heapq.heappop(heap)
+            victims.append((entry['path'], entry['content_path'], entry['stored']))
+            freed += entry['stored']
+            if self.policy == 'gdsf':
+                self._inflation = score
+        return victims
+
+    def _remove_entries(self, entries: List[Tuple[str, str, int]]) -> int:
+        """Delete index rows in one statement, then unlink unreferenced blobs"""
+        if not entries:
+            return 0
+
+        paths = [path for path, _, _ in entries]
+        with self.cache._get_db_connection() as conn:
+            conn.executemany('DELETE FROM cache_entries WHERE path = ?', [(p,) for p in paths])
+
+        # Unlinks are background I/O and yield to interactive reads
+        self.cache._throttle.acquire(files=len(entries))
+
+        # Blobs are content-addressed and may back other paths, including ones
+        # re-ingested during the sleep above: the store re-checks under its lock
+        with self.cache._get_read_connection() as conn:
+            self.cache.store.unlink_unreferenced(conn, [content_path for _, content_path, _ in entries])
+        return sum(stored for _, _, stored in entries)
+
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Claude Cache Path Filter
+Precompiled allow-list and include/exclude matching for hot warm loops
+"""
+
+import os
+import re
+from threading import Lock
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from cachetools import LRUCache
+
+from claude_cache_policy import glob_to_regex
+
+
+class PathFilter:
+    """Compiled form of the path security and fileCache filtering rules.
+
+    Allowed roots are resolved once, every exclude glob is folded into a
+    single regex, and the resolved verdict for each directory is memoized
+    so validating a file costs a dict lookup plus one ``lstat``.
+    """
+
+    # Rejection reasons returned by check()
+    TOO_LARGE = 'too_large'
+    EXCLUDED = 'excluded'
+    EXTENSION = 'extension'
+
+    def __init__(self, allowed_dirs: List[str], file_cache_config: Dict[str, Any],
+                 parse_size: Callable[[str], int], max_dirs: int = 16384):
+        self.allowed_roots: Tuple[str, ...] = tuple(
+            os.path.realpath(os.path.expanduser(d)) for d in allowed_dirs
+        )
+        self.max_file_size = parse_size(file_cache_config.get("maxFileSize", "10MB"))
+        self.extensions = frozenset(e.lower() for e in file_cache_config.get("extensions", []))
+
+        exclude_patterns = file_cache_config.get("excludePatterns", [])
+        self._exclude = None
+        if exclude_patterns:
+            self._exclude = re.compile('|'.join(f'(?:{glob_to_regex(p)})' for p in exclude_patterns))
+
+        self._dir_verdicts = LRUCache(maxsize=max_dirs)
+        self._dir_excluded = LRUCache(maxsize=max_dirs)
+        self._lock = Lock()
+
+    def _within_roots(self, real_path: str) -> bool:
+        for root in self.allowed_roots:
+            if real_path == root or real_path.startswith(root.rstrip(os.sep) + os.sep):
+                return True
+        return False
+
+    def _directory_allowed(self, directory: str) -> bool:
+        """Memoized resolve-and-check of a directory"""
+        with self._lock:
+            verdict = self._dir_verdicts.get(directory)
+        if verdict is None:
+            verdict = self._within_roots(os.path.realpath(directory))
+            with self._lock:
+                self._dir_verdicts[directory] = verdict
+        return verdict
+
+    def is_allowed(self, file_path: str, is_symlink: Optional[bool] = None) -> bool:
+        """Whether file_path resolves inside an allowed root.
+
+        Pass ``is_symlink`` when it is already known (e.g. from a DirEntry)
+        to skip the ``lstat``.
+        """
+        abs_path = os.path.abspath(file_path)
+        if is_symlink is None:
+            is_symlink = os.path.islink(abs_path)
+        if is_symlink:
+            # The link target decides, wherever the link itself lives
+            return self._within_roots(os.path.realpath(abs_path))
+        return self._directory_allowed(os.path.dirname(abs_path))
+
+    def is_excluded(self, file_path: str) -> bool:
+        """Whether file_path matches an exclude glob"""
+        return self._exclude is not None and self._exclude.match(file_path) is not None
+
+    def is_directory_excluded(self, directory: str) -> bool:
+        """Whether everything under directory is excluded (used to prune walks)"""
+        if self._exclude is None:
+            return False
+        with self._lock:
+            verdict = self._dir_excluded.get(directory)
+        if verdict is None:
+            verdict = self._exclude.match(directory.rstrip(os.sep) + os.sep) is not None
+            with self._lock:
+                self._dir_excluded[directory] = verdict
+        return verdict
+
+    def check(self, file_path: str, size: Optional[int] = None) -> Optional[str]:
+        """Return the reason file_path is not cacheable, or None if it is.
+
+        String checks run first; ``size`` is only compared when given.
+        """
+        if self.extensions and os.path.splitext(file_path)[1].lower() not in self.extensions:
+            return self.EXTENSION
+        if self.is_excluded(file_path):
+            return self.EXCLUDED
+        if size is not None and size > self.max_file_size:
+            return self.TOO_LARGE
+        return None
+
+    def clear(self):
+        """Drop memoized directory verdicts"""
+        with self._lock:
+            self._dir_verdicts.clear()
+            self._dir_excluded.clear()
+
+
+class NegativeCache:
+    """Bounded cache of paths known to be missing, denied or not cacheable.
+
+    Entries are validated against a stat stamp rather than a timer:
+    missing and denied paths are keyed on the ``mtime`` of their nearest
+    existing ancestor directory (creating, deleting or re-linking a file
+    bumps it), non-cacheable files on their own ``mtime`` and size.
+    """
+
+    MISSING = 'missing'
+    DENIED = 'denied'
+    NOT_CACHEABLE = 'not_cacheable'
+
+    def __init__(self, max_entries: int = 4096):
+        self._entries = LRUCache(maxsize=max_entries)
+        self._lock = Lock()
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _directory_stamp(self, file_path: str) -> Tuple[str, Optional[Tuple[int, int]]]:
+        """Stamp of the nearest existing ancestor directory"""
+        directory = os.path.dirname(os.path.abspath(file_path))
+        while True:
+            stamp = self._stamp(directory)
+            parent = os.path.dirname(directory)
+            if stamp is not None or parent == directory:
+                return directory, stamp
+            directory = parent
+
+    def add(self, file_path: str, reason: str):
+        """Remember that file_path was rejected for reason"""
+        if reason == self.NOT_CACHEABLE:
+            stamp_path, stamp = file_path, self._stamp(file_path)
+        else:
+            stamp_path, stamp = self._directory_stamp(file_path)
+        if stamp is None:
+            return
+        with self._lock:
+            self._entries[file_path] = (reason, stamp_path, stamp)
+
+    def get(self, file_path: str) -> Optional[str]:
+        """Return the cached rejection reason if it is still valid"""
+        with self._lock:
+            entry = self._entries.get(file_path)
+        if entry is None:
+            return None
+
+        reason, stamp_path, stamp = entry
+        if self._stamp(stamp_path) == stamp:
+            return reason
+
+        self.discard(file_path)
+        return None
+
+    def discard(self, file_path: str):
+        with self._lock:
+            self._entries.pop(file_path, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
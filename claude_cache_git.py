@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Claude Cache Git Index Source
+Enumerates tracked files and detects modifications straight from .git/index
+"""
+
+import os
+import re
+import stat
+import struct
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from claude_cache_policy import glob_to_regex
+from claude_cache_walker import WalkEntry, WalkRoot
+
+_HEADER = struct.Struct('>4sLL')
+# ctime s/ns, mtime s/ns, dev, ino, mode, uid, gid, size
+_STAT = struct.Struct('>10L')
+
+_FLAG_ASSUME_VALID = 0x8000
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE_SHIFT = 12
+_EXT_FLAG_SKIP_WORKTREE = 0x4000
+
+_S_IFGITLINK = 0o160000
+
+
+class GitIndexError(Exception):
+    """The index is missing, corrupt or in a layout we do not read"""
+
+
+class GitIndexEntry(NamedTuple):
+    """One tracked path with the stat data git cached for it"""
+    path: str
+    mode: int
+    size: int
+    mtime: Tuple[int, int]
+    ctime: Tuple[int, int]
+    ino: int
+    stage: int
+    assume_valid: bool
+    skip_worktree: bool
+
+
+def find_repository(path: str) -> Optional[Tuple[str, str]]:
+    """Return (work tree, git dir) for the repository containing path"""
+    directory = os.path.abspath(path)
+    while True:
+        dot_git = os.path.join(directory, '.git')
+        if os.path.isdir(dot_git):
+            return directory, dot_git
+        if os.path.isfile(dot_git):
+            # Linked worktrees and submodules: ".git" is a "gitdir: <path>" file
+            try:
+                with open(dot_git, 'r') as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if line.startswith('gitdir:'):
+                git_dir = line[len('gitdir:'):].strip()
+                return directory, os.path.normpath(os.path.join(directory, git_dir))
+            return None
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def _hash_size(git_dir: str) -> int:
+    """20 for SHA-1 repositories, 32 for extensions.objectFormat = sha256"""
+    config_dirs = [git_dir]
+    try:
+        # Linked worktrees keep their config in the common git dir
+        with open(os.path.join(git_dir, 'commondir'), 'r') as f:
+            config_dirs.append(os.path.normpath(os.path.join(git_dir, f.read().strip())))
+    except OSError:
+        pass
+    for config_dir in config_dirs:
+        try:
+            with open(os.path.join(config_dir, 'config'), 'r') as f:
+                if re.search(r'^\s*objectformat\s*=\s*sha256\s*$', f.read(), re.IGNORECASE | re.MULTILINE):
+                    return 32
+        except OSError:
+            continue
+    return 20
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Git's offset varint used by index v4 path compression"""
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset
+
+
+def read_git_index(index_path: str, hash_size: int = 20) -> List[GitIndexEntry]:
+    """Parse a version 2, 3 or 4 index file.
+
+    Split indexes (``link`` extension) only hold a delta against a shared
+    index and are rejected, as are sparse indexes with directory entries;
+    callers fall back to walking the tree.
+    """
+    try:
+        with open(index_path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        raise GitIndexError(f"Cannot read {index_path}: {e}")
+
+    if len(data) < _HEADER.size + hash_size:
+        raise GitIndexError(f"{index_path} is truncated")
+    signature, version, count = _HEADER.unpack_from(data, 0)
+    if signature != b'DIRC':
+        raise GitIndexError(f"{index_path} is not a git index")
+    if version not in (2, 3, 4):
+        raise GitIndexError(f"Unsupported index version {version}")
+
+    entries = []
+    offset = _HEADER.size
+    previous = b''
+    end = len(data) - hash_size
+    try:
+        for _ in range(count):
+            start = offset
+            (ctime_s, ctime_ns, mtime_s, mtime_ns, _dev, ino,
+             mode, _uid, _gid, size) = _STAT.unpack_from(data, offset)
+            offset += _STAT.size + hash_size
+            flags, = struct.unpack_from('>H', data, offset)
+            offset += 2
+            extended = 0
+            if flags & _FLAG_EXTENDED and version >= 3:
+                extended, = struct.unpack_from('>H', data, offset)
+                offset += 2
+
+            if version == 4:
+                strip, offset = _read_varint(data, offset)
+                nul = data.index(b'\0', offset)
+                name = previous[:len(previous) - strip] + data[offset:nul]
+                offset = nul + 1
+            else:
+                nul = data.index(b'\0', offset)
+                name = data[offset:nul]
+                # Entries are NUL-padded to a multiple of 8 bytes
+                offset = start + ((nul - start + 8) & ~7)
+            previous = name
+
+            if stat.S_ISDIR(mode):
+                raise GitIndexError("Sparse index directory entries are not supported")
+            entries.append(GitIndexEntry(
+                path=name.decode('utf-8', 'surrogateescape'),
+                mode=mode,
+                size=size,
+                mtime=(mtime_s, mtime_ns),
+                ctime=(ctime_s, ctime_ns),
+                ino=ino,
+                stage=(flags >> _FLAG_STAGE_SHIFT) & 0x3,
+                assume_valid=bool(flags & _FLAG_ASSUME_VALID),
+                skip_worktree=bool(extended & _EXT_FLAG_SKIP_WORKTREE)
+            ))
+
+        while offset + 8 <= end:
+            signature, length = struct.unpack_from('>4sL', data, offset)
+            if signature == b'link':
+                raise GitIndexError("Split indexes are not supported")
+            offset += 8 + length
+    except (struct.error, ValueError, IndexError) as e:
+        raise GitIndexError(f"{index_path} is corrupt: {e}")
+
+    return entries
+
+
+class GitIndexSource:
+    """Warm source yielding tracked files straight from the git index.
+
+    Only paths listed in the index are stat'ed, so ignored directories
+    (build output, node_modules, virtualenvs) are never visited. With
+    ``modified_only`` just the files whose working-tree stat no longer
+    matches the index are yielded, using git's own racy-clean rule: an
+    entry written in the same second as the index itself counts as
+    modified.
+
+    Exposes ``roots`` and ``literals`` like TreeWalker so the cache can
+    load its index snapshot for the repository in one range query.
+    """
+
+    def __init__(self, repo_path: str, patterns: Optional[List[str]] = None, modified_only: bool = True):
+        repository = find_repository(repo_path)
+        if repository is None:
+            raise GitIndexError(f"{repo_path} is not inside a git repository")
+        self.work_tree, self.git_dir = repository
+        self.index_path = os.path.join(self.git_dir, 'index')
+        self.modified_only = modified_only
+        self.roots = [WalkRoot(self.work_tree, None)]
+        self.literals: List[str] = []
+
+        # Patterns are globs relative to the work tree
+        self._regex = None
+        if patterns:
+            self._regex = re.compile('|'.join(f'(?:{glob_to_regex(p, anchored=True)})' for p in patterns))
+
+        try:
+            index_stat = os.stat(self.index_path)
+        except OSError as e:
+            raise GitIndexError(f"Cannot stat {self.index_path}: {e}")
+        self._index_mtime = (int(index_stat.st_mtime), index_stat.st_mtime_ns % 1_000_000_000)
+        self.entries = read_git_index(self.index_path, _hash_size(self.git_dir))
+
+        self.stats = {'tracked': len(self.entries), 'modified': 0, 'racy': 0, 'missing': 0}
+
+    def _is_modified(self, entry: GitIndexEntry, st: os.stat_result) -> bool:
+        """git's ie_match_stat(), without the content comparison"""
+        if entry.assume_valid:
+            return False
+        if entry.stage:
+            return True
+        mtime = (int(st.st_mtime), st.st_mtime_ns % 1_000_000_000)
+        ctime = (int(st.st_ctime), st.st_ctime_ns % 1_000_000_000)
+        # Nanoseconds are zero when git was built without USE_NSEC
+        if mtime[0] != entry.mtime[0] or (entry.mtime[1] and mtime[1] != entry.mtime[1]):
+            return True
+        if ctime[0] != entry.ctime[0] or (entry.ctime[1] and ctime[1] != entry.ctime[1]):
+            return True
+        if st.st_size & 0xFFFFFFFF != entry.size:
+            return True
+        if entry.ino and st.st_ino & 0xFFFFFFFF != entry.ino:
+            return True
+        if entry.mtime >= self._index_mtime:
+            self.stats['racy'] += 1
+            return True
+        return False
+
+    def __iter__(self) -> Iterator[WalkEntry]:
+        seen = set()
+        for entry in self.entries:
+            if entry.skip_worktree or entry.path in seen:
+                continue
+            # Gitlinks (submodules) and symlinks are not warmed
+            if entry.mode & 0o170000 in (_S_IFGITLINK, stat.S_IFLNK):
+                continue
+            if self._regex is not None and not self._regex.match(entry.path):
+                continue
+            # Unmerged paths appear once per stage
+            seen.add(entry.path)
+
+            path = os.path.join(self.work_tree, entry.path)
+            try:
+                st = os.lstat(path)
+            except OSError:
+                self.stats['missing'] += 1
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            if self.modified_only:
+                if not self._is_modified(entry, st):
+                    continue
+                self.stats['modified'] += 1
+            yield WalkEntry(path, st.st_size, st.st_mtime, False)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Claude Cache Zero-Copy Ingest
+Stores raw blobs with reflink/copy_file_range, hashing from an mmap
+"""
+
+import os
+import mmap
+import errno
+import shutil
+import hashlib
+import threading
+from typing import Callable, NamedTuple, Optional
+
+from claude_cache_pagecache import HAVE_FADVISE, advise, resident_pages
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# _IOW(0x94, 9, int): share extents with the source on btrfs/xfs
+FICLONE = 0x40049409
+
+# Errors meaning "this filesystem or kernel can't do it", not "the copy failed"
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL, errno.ENOTTY}
+
+
+class IngestResult(NamedTuple):
+    """A raw blob stored for a source file"""
+    checksum: str
+    content_path: str
+    size: int
+    method: str
+
+
+class SourceChanged(Exception):
+    """The source file was modified while it was being ingested"""
+
+
+def hash_fd(fd: int, size: int, algorithm: str = "sha256") -> str:
+    """Hash an open file through an mmap, without copying it into Python bytes"""
+    hasher = hashlib.new(algorithm)
+    if size > 0:
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            hasher.update(mapped)
+    return hasher.hexdigest()
+
+
+def copy_fd(src_fd: int, dst_fd: int, size: int) -> str:
+    """Copy size bytes between files in the kernel; returns the method used.
+
+    Tries a FICLONE reflink (no data copied at all), then copy_file_range,
+    then sendfile, and only falls back to a userspace copy when none of
+    them is supported.
+    """
+    if fcntl is not None:
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return 'reflink'
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+
+    if hasattr(os, 'copy_file_range'):
+        offset = 0
+        try:
+            while offset < size:
+                copied = os.copy_file_range(src_fd, dst_fd, size - offset, offset, offset)
+                if copied == 0:
+                    break
+                offset += copied
+            if offset == size:
+                return 'copy_file_range'
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+
+    # Start over from scratch for the remaining fallbacks
+    os.ftruncate(dst_fd, 0)
+    os.lseek(dst_fd, 0, os.SEEK_SET)
+    if hasattr(os, 'sendfile'):
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            if offset == size:
+                return 'sendfile'
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+        os.ftruncate(dst_fd, 0)
+        os.lseek(dst_fd, 0, os.SEEK_SET)
+
+    os.lseek(src_fd, 0, os.SEEK_SET)
+    with os.fdopen(os.dup(src_fd), 'rb') as src, os.fdopen(os.dup(dst_fd), 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    return 'copy'
+
+
+def ingest_raw(source_path: str, staging_dir: str, blob_path: Callable[[str], str],
+               algorithm: str = "sha256", drop_cold: bool = False) -> IngestResult:
+    """Store source_path uncompressed under its content address.
+
+    The kernel copies the source to a temp file in staging_dir (on the
+    blob store's filesystem) and it is hashed from an mmap of the same
+    open file; the temp file is then renamed to ``blob_path(checksum)``.
+    File data never passes through Python buffers. Raises SourceChanged
+    if the file was modified meanwhile.
+
+    With drop_cold, a source that had no pages cached beforehand is
+    dropped from the page cache again afterwards, as read_for_warm does.
+    """
+    with open(source_path, 'rb') as src:
+        src_fd = src.fileno()
+        before = os.fstat(src_fd)
+        size = before.st_size
+        cold = drop_cold and HAVE_FADVISE and resident_pages(src_fd, size) == 0
+
+        temp_path = os.path.join(staging_dir, f".ingest.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(temp_path, 'wb') as dst:
+                method = copy_fd(src_fd, dst.fileno(), size)
+            checksum = hash_fd(src_fd, size, algorithm)
+
+            after = os.fstat(src_fd)
+            if (after.st_size, after.st_mtime_ns) != (size, before.st_mtime_ns):
+                raise SourceChanged(source_path)
+
+            content_path = blob_path(checksum)
+            os.replace(temp_path, content_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        finally:
+            if cold:
+                advise(src_fd, os.POSIX_FADV_DONTNEED)
+
+    return IngestResult(checksum, content_path, size, method)
+
+
+def copy_file(source_path: str, dest_path: str) -> Optional[str]:
+    """Zero-copy whole-file copy to dest_path (atomic); returns the method used"""
+    temp_path = f"{dest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(source_path, 'rb') as src, open(temp_path, 'wb') as dst:
+            method = copy_fd(src.fileno(), dst.fileno(), os.fstat(src.fileno()).st_size)
+        os.replace(temp_path, dest_path)
+        return method
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
@@ -4,53 +4,181 @@ Optimized Async Cache - Reduced overhead, better performance
 """
 
 import asyncio
-import aiofiles
 import aiosqlite
+import sqlite3
 import time
 import os
-import glob
 import json
 import hashlib
 import gzip
+import logging
 from pathlib import Path
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from claude_cache_walker import TreeWalker, WalkEntry
+from claude_cache_ingest import ingest_raw
+from claude_cache_store import CacheStore, raw_metadata
+
+logger = logging.getLogger(__name__)
+
+class AIMDLimiter:
+    """Async concurrency limit that adapts to observed latency.
+    
+    Each slot returned with a latency over target halves the limit (at
+    most once per ``cooldown``); every ``limit`` on-target completions
+    raise it by one. Same AIMD shape as the background throttle, applied
+    to in-flight work instead of rates.
+    """
+    
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 64,
+                 latency_target: float = 0.05, cooldown: float = 0.5):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.active = 0
+        self.peak = 0
+        self.decreases = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+    
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+    
+    async def release(self, latency: float):
+        async with self._condition:
+            self.active -= 1
+            now = time.monotonic()
+            if latency > self.latency_target:
+                if now - self._last_decrease >= self.cooldown and self.limit > self.minimum:
+                    self.limit = max(self.minimum, self.limit // 2)
+                    self._last_decrease = now
+                    self.decreases += 1
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.limit:
+                    self._successes = 0
+                    self.limit = min(self.maximum, self.limit + 1)
+            self._condition.notify_all()
+    
+    def snapshot(self) -> Dict[str, int]:
+        return {'limit': self.limit, 'peak': self.peak, 'decreases': self.decreases}
+
+class AsyncConnectionPool:
+    """Read-only aiosqlite connections plus a single writer.
+    
+    Every aiosqlite connection runs its queries on its own thread, so one
+    shared connection serializes all traffic. Readers open the index with
+    ``mode=ro`` and ``query_only`` and are handed out from a queue; with
+    WAL they proceed in parallel with each other and with the writer.
+    Writes share one connection behind a lock, so a batch and its commit
+    never interleave with another batch.
+    """
+    
+    def __init__(self, db_file: Path, readers: int = 4):
+        self.db_file = Path(db_file)
+        self.size = max(1, readers)
+        self._readers: asyncio.Queue = asyncio.Queue()
+        self._all_readers = []
+        self._writer = None
+        self._write_lock = asyncio.Lock()
+        self.stats = {'reads': 0, 'writes': 0, 'read_waits': 0}
+    
+    async def open(self):
+        self._writer = await aiosqlite.connect(str(self.db_file), timeout=30.0)
+        await self._writer.execute("PRAGMA synchronous=NORMAL")
+        for _ in range(self.size):
+            conn = await aiosqlite.connect(f"file:{self.db_file}?mode=ro", uri=True, timeout=30.0)
+            await conn.execute("PRAGMA query_only=1")
+            self._all_readers.append(conn)
+            self._readers.put_nowait(conn)
+    
+    async def close(self):
+        for conn in self._all_readers:
+            await conn.close()
+        self._all_readers.clear()
+        if self._writer:
+            await self._writer.close()
+            self._writer = None
+    
+    @asynccontextmanager
+    async def reader(self):
+        if self._readers.empty():
+            self.stats['read_waits'] += 1
+        conn = await self._readers.get()
+        self.stats['reads'] += 1
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+    
+    @asynccontextmanager
+    async def writer(self):
+        async with self._write_lock:
+            self.stats['writes'] += 1
+            try:
+                yield self._writer
+                await self._writer.commit()
+            except Exception:
+                await self._writer.rollback()
+                raise
+    
+    async def fetchall(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        async with self.reader() as conn:
+            cursor = await conn.execute(sql, params)
+            return await cursor.fetchall()
+    
+    async def fetchone(self, sql: str, params: Tuple = ()) -> Optional[Tuple]:
+        async with self.reader() as conn:
+            cursor = await conn.execute(sql, params)
+            return await cursor.fetchone()
+    
+    def snapshot(self) -> Dict[str, int]:
+        return {'readers': self.size, 'idle_readers': self._readers.qsize(), **self.stats}
 
 class OptimizedAsyncCache:
-    """Streamlined async cache with minimal overhead"""
+    """Streamlined async cache with minimal overhead.
+    
+    Shares ``files/index.db`` and the content-addressed blob store with
+    ClaudeCache (see claude_cache_store), so files warmed by either are
+    hits for the other. New blobs are stored raw; entries are validated
+    against the source's size and mtime before being served.
+    """
     
-    def __init__(self, cache_dir: str = None):
+    def __init__(self, cache_dir: str = None, readers: int = 4):
         self.cache_dir = Path(cache_dir or os.path.expanduser("~/.claude/cache"))
-        self.db_file = self.cache_dir / "files" / "async_index.db"
-        self._db_pool = None
+        self.store = CacheStore(self.cache_dir)
+        self.db_file = self.store.db_file
+        self.content_dir = self.store.content_dir
+        self._db_pool = AsyncConnectionPool(self.db_file, readers)
         self._io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fast-io")
+        self.stats = {'hits': 0, 'misses': 0, 'errors': 0}
         
     async def __aenter__(self):
         await self._init_db()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._db_pool:
-            await self._db_pool.close()
+        await self._db_pool.close()
         self._io_executor.shutdown(wait=True)
     
     async def _init_db(self):
         """Fast database initialization"""
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        (self.cache_dir / "files").mkdir(exist_ok=True)
+        loop = asyncio.get_running_loop()
         
-        self._db_pool = await aiosqlite.connect(str(self.db_file))
-        await self._db_pool.execute("PRAGMA journal_mode=WAL")
-        await self._db_pool.execute("PRAGMA synchronous=NORMAL")
+        # Same schema as the sync cache
+        await loop.run_in_executor(self._io_executor, self.store.initialize)
         
-        await self._db_pool.execute('''
-            CREATE TABLE IF NOT EXISTS async_cache (
-                path TEXT PRIMARY KEY,
-                cached_time REAL,
-                size INTEGER
-            )
-        ''')
-        await self._db_pool.commit()
+        await self._db_pool.open()
     
     def _should_cache(self, file_path: str) -> bool:
         """Simple file filtering"""
@@ -63,78 +191,269 @@ class OptimizedAsyncCache:
         except:
             return False
     
-    async def _process_file_fast(self, file_path: str) -> Optional[Tuple[str, float, int]]:
+    def _should_cache_entry(self, entry: WalkEntry) -> bool:
+        """Same filtering as _should_cache using the walker's stat data"""
+        return (entry.size < 10 * 1024 * 1024 and  # <10MB
+                os.path.splitext(entry.path)[1] in ['.py', '.js', '.ts', '.md', '.json', '.txt'])
+    
+    def _collect_files(self, patterns: List[str]) -> List[str]:
+        """Walk all patterns at once, pruning vendored and VCS directories"""
+        return [entry.path for entry in TreeWalker(patterns) if self._should_cache_entry(entry)]
+    
+    def _ingest(self, file_path: str) -> Tuple:
+        """Store file_path raw under its checksum; returns its cache_entries row"""
+        # Every row is written here: key it the way reads look it up
+        file_path = os.path.abspath(file_path)
+        # Stat first: if the file changes after this, the recorded mtime is
+        # stale and the next read re-ingests instead of serving old content
+        file_stat = os.stat(file_path)
+        result = ingest_raw(file_path, str(self.content_dir),
+                            lambda checksum: self.store.blob_path(checksum, compressed=False))
+        now = time.time()
+        return (file_path, result.checksum, result.size, file_stat.st_mtime, now, False, 1, now,
+                result.content_path, json.dumps(raw_metadata(result.size)), result.size)
+    
+    async def _process_file_fast(self, file_path: str) -> Optional[Tuple]:
         """Minimal file processing for speed"""
         try:
-            # Fast async file read
-            async with aiofiles.open(file_path, 'rb') as f:
-                content = await f.read()
-            
-            # Store in simple cache location
-            cache_path = self.cache_dir / "files" / f"{abs(hash(file_path))}.cache"
-            
-            # Parallel write and compression
-            write_task = self._write_cache_file(cache_path, content)
-            stat_task = asyncio.get_event_loop().run_in_executor(
-                self._io_executor, os.stat, file_path
+            # Kernel-side copy (reflink/copy_file_range): content never enters the event loop
+            return await asyncio.get_running_loop().run_in_executor(
+                self._io_executor, self._ingest, file_path
             )
-            
-            await write_task
-            file_stat = await stat_task
-            
-            return (file_path, time.time(), file_stat.st_size)
-            
-        except Exception:
+        except Exception as e:
+            logger.debug(f"Failed to cache {file_path}: {e}")
             return None
     
-    async def _write_cache_file(self, cache_path: str, content: bytes):
-        """Async cache file write"""
-        async with aiofiles.open(cache_path, 'wb') as f:
-            await f.write(content)
+    async def _store_entries(self, entries: List[Tuple]) -> int:
+        """Record ingested files in the index"""
+        if not entries:
+            return 0
+        # Held only to serialize with this front-end's other writes; the rows
+        # commit under the store's blob lock, which blocks, so off the loop
+        async with self._db_pool.writer():
+            return await asyncio.get_running_loop().run_in_executor(
+                self._io_executor, self._commit_entries, entries
+            )
     
-    async def warm_cache_optimized(self, patterns: List[str]) -> Dict[str, Any]:
-        """Optimized async cache warming"""
-        start_time = time.time()
+    def _commit_entries(self, entries: List[Tuple]) -> int:
+        conn = sqlite3.connect(str(self.db_file), timeout=30.0)
+        try:
+            return self.store.commit_entries(conn, entries)
+        finally:
+            conn.close()
+    
+    async def _touch(self, file_paths: List[str]):
+        """Record hits so eviction sees files served by this front-end as warm"""
+        if not file_paths:
+            return
+        now = time.time()
+        async with self._db_pool.writer() as conn:
+            await conn.executemany(
+                'UPDATE cache_entries SET access_count = access_count + 1, last_accessed = ?, gdsf_h = NULL WHERE path = ?',
+                [(now, path) for path in file_paths]
+            )
+    
+    def _read_if_fresh(self, file_path: str, row: Optional[Tuple]) -> Optional[bytes]:
+        """The cached blob for file_path if its row still matches the source"""
+        if row is None:
+            return None
+        size, modified_time, content_path, compressed = row
+        try:
+            file_stat = os.stat(file_path)
+            if file_stat.st_size != size or file_stat.st_mtime != modified_time:
+                return None
+            with open(content_path, 'rb') as f:
+                content = f.read()
+            if compressed:
+                content = gzip.decompress(content)
+        except (OSError, EOFError):
+            return None
+        # A truncated or replaced blob is a miss, never wrong content
+        return content if len(content) == size else None
+    
+    def _read_direct(self, file_path: str) -> Optional[bytes]:
+        try:
+            with open(file_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    async def _get_file(self, file_path: str, row: Optional[Tuple]) -> Tuple[Optional[bytes], bool]:
+        """Serve file_path from its row, ingesting it on a miss; returns (content, hit)"""
+        loop = asyncio.get_running_loop()
+        content = await loop.run_in_executor(self._io_executor, self._read_if_fresh, file_path, row)
+        if content is not None:
+            self.stats['hits'] += 1
+            return content, True
+        
+        self.stats['misses'] += 1
+        if not await loop.run_in_executor(self._io_executor, self._should_cache, file_path):
+            # Serve files outside the cache policy straight from disk
+            content = await loop.run_in_executor(self._io_executor, self._read_direct, file_path)
+            return content, False
+        record = await self._process_file_fast(file_path)
+        if record is None:
+            self.stats['errors'] += 1
+            return None, False
+        await self._store_entries([record])
+        content = await loop.run_in_executor(
+            self._io_executor, self._read_if_fresh, file_path, (record[2], record[3], record[8], False)
+        )
+        return content, False
+
+    async def _lookup(self, file_paths: List[str]) -> Dict[str, Tuple[int, float, str, bool]]:
+        """Index rows for file_paths, one query per batch of 500"""
+        rows = {}
+        for start in range(0, len(file_paths), 500):
+            batch = file_paths[start:start + 500]
+            found = await self._db_pool.fetchall(
+                f'SELECT path, size, modified_time, content_path, compressed FROM cache_entries '
+                f'WHERE path IN ({",".join("?" * len(batch))})',
+                tuple(batch)
+            )
+            for path, size, modified_time, content_path, compressed in found:
+                rows[path] = (size, modified_time, content_path, bool(compressed))
+        return rows
+
+    async def get_file(self, file_path: str) -> Optional[str]:
+        """Get file content from the cache, ingesting it on a miss"""
+        content, _ = await self.get_file_with_status(file_path)
+        return content
+
+    async def get_file_with_status(self, file_path: str) -> Tuple[Optional[str], bool]:
+        """Like get_file, also reporting whether it was a cache hit"""
+        file_path = os.path.abspath(file_path)
+        rows = await self._lookup([file_path])
+        content, hit = await self._get_file(file_path, rows.get(file_path))
+        if hit:
+            await self._touch([file_path])
+        return (content.decode('utf-8', errors='replace') if content is not None else None), hit
+
+    async def get_files(self, file_paths: List[str]) -> Dict[str, Optional[str]]:
+        """Get several files with one index query; misses are ingested concurrently"""
+        file_paths = list(dict.fromkeys(os.path.abspath(p) for p in file_paths))
+        rows = await self._lookup(file_paths)
+        semaphore = asyncio.Semaphore(20)
+
+        async def fetch(file_path):
+            async with semaphore:
+                return await self._get_file(file_path, rows.get(file_path))
+
+        results = await asyncio.gather(*(fetch(p) for p in file_paths))
+        await self._touch([path for path, (_, hit) in zip(file_paths, results) if hit])
+        return {
+            path: content.decode('utf-8', errors='replace') if content is not None else None
+            for path, (content, _) in zip(file_paths, results)
+        }
+    
+    def _ingest_quiet(self, file_path: str) -> Optional[Tuple]:
+        try:
+            return self._ingest(file_path)
+        except Exception as e:
+            logger.debug(f"Failed to cache {file_path}: {e}")
+            return None
+    
+    async def warm_cache_optimized(self, patterns: List[str], max_concurrency: int = 64,
+                                   batch_size: int = 500, commit_interval: float = 1.0,
+                                   latency_target: float = 0.05) -> Dict[str, Any]:
+        """Optimized async cache warming in bounded memory.
         
-        # Collect files quickly
-        all_files = []
-        for pattern in patterns:
-            files = glob.glob(pattern, recursive='**' in pattern)
-            all_files.extend([f for f in files if self._should_cache(f)])
+        A walker thread streams matches into a bounded queue; a fixed pool
+        of consumer tasks ingests them, with the number allowed in flight
+        set by an AIMD limiter from per-MB ingest latency; a single writer
+        commits rows in rolling batches so progress is durable as it goes.
+        Nothing here grows with the number of files matched.
+        """
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
         
-        if not all_files:
-            return {'files_processed': 0, 'files_cached': 0, 'total_time': 0}
+        paths: asyncio.Queue = asyncio.Queue(maxsize=max_concurrency * 4)
+        records: asyncio.Queue = asyncio.Queue(maxsize=batch_size * 2)
+        limiter = AIMDLimiter(initial=min(8, max_concurrency), maximum=max_concurrency,
+                              latency_target=latency_target)
+        pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="fast-warm")
+        stop = threading.Event()
+        counts = {'processed': 0, 'cached': 0, 'errors': 0}
         
-        # Process files with optimal concurrency
-        semaphore = asyncio.Semaphore(min(20, len(all_files)))
+        def offer(item) -> bool:
+            # Blocks the walker thread while the queue is full (backpressure)
+            future = asyncio.run_coroutine_threadsafe(paths.put(item), loop)
+            while True:
+                try:
+                    future.result(timeout=0.5)
+                    return True
+                except FutureTimeout:
+                    if stop.is_set():
+                        future.cancel()
+                        return False
         
-        async def process_with_limit(file_path):
-            async with semaphore:
-                return await self._process_file_fast(file_path)
+        def produce():
+            try:
+                for entry in TreeWalker(patterns):
+                    if self._should_cache_entry(entry) and not offer((entry.path, entry.size)):
+                        return
+            finally:
+                for _ in range(max_concurrency):
+                    if not offer(None):
+                        break
         
-        # Execute all tasks concurrently
-        tasks = [process_with_limit(f) for f in all_files]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def consume():
+            while True:
+                item = await paths.get()
+                if item is None:
+                    return
+                file_path, size = item
+                await limiter.acquire()
+                started = time.perf_counter()
+                try:
+                    record = await loop.run_in_executor(pool, self._ingest_quiet, file_path)
+                finally:
+                    # Normalize to per-MB so large files don't read as congestion
+                    await limiter.release((time.perf_counter() - started) / max(1.0, size / (1024 * 1024)))
+                counts['processed'] += 1
+                if record is None:
+                    counts['errors'] += 1
+                else:
+                    await records.put(record)
         
-        # Batch database insert
-        successful_entries = []
-        for result in results:
-            if isinstance(result, tuple):
-                successful_entries.append(result)
+        async def write():
+            batch = []
+            last_commit = time.monotonic()
+            while True:
+                try:
+                    record = await asyncio.wait_for(records.get(), timeout=commit_interval)
+                except asyncio.TimeoutError:
+                    record = False
+                if record:
+                    batch.append(record)
+                if batch and (record is None or len(batch) >= batch_size
+                              or time.monotonic() - last_commit >= commit_interval):
+                    counts['cached'] += await self._store_entries(batch)
+                    batch = []
+                    last_commit = time.monotonic()
+                if record is None:
+                    return
         
-        if successful_entries:
-            await self._db_pool.executemany(
-                'INSERT OR REPLACE INTO async_cache (path, cached_time, size) VALUES (?, ?, ?)',
-                successful_entries
-            )
-            await self._db_pool.commit()
+        walker = loop.run_in_executor(None, produce)
+        writer = asyncio.create_task(write())
+        try:
+            await asyncio.gather(*(consume() for _ in range(max_concurrency)))
+            await walker
+            await records.put(None)
+            await writer
+        finally:
+            stop.set()
+            writer.cancel()
+            pool.shutdown(wait=False)
         
         total_time = time.time() - start_time
         return {
-            'files_processed': len(all_files),
-            'files_cached': len(successful_entries),
+            'files_processed': counts['processed'],
+            'files_cached': counts['cached'],
+            'errors': counts['errors'],
             'total_time': total_time,
-            'speedup': self._calc_speedup(len(all_files), total_time)
+            'speedup': self._calc_speedup(counts['processed'], total_time),
+            'concurrency': limiter.snapshot()
         }
     
     def _calc_speedup(self, count: int, time_taken: float) -> float:
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Claude Cache Page-Cache Hints
+posix_fadvise/madvise helpers so warming cooperates with the kernel page cache
+"""
+
+import os
+import sys
+import mmap
+import ctypes
+from typing import Optional
+
+HAVE_FADVISE = hasattr(os, 'posix_fadvise')
+
+_PROT_READ = 0x1
+_MAP_SHARED = 0x01
+_MAP_FAILED = ctypes.c_void_p(-1).value
+_PAGE_SIZE = mmap.PAGESIZE
+
+_libc = None
+
+
+def advise(fd: int, advice: int, offset: int = 0, length: int = 0) -> bool:
+    """Best-effort posix_fadvise; a no-op where unsupported"""
+    if not HAVE_FADVISE:
+        return False
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+        return True
+    except OSError:
+        return False
+
+
+def will_need(path: str) -> bool:
+    """Start asynchronous readahead of path without reading it"""
+    if not HAVE_FADVISE:
+        return False
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        return advise(fd, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.mmap.restype = ctypes.c_void_p
+        libc.mmap.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int,
+                              ctypes.c_int, ctypes.c_int, ctypes.c_long)
+        libc.munmap.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+        libc.mincore.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte))
+        _libc = libc
+    return _libc
+
+
+def resident_pages(fd: int, size: int) -> Optional[int]:
+    """Pages of an open file already in the page cache (mincore), or None if unknown"""
+    if size <= 0:
+        return 0
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = _load_libc()
+    except (OSError, AttributeError):
+        return None
+
+    # Mapping without touching the pages does not fault anything in
+    address = libc.mmap(None, size, _PROT_READ, _MAP_SHARED, fd, 0)
+    if address in (None, _MAP_FAILED):
+        return None
+    try:
+        pages = (size + _PAGE_SIZE - 1) // _PAGE_SIZE
+        vector = (ctypes.c_ubyte * pages)()
+        if libc.mincore(address, size, vector) != 0:
+            return None
+        return pages - bytes(vector).count(0)
+    finally:
+        libc.munmap(address, size)
+
+
+def read_for_warm(path: str, size: int, sequential_threshold: int = 1024 * 1024,
+                  drop_cold: bool = True) -> bytes:
+    """Read a whole source file for a bulk warm without polluting the page cache.
+
+    Large files get SEQUENTIAL readahead and are read through an mmap.
+    Files that had no pages cached before the read (so only the warm
+    wanted them) are dropped again with DONTNEED afterwards; files that
+    were already partly cached belong to someone's working set and are
+    left alone.
+    """
+    with open(path, 'rb') as f:
+        fd = f.fileno()
+        cold = drop_cold and HAVE_FADVISE and resident_pages(fd, size) == 0
+
+        if size > sequential_threshold:
+            if HAVE_FADVISE:
+                advise(fd, os.POSIX_FADV_SEQUENTIAL)
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                content = mapped.read()
+        else:
+            content = f.read()
+
+        if cold:
+            advise(fd, os.POSIX_FADV_DONTNEED)
+    return content
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Claude Cache Warm Pipeline
+Continuous multi-stage producer/consumer pipeline with bounded queues
+"""
+
+import time
+import queue
+import logging
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_SENTINEL = object()
+
+
+@dataclass
+class PipelineStage:
+    """One transformation step run by its own pool of worker threads.
+
+    ``func`` maps an item to the next stage's item, or ``None`` to drop it.
+    With ``priority`` set the stage's input queue is a bounded priority
+    queue, so the highest-priority items in flight are processed first.
+    """
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+    priority: Optional[Callable[[Any], float]] = None
+    stats: Dict[str, float] = field(default_factory=lambda: {'in': 0, 'out': 0, 'dropped': 0, 'errors': 0, 'busy': 0.0})
+
+
+class WarmPipeline:
+    """Source -> stages -> group-committing sink, all streaming.
+
+    Every queue is bounded, so a slow stage applies backpressure all the way
+    back to the source and memory stays flat no matter how many items flow
+    through. The sink runs on one thread and receives lists of up to
+    ``batch_size`` items, flushed at least every ``flush_interval`` seconds.
+    ``initializer`` runs first on each source and stage thread.
+    """
+
+    def __init__(self, stages: List[PipelineStage], sink: Callable[[List[Any]], int],
+                 batch_size: int = 50, flush_interval: float = 0.5, queue_size: int = 64,
+                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 cancel_event: Optional[threading.Event] = None,
+                 initializer: Optional[Callable[[], None]] = None):
+        self.stages = stages
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.progress_callback = progress_callback
+        self.initializer = initializer
+
+        # Callers may share an event to cancel the run from another thread
+        self._stop = cancel_event or threading.Event()
+        self._stats_lock = threading.Lock()
+        self._seq = itertools.count()
+        self.source_stats = {'out': 0}
+        self.sink_stats = {'in': 0, 'committed': 0, 'batches': 0, 'errors': 0, 'busy': 0.0}
+
+    def cancel(self):
+        """Stop feeding new items; in-flight items are dropped"""
+        self._stop.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._stop.is_set()
+
+    def _make_queue(self, stage: Optional[PipelineStage]) -> queue.Queue:
+        size = self.queue_size if stage is None else max(self.queue_size, stage.workers * 2)
+        if stage is not None and stage.priority is not None:
+            return queue.PriorityQueue(maxsize=size)
+        return queue.Queue(maxsize=size)
+
+    def _put(self, q: queue.Queue, stage: Optional[PipelineStage], item: Any):
+        if isinstance(q, queue.PriorityQueue):
+            # Sentinels sort after every real item
+            key = float('inf') if item is _SENTINEL else -stage.priority(item)
+            q.put((key, next(self._seq), item))
+        else:
+            q.put(item)
+
+    @staticmethod
+    def _get(q: queue.Queue) -> Any:
+        item = q.get()
+        if isinstance(q, queue.PriorityQueue):
+            return item[2]
+        return item
+
+    def progress(self) -> Dict[str, Any]:
+        """Snapshot of per-stage counters"""
+        with self._stats_lock:
+            return {
+                'source': dict(self.source_stats),
+                'stages': {stage.name: dict(stage.stats) for stage in self.stages},
+                'sink': dict(self.sink_stats)
+            }
+
+    def run(self, source: Iterable[Any]) -> Dict[str, Any]:
+        """Push every source item through the pipeline and wait for the last commit"""
+        start_time = time.time()
+        queues = [self._make_queue(stage) for stage in self.stages]
+        sink_queue = self._make_queue(None)
+        outputs = queues[1:] + [sink_queue]
+        threads = []
+
+        def feed():
+            if self.initializer:
+                self.initializer()
+            iterator = iter(source)
+            try:
+                for item in iterator:
+                    if self._stop.is_set():
+                        break
+                    self._put(queues[0], self.stages[0], item)
+                    with self._stats_lock:
+                        self.source_stats['out'] += 1
+            except Exception as e:
+                logger.error(f"Pipeline source failed: {e}")
+            finally:
+                # Let generator sources (e.g. the threaded walker) shut down promptly
+                if hasattr(iterator, 'close'):
+                    iterator.close()
+                for _ in range(self.stages[0].workers):
+                    self._put(queues[0], self.stages[0], _SENTINEL)
+
+        def stage_worker(index: int, remaining: List[int]):
+            if self.initializer:
+                self.initializer()
+            stage = self.stages[index]
+            in_q, out_q = queues[index], outputs[index]
+            next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            while True:
+                item = self._get(in_q)
+                if item is _SENTINEL:
+                    break
+                with self._stats_lock:
+                    stage.stats['in'] += 1
+                if self._stop.is_set():
+                    with self._stats_lock:
+                        stage.stats['dropped'] += 1
+                    continue
+                started = time.perf_counter()
+                try:
+                    result = stage.func(item)
+                except Exception as e:
+                    logger.error(f"Pipeline stage {stage.name} failed: {e}")
+                    result = None
+                    with self._stats_lock:
+                        stage.stats['errors'] += 1
+                elapsed = time.perf_counter() - started
+                with self._stats_lock:
+                    stage.stats['busy'] += elapsed
+                    if result is None:
+                        stage.stats['dropped'] += 1
+                    else:
+                        stage.stats['out'] += 1
+                if result is not None:
+                    self._put(out_q, next_stage, result)
+
+            # The last worker out forwards end-of-stream downstream
+            with self._stats_lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                downstream = next_stage.workers if next_stage else 1
+                for _ in range(downstream):
+                    self._put(out_q, next_stage, _SENTINEL)
+
+        threads.append(threading.Thread(target=feed, name="warm-source", daemon=True))
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            for i in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=stage_worker, args=(index, remaining),
+                    name=f"warm-{stage.name}-{i}", daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+
+        self._drain_sink(sink_queue)
+
+        for thread in threads:
+            thread.join()
+
+        result = self.progress()
+        result['total_time'] = time.time() - start_time
+        result['cancelled'] = self._stop.is_set()
+        return result
+
+    def _drain_sink(self, sink_queue: queue.Queue):
+        """Group-commit results on the calling thread"""
+        batch = []
+        last_flush = time.time()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.time() - last_flush))
+            try:
+                item = sink_queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            finished = item is _SENTINEL
+            if item is not None and not finished:
+                batch.append(item)
+                with self._stats_lock:
+                    self.sink_stats['in'] += 1
+
+            if batch and (finished or len(batch) >= self.batch_size or time.time() - last_flush >= self.flush_interval):
+                self._commit(batch)
+                batch = []
+            if time.time() - last_flush >= self.flush_interval or finished:
+                last_flush = time.time()
+            if finished:
+                return
+
+    def _commit(self, batch: List[Any]):
+        started = time.perf_counter()
+        try:
+            committed = self.sink(batch)
+        except Exception as e:
+            logger.error(f"Pipeline commit failed: {e}")
+            committed = 0
+            with self._stats_lock:
+                self.sink_stats['errors'] += len(batch)
+        with self._stats_lock:
+            self.sink_stats['committed'] += committed
+            self.sink_stats['batches'] += 1
+            self.sink_stats['busy'] += time.perf_counter() - started
+        if self.progress_callback is not None:
+            try:
+                self.progress_callback(self.progress())
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {e}")
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Claude Cache Policy Engine
+Compiles policies.json into per-path decisions evaluated once and memoized
+"""
+
+import os
+import re
+import logging
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Any, List, Tuple, Pattern, Callable
+from cachetools import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def glob_to_regex(pattern: str, anchored: bool = False) -> str:
+    """Translate a path glob into a regex with real ``**`` semantics.
+
+    ``*`` and ``?`` never cross a ``/``, ``**`` spans directories and
+    ``{a,b}`` expands to alternatives. Relative patterns match at any
+    directory boundary unless ``anchored``, absolute patterns are
+    anchored at the root.
+    """
+    i, n = 0, len(pattern)
+    out = []
+    brace_depth = 0
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i):
+                i += 2
+                if i < n and pattern[i] == '/':
+                    out.append('(?:.*/)?')
+                    i += 1
+                else:
+                    out.append('.*')
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append('\\[')
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end
+        elif c == '{':
+            brace_depth += 1
+            out.append('(?:')
+        elif c == '}' and brace_depth:
+            brace_depth -= 1
+            out.append(')')
+        elif c == ',' and brace_depth:
+            out.append('|')
+        else:
+            out.append(re.escape(c))
+        i += 1
+
+    body = ''.join(out)
+    if anchored or pattern.startswith('/'):
+        return f'^{body}$'
+    return f'(?:^|.*/){body}$'
+
+
+def compile_glob(pattern: str) -> Pattern:
+    """Compile a single path glob"""
+    return re.compile(glob_to_regex(pattern))
+
+
+@dataclass(frozen=True)
+class PathPolicy:
+    """Resolved policy for a single path"""
+    priority: int = 1
+    ttl: int = 0                      # seconds, 0 = no per-path TTL
+    codec: str = "gzip"               # gzip | none
+    memory_tier: bool = True          # eligible for the in-memory LRU
+    pinned: bool = False              # never evicted or expired
+    validation: str = "checksum"      # checksum | mtime | none
+    prefetch: Tuple[str, ...] = ()    # sibling globs, {stem} is substituted
+
+
+class PolicyEngine:
+    """Compiled view of policies.json.
+
+    ``filePriorities`` sets the base priority by extension, then ``rules``
+    are applied in order with later matches overriding earlier ones::
+
+        "rules": [
+            {"match": "**/node_modules/**", "priority": 1, "memoryTier": false},
+            {"match": "**/*.{woff,woff2,png}", "codec": "none"},
+            {"match": "**/src/**/*.tsx", "validation": "mtime", "prefetch": ["{stem}.css"]},
+            {"match": "**/package.json", "pinned": true}
+        ]
+
+    Entries under ``eviction.ttl`` are folded in as TTL-only rules.
+    """
+
+    CODECS = ('gzip', 'none')
+    VALIDATION_LEVELS = ('checksum', 'mtime', 'none')
+
+    # policies.json key -> PathPolicy field
+    _RULE_FIELDS = {
+        'priority': 'priority',
+        'ttl': 'ttl',
+        'codec': 'codec',
+        'memoryTier': 'memory_tier',
+        'pinned': 'pinned',
+        'validation': 'validation',
+        'prefetch': 'prefetch'
+    }
+
+    def __init__(self, policies: Dict[str, Any], parse_duration: Callable[[str], int], max_entries: int = 65536):
+        self._parse_duration = parse_duration
+
+        self._extension_priorities: Dict[str, int] = {}
+        for group in policies.get("filePriorities", {}).values():
+            for extension in group.get("extensions", []):
+                self._extension_priorities[extension.lower()] = group.get("priority", 1)
+
+        self._rules: List[Tuple[Pattern, Dict[str, Any]]] = []
+        for rule in policies.get("rules", []):
+            self._add_rule(rule.get("match"), rule)
+        for pattern, duration in policies.get("eviction", {}).get("ttl", {}).items():
+            self._add_rule(pattern, {"ttl": duration})
+
+        memory_tier = policies.get("memoryTier", {})
+        self.memory_min_priority = int(memory_tier.get("minPriority", 0))
+
+        # Shortest TTL across all rules, lets eviction bound its index scan
+        ttls = [overrides['ttl'] for _, overrides in self._rules if overrides.get('ttl')]
+        self.min_ttl = min(ttls) if ttls else 0
+
+        self._memo = LRUCache(maxsize=max_entries)
+        self._memo_lock = Lock()
+
+    def _add_rule(self, pattern: str, rule: Dict[str, Any]):
+        """Validate and compile one rule"""
+        if not pattern:
+            logger.warning(f"Ignoring policy rule without 'match': {rule}")
+            return
+
+        overrides = {}
+        for key, field in self._RULE_FIELDS.items():
+            if key not in rule:
+                continue
+            value = rule[key]
+            if field == 'ttl':
+                value = self._parse_duration(str(value))
+            elif field == 'priority':
+                value = int(value)
+            elif field == 'prefetch':
+                value = tuple(value)
+            elif field == 'codec' and value not in self.CODECS:
+                logger.warning(f"Unknown codec {value} in rule {pattern}, ignoring")
+                continue
+            elif field == 'validation' and value not in self.VALIDATION_LEVELS:
+                logger.warning(f"Unknown validation level {value} in rule {pattern}, ignoring")
+                continue
+            overrides[field] = value
+
+        self._rules.append((compile_glob(pattern), overrides))
+
+    def policy_for(self, file_path: str) -> PathPolicy:
+        """Resolve the policy for a path (memoized)"""
+        with self._memo_lock:
+            policy = self._memo.get(file_path)
+        if policy is not None:
+            return policy
+
+        policy = self._evaluate(file_path)
+        with self._memo_lock:
+            self._memo[file_path] = policy
+        return policy
+
+    def _evaluate(self, file_path: str) -> PathPolicy:
+        extension = os.path.splitext(file_path)[1].lower()
+        overrides = {'priority': self._extension_priorities.get(extension, 1)}
+        for regex, rule_overrides in self._rules:
+            if regex.match(file_path):
+                overrides.update(rule_overrides)
+        return PathPolicy(**overrides)
+
+    def admits_to_memory(self, policy: PathPolicy) -> bool:
+        """Whether an entry with this policy may live in the memory tier"""
+        if policy.pinned:
+            return True
+        return policy.memory_tier and policy.priority >= self.memory_min_priority
+
+    def clear(self):
+        """Drop memoized decisions"""
+        with self._memo_lock:
+            self._memo.clear()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Claude Cache Warm Profiles
+Declarative named target groups compiled into one deduplicated walk
+"""
+
+import os
+import re
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from claude_cache_policy import glob_to_regex
+from claude_cache_walker import TreeWalker, WalkEntry
+
+
+@dataclass
+class TargetGroup:
+    """Named set of globs warmed with a shared priority"""
+    name: str
+    include: List[str]
+    exclude: List[str] = field(default_factory=list)
+    priority: int = 1
+
+
+@dataclass
+class WarmProfile:
+    """A workspace root plus the target groups to warm under it.
+
+    Profile files are JSON::
+
+        {
+          "profiles": {
+            "krushr": {
+              "root": ".",
+              "exclude": ["**/*.min.js"],
+              "groups": [
+                {"name": "api", "priority": 8,
+                 "include": ["api/src/**/*.ts", "api/package.json"]},
+                ...
+              ]
+            }
+          }
+        }
+
+    ``root`` is resolved against the profile file's directory; every glob
+    is relative to ``root``.
+    """
+    name: str
+    root: str
+    groups: List[TargetGroup]
+    exclude: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any], base_dir: str = ".") -> 'WarmProfile':
+        root = os.path.expanduser(data.get("root", "."))
+        groups = []
+        for i, group in enumerate(data.get("groups", [])):
+            include = group.get("include", [])
+            if isinstance(include, str):
+                include = [include]
+            groups.append(TargetGroup(
+                name=group.get("name", f"group-{i}"),
+                include=list(include),
+                exclude=list(group.get("exclude", [])),
+                priority=int(group.get("priority", 1))
+            ))
+        if not groups:
+            raise ValueError(f"Warm profile {name!r} has no target groups")
+        return cls(
+            name=name,
+            root=os.path.abspath(os.path.join(base_dir, root)),
+            groups=groups,
+            exclude=list(data.get("exclude", []))
+        )
+
+    def compile(self, prune=None, walk_workers: int = 4) -> 'CompiledProfile':
+        return CompiledProfile(self, prune, walk_workers)
+
+
+def load_profiles(profiles_file: str) -> Dict[str, WarmProfile]:
+    """Read every profile defined in a profile file"""
+    with open(profiles_file, 'r') as f:
+        data = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(profiles_file))
+    return {
+        name: WarmProfile.from_dict(name, profile, base_dir)
+        for name, profile in data.get("profiles", {}).items()
+    }
+
+
+def _compile_globs(root: str, patterns: List[str]) -> Optional['re.Pattern']:
+    if not patterns:
+        return None
+    return re.compile('|'.join(
+        f'(?:{glob_to_regex(os.path.join(root, p), anchored=True)})' for p in patterns
+    ))
+
+
+class CompiledProfile:
+    """One walk over the union of a profile's globs.
+
+    All include globs go to a single TreeWalker, so overlapping patterns
+    (``src/**/*.ts`` and ``**/*.tsx``) share their directory scans and
+    each file is produced once. Every file is then assigned to the
+    highest-priority group that includes it and does not exclude it.
+    Profile-level excludes also prune directories during the walk.
+
+    Exposes ``roots`` and ``literals`` like TreeWalker so it can be used
+    directly as a warm source.
+    """
+
+    def __init__(self, profile: WarmProfile, prune=None, walk_workers: int = 4):
+        self.profile = profile
+        root = profile.root
+
+        self._exclude = _compile_globs(root, profile.exclude)
+        self._groups: List[Tuple[TargetGroup, 're.Pattern', Optional['re.Pattern']]] = [
+            (group, _compile_globs(root, group.include), _compile_globs(root, group.exclude))
+            for group in sorted(profile.groups, key=lambda g: g.priority, reverse=True)
+        ]
+
+        patterns = sorted({os.path.join(root, p) for group in profile.groups for p in group.include})
+        self.walker = TreeWalker(
+            patterns,
+            prune=lambda directory: self.is_directory_excluded(directory) or (prune is not None and prune(directory)),
+            max_workers=walk_workers
+        )
+        self.roots = self.walker.roots
+        self.literals = self.walker.literals
+
+        self.stats: Dict[str, Dict[str, int]] = {
+            group.name: {'files': 0, 'bytes': 0, 'priority': group.priority} for group in profile.groups
+        }
+        self.stats_excluded = 0
+
+    def is_directory_excluded(self, directory: str) -> bool:
+        return self._exclude is not None and self._exclude.match(directory.rstrip('/') + '/') is not None
+
+    def classify(self, path: str) -> Optional[TargetGroup]:
+        """The highest-priority group that wants path, if any"""
+        if self._exclude is not None and self._exclude.match(path):
+            return None
+        for group, include, exclude in self._groups:
+            if include.match(path) and not (exclude is not None and exclude.match(path)):
+                return group
+        return None
+
+    def priority_for(self, path: str) -> int:
+        group = self.classify(path)
+        return group.priority if group is not None else 1
+
+    def __iter__(self) -> Iterator[WalkEntry]:
+        for entry in self.walker:
+            group = self.classify(entry.path)
+            if group is None:
+                self.stats_excluded += 1
+                continue
+            stats = self.stats[group.name]
+            stats['files'] += 1
+            stats['bytes'] += entry.size
+            yield entry
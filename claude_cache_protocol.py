@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Claude Cache Daemon Protocol
+Length-prefixed frames carrying request IDs over long-lived connections
+"""
+
+import json
+import struct
+import asyncio
+from typing import Any, Dict, List, NamedTuple, Optional
+
+# Two framings share a connection; the first bytes tell them apart.
+#
+# JSON (version 0, the fallback): a 4-byte big-endian length followed by
+# a JSON object. Requests carry {"id", "tool", "params"}; every response
+# echoes the id and sets "more" while further frames for the same id
+# will follow.
+#
+# Binary (version 1): a fixed header
+#     magic "CC" | version u8 | flags u8 | id u32 | meta length u32 | payload length u32
+# then compact JSON metadata (the same object as above, minus the id and
+# minus any bulk field), then the payload as raw bytes. File content thus
+# travels without JSON escaping and is written straight from its buffer.
+# "CC" read as a JSON length would be over 1 GB, so the two cannot be
+# confused.
+HEADER_SIZE = 4
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+MAGIC = b'CC'
+VERSION = 1
+BINARY_HEADER = struct.Struct('>2sBBIII')
+
+_JSON_SEPARATORS = (',', ':')
+
+
+class ProtocolError(Exception):
+    """The peer sent something that is not a valid frame"""
+
+
+class Frame(NamedTuple):
+    """A decoded frame: metadata, optional raw payload, and its framing"""
+    meta: Dict[str, Any]
+    payload: Optional[bytes] = None
+    binary: bool = False
+
+
+def encode_frame(payload: Dict[str, Any]) -> bytes:
+    """A JSON (version 0) frame"""
+    data = json.dumps(payload).encode('utf-8')
+    if len(data) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {len(data)} bytes exceeds {MAX_FRAME_SIZE}")
+    return len(data).to_bytes(HEADER_SIZE, byteorder='big') + data
+
+
+def encode_binary_frame(meta: Dict[str, Any], payload=b'', flags: int = 0) -> List[Any]:
+    """A binary (version 1) frame as buffers for writer.writelines.
+
+    ``payload`` may be any bytes-like object; it is not copied.
+    """
+    meta = dict(meta)
+    request_id = meta.pop('id', None) or 0
+    meta_bytes = json.dumps(meta, separators=_JSON_SEPARATORS).encode('utf-8')
+    payload_size = memoryview(payload).nbytes
+    if len(meta_bytes) + payload_size > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {len(meta_bytes) + payload_size} bytes exceeds {MAX_FRAME_SIZE}")
+    header = BINARY_HEADER.pack(MAGIC, VERSION, flags, request_id, len(meta_bytes), payload_size)
+    return [header, meta_bytes, payload] if payload_size else [header, meta_bytes]
+
+
+def pack_response(response: Dict[str, Any], binary: bool, payload_field: Optional[str] = None) -> List[Any]:
+    """Buffers for a response in the framing the request used.
+
+    In binary framing ``response['data'][payload_field]`` (str or bytes)
+    is moved out of the metadata into the raw payload.
+    """
+    if not binary:
+        return [encode_frame(response)]
+
+    data = response.get('data')
+    if payload_field and isinstance(data, dict) and isinstance(data.get(payload_field), (str, bytes, bytearray, memoryview)):
+        data = dict(data)
+        content = data.pop(payload_field)
+        encoding = None
+        if isinstance(content, str):
+            content, encoding = content.encode('utf-8'), 'utf-8'
+        response = dict(response, data=data, payload={'field': payload_field, 'encoding': encoding})
+        return encode_binary_frame(response, content)
+    return encode_binary_frame(response)
+
+
+def unpack_response(frame: Frame, decode: bool = True) -> Dict[str, Any]:
+    """Response dict with any raw payload put back under its field"""
+    response = frame.meta
+    spec = response.pop('payload', None)
+    if spec and isinstance(response.get('data'), dict):
+        content = frame.payload or b''
+        if decode and spec.get('encoding'):
+            content = content.decode(spec['encoding'], errors='replace')
+        response['data'][spec['field']] = content
+    return response
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Frame]:
+    """Next frame from reader in either framing, or None on a clean end of stream"""
+    try:
+        prefix = await reader.readexactly(HEADER_SIZE)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise ProtocolError("Connection closed inside a frame header")
+
+    try:
+        if prefix[:2] == MAGIC:
+            return await _read_binary(reader, prefix)
+
+        length = int.from_bytes(prefix, byteorder='big')
+        if length > MAX_FRAME_SIZE:
+            raise ProtocolError(f"Frame of {length} bytes exceeds {MAX_FRAME_SIZE}")
+        body = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        raise ProtocolError("Connection closed inside a frame")
+    return Frame(_decode_meta(body))
+
+
+async def _read_binary(reader: asyncio.StreamReader, prefix: bytes) -> Frame:
+    header = prefix + await reader.readexactly(BINARY_HEADER.size - HEADER_SIZE)
+    _, version, flags, request_id, meta_size, payload_size = BINARY_HEADER.unpack(header)
+    if version != VERSION:
+        raise ProtocolError(f"Unsupported protocol version {version}")
+    if meta_size + payload_size > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {meta_size + payload_size} bytes exceeds {MAX_FRAME_SIZE}")
+
+    meta = _decode_meta(await reader.readexactly(meta_size))
+    meta['id'] = request_id or None
+    payload = await reader.readexactly(payload_size) if payload_size else None
+    return Frame(meta, payload, True)
+
+
+def _decode_meta(body: bytes) -> Dict[str, Any]:
+    try:
+        meta = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ProtocolError(f"Malformed frame: {e}")
+    if not isinstance(meta, dict):
+        raise ProtocolError("Frame is not an object")
+    return meta
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Claude Cache Storage
+The index schema and blob layout shared by the thread and asyncio front-ends
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.db"
+CONTENT_DIR = "content"
+
+ENTRY_COLUMNS = ('path', 'checksum', 'size', 'modified_time', 'cached_time', 'compressed',
+                 'access_count', 'last_accessed', 'content_path', 'metadata', 'stored_size')
+
+_CONTENT_PATH = ENTRY_COLUMNS.index('content_path')
+
+# Held shared by index writers and exclusively by blob removers (see CacheStore)
+BLOB_LOCK = "blobs"
+
+UPSERT_ENTRY = f'''
+    INSERT OR REPLACE INTO cache_entries
+    ({", ".join(ENTRY_COLUMNS)})
+    VALUES ({", ".join("?" * len(ENTRY_COLUMNS))})
+'''
+
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS cache_entries (
+        path TEXT PRIMARY KEY,
+        checksum TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        modified_time REAL NOT NULL,
+        cached_time REAL NOT NULL,
+        compressed BOOLEAN NOT NULL,
+        access_count INTEGER DEFAULT 0,
+        last_accessed REAL NOT NULL,
+        content_path TEXT NOT NULL,
+        metadata TEXT NOT NULL,
+        stored_size INTEGER DEFAULT 0
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_cached_time ON cache_entries(cached_time)',
+    # Eviction pages through entries coldest-first
+    'CREATE INDEX IF NOT EXISTS idx_last_accessed ON cache_entries(last_accessed, path)',
+    'CREATE INDEX IF NOT EXISTS idx_content_path ON cache_entries(content_path)',
+    '''
+    CREATE TABLE IF NOT EXISTS eviction_state (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        inflation REAL NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS cache_stats (
+        id INTEGER PRIMARY KEY,
+        timestamp REAL NOT NULL,
+        hit_count INTEGER NOT NULL,
+        miss_count INTEGER NOT NULL,
+        total_files INTEGER NOT NULL,
+        cache_size INTEGER NOT NULL
+    )
+    ''',
+)
+
+
+def blob_path(content_dir: str, checksum: str, compressed: bool = True) -> str:
+    """Blob location for a checksum, creating its fan-out directory.
+
+    Gzipped and raw copies of the same content get different names, so a
+    raw ingest can never overwrite a blob another row reads as gzip.
+    """
+    # Use first 2 chars of checksum as subdirectory for better file system performance
+    subdir = os.path.join(content_dir, checksum[:2])
+    os.makedirs(subdir, exist_ok=True)
+    return os.path.join(subdir, f"{checksum}.gz" if compressed else checksum)
+
+
+def write_blob(content_path: str, content: bytes) -> None:
+    """Write a blob atomically (unique temp file + rename)"""
+    temp_path = f"{content_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, content_path)  # Atomic on POSIX
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def raw_metadata(size: int) -> Dict[str, Any]:
+    """Compression metadata for a blob stored uncompressed"""
+    return {
+        'original_size': size,
+        'compressed_size': size,
+        'compression_ratio': 1.0,
+        'space_saved': 0
+    }
+
+
+def init_schema(conn: sqlite3.Connection) -> None:
+    """Create or migrate the index; safe to run from every front-end"""
+    conn.execute("PRAGMA journal_mode=WAL")
+    for statement in SCHEMA:
+        conn.execute(statement)
+
+    # Migrate older databases: stored_size tracks on-disk blob bytes
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(cache_entries)')}
+    if 'stored_size' not in columns:
+        conn.execute('ALTER TABLE cache_entries ADD COLUMN stored_size INTEGER DEFAULT 0')
+    # GDSF value H; NULL until the next eviction run assigns it (see EvictionEngine)
+    if 'gdsf_h' not in columns:
+        conn.execute('ALTER TABLE cache_entries ADD COLUMN gdsf_h REAL')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_gdsf_h ON cache_entries(gdsf_h, path)')
+
+
+class CacheStore:
+    """Locations of the shared index and blob store under a cache directory.
+
+    Both ``ClaudeCache`` and ``OptimizedAsyncCache`` keep their entries in
+    ``files/index.db`` (table ``cache_entries``) and their blobs in
+    ``files/content/<2>/<checksum>[.gz]``, so a file warmed by either is a
+    hit for the other. Each front-end brings its own connections; SQLite's
+    WAL mode arbitrates between them.
+
+    Several processes may share one store (pre-forked daemon workers).
+    Index writes are serialized by SQLite and blobs are written by atomic
+    rename, so only whole-store maintenance needs ``lock()``. Blobs are
+    content-addressed and shared by identical files, so rows are written
+    through ``commit_entries`` and blobs removed through
+    ``unlink_unreferenced``, which exclude each other.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.files_dir = self.cache_dir / "files"
+        self.db_file = self.files_dir / INDEX_FILE
+        self.content_dir = self.files_dir / CONTENT_DIR
+
+    def initialize(self) -> None:
+        """Create directories and the index schema"""
+        self.content_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_file), timeout=30.0)
+        try:
+            init_schema(conn)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def blob_path(self, checksum: str, compressed: bool = True) -> str:
+        return blob_path(str(self.content_dir), checksum, compressed)
+
+    @contextmanager
+    def lock(self, name: str, blocking: bool = True, shared: bool = False) -> Iterator[bool]:
+        """Cross-process advisory lock on files/<name>.lock; yields whether it is held.
+
+        With blocking=False the lock is only taken if no other process
+        holds it; shared=True lets other shared holders in at the same
+        time. Where flock is unavailable the lock is always granted.
+        """
+        if fcntl is None:
+            yield True
+            return
+
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.files_dir / f"{name}.lock", 'a') as lock_file:
+            try:
+                mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+                fcntl.flock(lock_file.fileno(), mode if blocking else mode | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def commit_entries(self, conn: sqlite3.Connection, records: List[Tuple]) -> int:
+        """Upsert index records whose blobs still exist and commit; returns how many were written.
+
+        The blob lock is held shared from the existence check through the
+        commit, so unlink_unreferenced cannot remove a blob in between and
+        leave a row pointing at nothing. A record whose blob was removed
+        meanwhile is dropped; the file is simply cached again on its next read.
+        """
+        with self.lock(BLOB_LOCK, shared=True):
+            records = [record for record in records if os.path.exists(record[_CONTENT_PATH])]
+            if records:
+                conn.executemany(UPSERT_ENTRY, records)
+            conn.commit()
+        return len(records)
+
+    def unlink_unreferenced(self, conn: sqlite3.Connection, content_paths: Iterable[str],
+                            chunk_size: int = 500) -> int:
+        """Unlink those of content_paths no index row references; returns how many were removed.
+
+        Call after the rows that used them are deleted and committed. The
+        reference check and the unlinks run under the blob lock held
+        exclusively, so a concurrent commit_entries for an identical file
+        either lands first (and the blob is kept) or sees it gone.
+        """
+        content_paths = list(dict.fromkeys(content_paths))
+        removed = 0
+        with self.lock(BLOB_LOCK):
+            for start in range(0, len(content_paths), chunk_size):
+                chunk = content_paths[start:start + chunk_size]
+                placeholders = ','.join('?' * len(chunk))
+                referenced = {row[0] for row in conn.execute(
+                    f'SELECT DISTINCT content_path FROM cache_entries WHERE content_path IN ({placeholders})',
+                    chunk
+                )}
+                for content_path in chunk:
+                    if content_path in referenced:
+                        continue
+                    try:
+                        os.remove(content_path)
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        logger.warning(f"Error removing cache file {content_path}: {e}")
+        return removed
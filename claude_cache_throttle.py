@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Claude Cache Background Throttle
+Token-bucket pacing of warms and maintenance, backing off under interactive load
+"""
+
+import os
+import sys
+import time
+import ctypes
+import logging
+import platform
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ioprio_set(2) syscall numbers; glibc has no wrapper
+_IOPRIO_SET = {'x86_64': 251, 'aarch64': 30, 'i386': 289, 'i686': 289, 'armv7l': 314, 'ppc64le': 273}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_SHIFT = 13
+IO_CLASSES = {'realtime': 1, 'best-effort': 2, 'idle': 3}
+
+
+def lower_priority(nice: int = 0, io_class: Optional[str] = None, io_level: int = 7):
+    """Apply nice/ioprio to the calling thread; Linux only, best effort.
+
+    An unprivileged process cannot raise its priority again, so only call
+    this on threads (or pool processes) that do nothing but background work.
+    Also usable as a process-pool initializer.
+    """
+    if not sys.platform.startswith('linux') or not (nice or io_class):
+        return
+    tid = threading.get_native_id()
+    if nice:
+        try:
+            current = os.getpriority(os.PRIO_PROCESS, tid)
+            os.setpriority(os.PRIO_PROCESS, tid, max(current, nice))
+        except OSError as e:
+            logger.debug(f"Could not renice background thread: {e}")
+    if io_class:
+        _set_io_priority(tid, io_class, io_level)
+
+
+def _set_io_priority(tid: int, io_class_name: str, io_level: int):
+    io_class = IO_CLASSES.get(io_class_name)
+    number = _IOPRIO_SET.get(platform.machine())
+    if io_class is None or number is None:
+        logger.debug(f"ioprio {io_class_name} unsupported on {platform.machine()}")
+        return
+    level = 0 if io_class == IO_CLASSES['idle'] else io_level
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.syscall(number, _IOPRIO_WHO_PROCESS, tid, (io_class << _IOPRIO_CLASS_SHIFT) | level) != 0:
+            logger.debug(f"ioprio_set failed: {os.strerror(ctypes.get_errno())}")
+    except (OSError, AttributeError) as e:
+        logger.debug(f"ioprio_set unavailable: {e}")
+
+
+class TokenBucket:
+    """Classic token bucket; callers may go into debt and sleep it off.
+
+    Letting a single acquire exceed the burst (a file larger than the
+    bucket) keeps large files from stalling forever while still charging
+    them in full.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float, rate: float) -> float:
+        """Take amount tokens at the given refill rate; returns seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / rate
+
+
+class BackgroundThrottle:
+    """Paces background work by bytes/sec and files/sec.
+
+    Interactive reads report their latency through ``record_latency``.
+    When its moving average rises above ``latency_target`` the allowed
+    rate is halved (down to ``min_factor`` of the configured rate); while
+    latency stays under target, or no interactive reads happen for
+    ``idle_reset`` seconds, it recovers additively.
+
+    ``enter_background`` lowers the CPU (nice) and I/O (ioprio) priority
+    of the calling thread on Linux, once per thread and for good. Callers
+    run it only on threads dedicated to background work (pool initializers,
+    the eviction loop); ``acquire`` paces without touching priority, so
+    interactive and shared threads can be throttled safely.
+    """
+
+    def __init__(self, bytes_per_second: float = 0, files_per_second: float = 0,
+                 latency_target: float = 0.05, min_factor: float = 0.05,
+                 adjust_interval: float = 0.5, idle_reset: float = 5.0,
+                 nice: int = 0, io_class: Optional[str] = None, io_level: int = 7,
+                 enabled: bool = True):
+        self.enabled = enabled
+        self.buckets = {}
+        if bytes_per_second:
+            self.buckets['bytes'] = TokenBucket(bytes_per_second)
+        if files_per_second:
+            self.buckets['files'] = TokenBucket(files_per_second)
+        self.latency_target = latency_target
+        self.min_factor = min_factor
+        self.adjust_interval = adjust_interval
+        self.idle_reset = idle_reset
+        self.nice = nice
+        self.io_class = io_class
+        self.io_level = io_level
+
+        self.factor = 1.0
+        self._latency = 0.0
+        self._last_sample = 0.0
+        self._last_adjust = time.monotonic()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.stats = {'waits': 0, 'wait_time': 0.0, 'backoffs': 0, 'samples': 0}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], parse_size: Callable[[str], int]) -> 'BackgroundThrottle':
+        """Build from the "throttle" section of cache.json"""
+        bytes_per_second = config.get("bytesPerSecond", "128MB")
+        return cls(
+            bytes_per_second=parse_size(bytes_per_second) if isinstance(bytes_per_second, str) else bytes_per_second,
+            files_per_second=float(config.get("filesPerSecond", 10000)),
+            latency_target=float(config.get("latencyTargetMs", 50)) / 1000.0,
+            min_factor=float(config.get("minRate", 0.05)),
+            nice=int(config.get("nice", 0)),
+            io_class=config.get("ioClass"),
+            io_level=int(config.get("ioLevel", 7)),
+            enabled=config.get("enabled", True)
+        )
+
+    def record_latency(self, seconds: float):
+        """Report the latency of one interactive read"""
+        with self._lock:
+            # EWMA: recent spikes dominate, single outliers do not
+            self._latency = seconds if not self.stats['samples'] else 0.8 * self._latency + 0.2 * seconds
+            self._last_sample = time.monotonic()
+            self.stats['samples'] += 1
+
+    def _adjust(self, now: float):
+        with self._lock:
+            if now - self._last_adjust < self.adjust_interval:
+                return
+            self._last_adjust = now
+            idle = now - self._last_sample > self.idle_reset
+            if not idle and self._latency > self.latency_target:
+                if self.factor > self.min_factor:
+                    self.stats['backoffs'] += 1
+                self.factor = max(self.min_factor, self.factor * 0.5)
+            else:
+                self.factor = min(1.0, self.factor + 0.1)
+
+    def acquire(self, nbytes: int = 0, files: int = 1):
+        """Block until the background budget allows nbytes over files files"""
+        if not self.enabled or not self.buckets:
+            return
+        now = time.monotonic()
+        self._adjust(now)
+
+        wait = 0.0
+        if 'files' in self.buckets and files:
+            bucket = self.buckets['files']
+            wait = max(wait, bucket.reserve(files, bucket.rate * self.factor))
+        if 'bytes' in self.buckets and nbytes:
+            bucket = self.buckets['bytes']
+            wait = max(wait, bucket.reserve(nbytes, bucket.rate * self.factor))
+        if wait > 0:
+            with self._lock:
+                self.stats['waits'] += 1
+                self.stats['wait_time'] += wait
+            time.sleep(wait)
+
+    def enter_background(self):
+        """Lower the calling thread's priority for good (see lower_priority)"""
+        if getattr(self._local, 'applied', False):
+            return
+        self._local.applied = True
+        if self.enabled:
+            lower_priority(self.nice, self.io_class, self.io_level)
+
+    def priority_args(self) -> Tuple[int, Optional[str], int]:
+        """lower_priority arguments, e.g. as a process-pool initializer's initargs"""
+        return (self.nice if self.enabled else 0, self.io_class if self.enabled else None, self.io_level)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'factor': self.factor,
+                'latency_ms': self._latency * 1000,
+                **self.stats
+            }
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Claude Cache Tree Walker
+os.scandir-based replacement for glob.glob in cache warming
+"""
+
+import os
+import re
+import stat
+import queue
+import threading
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from claude_cache_policy import glob_to_regex
+
+# Never descended into by ** patterns unless a pattern's literal root is inside one
+DEFAULT_PRUNE_DIRS = frozenset({
+    '.git', '.hg', '.svn', 'node_modules', 'dist', '__pycache__',
+    '.venv', 'venv', '.mypy_cache', '.pytest_cache', '.tox'
+})
+
+_MAGIC = re.compile(r'[*?\[{]')
+
+
+class WalkEntry(NamedTuple):
+    """A candidate file with the stat data collected while walking"""
+    path: str
+    size: int
+    mtime: float
+    is_symlink: bool
+
+
+class WalkRoot(NamedTuple):
+    """A directory to scan and how deep below it patterns can match"""
+    path: str
+    depth: Optional[int]  # None = unlimited (pattern contains **)
+
+
+def split_pattern(pattern: str) -> Tuple[str, Optional[str], Optional[int]]:
+    """Split a glob into (literal root, wildcard remainder, max depth).
+
+    A pattern without wildcards returns ``(pattern, None, 0)``.
+    """
+    segments = pattern.split('/')
+    for i, segment in enumerate(segments):
+        if _MAGIC.search(segment):
+            root = '/'.join(segments[:i])
+            if pattern.startswith('/') and not root:
+                root = '/'
+            rest = segments[i:]
+            depth = None if any('**' in s for s in rest) else len(rest)
+            return root, '/'.join(rest), depth
+    return pattern, None, 0
+
+
+class TreeWalker:
+    """Stream files matching a set of globs without globbing.
+
+    All patterns are compiled into one regex and their literal roots are
+    merged, so overlapping patterns share a single walk and no file is
+    yielded twice (literal paths included). Directories named
+    in ``prune_dirs``, hidden directories and anything ``prune`` rejects are
+    skipped before descending. Each candidate carries the size and mtime
+    from its ``DirEntry`` so callers never stat it again.
+
+    With ``max_workers > 1`` directories are scanned concurrently and
+    results stream out through a bounded queue as they are found.
+    """
+
+    def __init__(self, patterns: List[str],
+                 prune: Optional[Callable[[str], bool]] = None,
+                 prune_dirs: frozenset = DEFAULT_PRUNE_DIRS,
+                 max_workers: int = 4,
+                 include_hidden: bool = False,
+                 queue_size: int = 4096):
+        self.patterns = list(patterns)
+        self.prune = prune
+        self.prune_dirs = prune_dirs
+        self.max_workers = max(1, max_workers)
+        self.include_hidden = include_hidden
+        self.queue_size = queue_size
+
+        self.literals: List[str] = []
+        roots = {}
+        regexes = []
+        for pattern in dict.fromkeys(self.patterns):
+            root, rest, depth = split_pattern(pattern)
+            if rest is None:
+                self.literals.append(pattern)
+                continue
+            regexes.append(glob_to_regex(pattern, anchored=True))
+            if root in roots:
+                current = roots[root]
+                roots[root] = None if current is None or depth is None else max(current, depth)
+            else:
+                roots[root] = depth
+
+        self._regex = re.compile('|'.join(f'(?:{r})' for r in regexes)) if regexes else None
+        self.roots = self._merge_roots(roots)
+        # Roots nested in another root reach deeper than it and are walked on their own
+        self._root_paths = {root.path for root in self.roots}
+        # Already yielded up front; the walk skips them
+        self._literal_paths = frozenset(self.literals)
+
+    def _merge_roots(self, roots: dict) -> List[WalkRoot]:
+        """Drop roots an ancestor walk already reaches to their full depth"""
+        merged = []
+        for path in sorted(roots, key=len):
+            depth = roots[path]
+            covered = False
+            for ancestor in merged:
+                relative = self._relative_to(path, ancestor.path)
+                if relative is None:
+                    continue
+                # The ancestor walk would prune its way past this root
+                parts = [p for p in relative.split('/') if p]
+                if any(p in self.prune_dirs or (p.startswith('.') and not self.include_hidden) for p in parts):
+                    continue
+                if ancestor.depth is None or (depth is not None and len(parts) + depth <= ancestor.depth):
+                    covered = True
+                    break
+            if not covered:
+                merged.append(WalkRoot(path, depth))
+        return merged
+
+    @staticmethod
+    def _relative_to(path: str, ancestor: str) -> Optional[str]:
+        if ancestor == '':
+            return None if path.startswith('/') else path
+        if path == ancestor:
+            return ''
+        prefix = ancestor.rstrip('/') + '/'
+        return path[len(prefix):] if path.startswith(prefix) else None
+
+    def _scan(self, directory: str, depth: Optional[int]) -> Tuple[List[WalkEntry], List[Tuple[str, Optional[int]]]]:
+        """Scan one directory, returning matched files and subdirectories to descend"""
+        files = []
+        subdirs = []
+        try:
+            iterator = os.scandir(directory or '.')
+        except OSError:
+            return files, subdirs
+
+        child_depth = None if depth is None else depth - 1
+        with iterator:
+            for entry in iterator:
+                name = entry.name
+                if name.startswith('.') and not self.include_hidden:
+                    continue
+                path = os.path.join(directory, name) if directory else name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if child_depth == 0 or name in self.prune_dirs:
+                            continue
+                        if path in self._root_paths:
+                            continue
+                        if self.prune is not None and self.prune(path):
+                            continue
+                        subdirs.append((path, child_depth))
+                        continue
+                    if not self._regex.match(path) or path in self._literal_paths:
+                        continue
+                    if not entry.is_file():
+                        continue
+                    is_symlink = entry.is_symlink()
+                    st = entry.stat()
+                except OSError:
+                    continue
+                files.append(WalkEntry(path, st.st_size, st.st_mtime, is_symlink))
+        return files, subdirs
+
+    def _literal_entries(self) -> Iterator[WalkEntry]:
+        for path in self.literals:
+            try:
+                st = os.stat(path)
+                is_symlink = os.path.islink(path)
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                yield WalkEntry(path, st.st_size, st.st_mtime, is_symlink)
+
+    def __iter__(self) -> Iterator[WalkEntry]:
+        yield from self._literal_entries()
+        if self._regex is None:
+            return
+        if self.max_workers == 1:
+            yield from self._walk_sequential()
+        else:
+            yield from self._walk_threaded()
+
+    def pending_dirs(self) -> List[Tuple[str, Optional[int]]]:
+        """The directory stack a fresh walk starts from (see scan_steps)"""
+        return [(root.path, root.depth) for root in reversed(self.roots)]
+
+    def scan_steps(self, stack: List[Tuple[str, Optional[int]]]) -> Iterator[List[WalkEntry]]:
+        """Walk sequentially from an explicit directory stack, one directory per step.
+
+        The stack is consumed in place: between steps it holds exactly the
+        directories still to scan, so a caller can stop, save it and pick
+        the walk up later. Literal patterns are not included.
+        """
+        while stack:
+            directory, depth = stack.pop()
+            files, subdirs = self._scan(directory, depth)
+            stack.extend(reversed(subdirs))
+            yield files
+
+    def _walk_sequential(self) -> Iterator[WalkEntry]:
+        for files in self.scan_steps(self.pending_dirs()):
+            yield from files
+
+    def _walk_threaded(self) -> Iterator[WalkEntry]:
+        pending = queue.Queue()
+        results = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        outstanding = [len(self.roots)]
+        lock = threading.Lock()
+        done = object()
+
+        for root in self.roots:
+            pending.put((root.path, root.depth))
+
+        def put_result(item) -> bool:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def worker():
+            while not stop.is_set():
+                try:
+                    directory, depth = pending.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if directory is None:
+                    return
+                try:
+                    files, subdirs = self._scan(directory, depth)
+                    with lock:
+                        outstanding[0] += len(subdirs)
+                    for subdir in subdirs:
+                        pending.put(subdir)
+                    if files:
+                        put_result(files)
+                except Exception as e:
+                    # e.g. a failing prune callback: the consumer re-raises it
+                    put_result(e)
+                finally:
+                    # Only count this directory done once its files are queued
+                    with lock:
+                        outstanding[0] -= 1
+                        finished = outstanding[0] == 0
+                if finished:
+                    put_result(done)
+                    for _ in range(self.max_workers):
+                        pending.put((None, None))
+                    return
+
+        if not self.roots:
+            return
+        threads = [
+            threading.Thread(target=worker, name=f"tree-walker-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                batch = results.get()
+                if batch is done:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                yield from batch
+        finally:
+            # Also reached when the consumer stops iterating early
+            stop.set()
+            for thread in threads:
+                thread.join(timeout=1)
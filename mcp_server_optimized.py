@@ -18,6 +18,7 @@ cache_dir = Path.home() / ".claude" / "cache"
 sys.path.insert(0, str(cache_dir))
 
 from claude_cache_optimized_async import OptimizedAsyncCache
+from claude_cache_aio import AsyncClaudeCache
 
 logger = logging.getLogger(__name__)
 
@@ -33,12 +34,16 @@ class MCPResponse:
 class OptimizedMCPServer:
     """High-performance MCP server with connection pooling and optimized protocols"""
     
-    def __init__(self, max_connections: int = 10, connection_timeout: float = 30.0):
+    def __init__(self, max_connections: int = 10, connection_timeout: float = 30.0,
+                 db_readers: Optional[int] = None):
         self.max_connections = max_connections
+        # One read-only SQLite connection per ~10 clients, between 2 and 8
+        self.db_readers = db_readers or min(8, max(2, max_connections // 10))
         self.connection_timeout = connection_timeout
         self.active_connections = 0
         self.connection_semaphore = asyncio.Semaphore(max_connections)
         self.cache_pool = None
+        self.engine = None
         self.stats = {
             'requests_served': 0,
             'cache_hits': 0,
@@ -48,13 +53,17 @@ class OptimizedMCPServer:
         
     async def __aenter__(self):
         """Initialize server resources"""
-        self.cache_pool = OptimizedAsyncCache()
+        self.cache_pool = OptimizedAsyncCache(readers=self.db_readers)
         await self.cache_pool.__aenter__()
+        # Reads go through the full ClaudeCache engine (policies, memory tier)
+        self.engine = AsyncClaudeCache()
         logger.info(f"MCP Server initialized (max connections: {self.max_connections})")
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Cleanup server resources"""
+        if self.engine:
+            self.engine.close()
         if self.cache_pool:
             await self.cache_pool.__aexit__(exc_type, exc_val, exc_tb)
         logger.info("MCP Server shutdown complete")
@@ -102,7 +111,9 @@ class OptimizedMCPServer:
         # Optimized tool routing with direct method calls
         tool_map = {
             'cache_warm': self._handle_cache_warm,
+            'cache_warm_profile': self._handle_cache_warm_profile,
             'cache_file': self._handle_cache_file,
+            'cache_files': self._handle_cache_files,
             'cache_stats': self._handle_cache_stats,
             'cache_clear': self._handle_cache_clear,
             'cache_health': self._handle_cache_health
@@ -124,8 +135,8 @@ class OptimizedMCPServer:
             if not patterns:
                 return MCPResponse(success=False, error="No patterns provided")
             
-            # Use optimized async cache warming
-            result = await self.cache_pool.warm_cache_optimized(patterns)
+            # Through ClaudeCache so path validation and policies apply
+            result = await self.engine.warm_cache(patterns)
             
             return MCPResponse(
                 success=True,
@@ -141,43 +152,87 @@ class OptimizedMCPServer:
         except Exception as e:
             return MCPResponse(success=False, error=str(e))
     
+    async def _handle_cache_warm_profile(self, params: Dict[str, Any]) -> MCPResponse:
+        """Warm a declarative profile through the parallel warm pipeline"""
+        try:
+            profile = params.get('profile')
+            if not profile:
+                return MCPResponse(success=False, error="No profile provided")
+            
+            # The pipeline is thread-based; keep it off the event loop
+            result = await self.engine.run(
+                self.engine.cache.warm_profile, profile, profiles_file=params.get('profiles_file')
+            )
+            
+            return MCPResponse(
+                success=True,
+                data={
+                    'profile': result['profile'],
+                    'groups': result['groups'],
+                    'files_processed': result['files_processed'],
+                    'files_cached': result['files_cached'],
+                    'files_unchanged': result.get('files_unchanged', 0),
+                    'errors': result['errors'],
+                    'execution_time': result['total_time'],
+                    'speedup': result.get('speedup', 1.0),
+                    'performance_tier': self._classify_performance(result.get('speedup', 1.0))
+                }
+            )
+            
+        except Exception as e:
+            return MCPResponse(success=False, error=str(e))
+    
     async def _handle_cache_file(self, params: Dict[str, Any]) -> MCPResponse:
-        """Fast single file caching"""
+        """Serve a single file from the cache, caching it on a miss"""
         try:
             file_path = params.get('file_path')
             if not file_path:
                 return MCPResponse(success=False, error="No file_path provided")
             
-            # Direct file processing
-            result = await self.cache_pool._process_file_fast(file_path)
+            content, hit = await self.engine.get_file_with_status(file_path)
+            if content is None:
+                return MCPResponse(success=False, error="Failed to read file")
             
-            if result:
-                # Insert to database
-                await self.cache_pool._db_pool.execute(
-                    'INSERT OR REPLACE INTO async_cache (path, cached_time, size) VALUES (?, ?, ?)',
-                    result
-                )
-                await self.cache_pool._db_pool.commit()
-                
-                return MCPResponse(
-                    success=True,
-                    data={'file_path': file_path, 'cached': True},
-                    cache_hit=False
-                )
-            else:
-                return MCPResponse(success=False, error="Failed to cache file")
+            return MCPResponse(
+                success=True,
+                data={'file_path': file_path, 'content': content, 'size': len(content)},
+                cache_hit=hit
+            )
                 
         except Exception as e:
             return MCPResponse(success=False, error=str(e))
     
+    async def _handle_cache_files(self, params: Dict[str, Any]) -> MCPResponse:
+        """Serve several files with a single index lookup"""
+        try:
+            file_paths = params.get('file_paths', [])
+            if not file_paths:
+                return MCPResponse(success=False, error="No file_paths provided")
+            
+            results = await self.engine.get_files(file_paths)
+            hits = sum(1 for _, hit in results.values() if hit)
+            
+            return MCPResponse(
+                success=True,
+                data={
+                    'files': {path: content for path, (content, _) in results.items()},
+                    'missing': [path for path, (content, _) in results.items() if content is None],
+                    'hits': hits
+                },
+                cache_hit=hits == len(results)
+            )
+            
+        except Exception as e:
+            return MCPResponse(success=False, error=str(e))
+    
     async def _handle_cache_stats(self, params: Dict[str, Any]) -> MCPResponse:
         """Get comprehensive cache and server statistics"""
         try:
             # Database stats
-            cursor = await self.cache_pool._db_pool.execute(
-                'SELECT COUNT(*) as total, SUM(size) as total_size FROM async_cache'
+            # Read-only pool connection: stats never wait behind warm batches
+            db_stats = await self.cache_pool._db_pool.fetchone(
+                'SELECT COUNT(*) as total, SUM(size) as total_size FROM cache_entries'
             )
-            db_stats = await cursor.fetchone()
             
             server_stats = {
                 'server': {
@@ -192,6 +247,10 @@ class OptimizedMCPServer:
                 'cache': {
                     'total_files': db_stats[0] if db_stats else 0,
                     'total_size_mb': (db_stats[1] / 1024 / 1024) if db_stats and db_stats[1] else 0,
+                    'hits': self.engine.cache.stats['hits'],
+                    'misses': self.engine.cache.stats['misses'],
+                    'engine': self.engine.snapshot(),
+                    'db_pool': self.cache_pool._db_pool.snapshot(),
                     'performance_tier': 'optimized_async'
                 }
             }
@@ -212,16 +271,8 @@ class OptimizedMCPServer:
             if not confirm:
                 return MCPResponse(success=False, error="Cache clear requires confirmation")
             
-            # Clear database
-            await self.cache_pool._db_pool.execute('DELETE FROM async_cache')
-            await self.cache_pool._db_pool.commit()
-            
-            # Clear cache files
-            cache_files_dir = self.cache_pool.cache_dir / "files"
-            if cache_files_dir.exists():
-                import shutil
-                shutil.rmtree(cache_files_dir)
-                cache_files_dir.mkdir(exist_ok=True)
+            # Removes index rows, their blobs and the memory tier
+            await self.engine.clear_cache(params.get('older_than'))
             
             return MCPResponse(
                 success=True,
@@ -243,7 +294,8 @@ class OptimizedMCPServer:
                     'uptime': time.time()  # Simplified uptime
                 },
                 'cache': {
-                    'database_accessible': True,
+                    'database_accessible': await self._probe_database(),
+                    'db_pool': self.cache_pool._db_pool.snapshot(),
                     'cache_directory_exists': self.cache_pool.cache_dir.exists(),
                     'performance_tier': 'phase3_optimized'
                 },
@@ -271,6 +323,12 @@ class OptimizedMCPServer:
             }
             return MCPResponse(success=False, data=health_data, error=str(e))
     
+    async def _probe_database(self) -> bool:
+        try:
+            return await self.cache_pool._db_pool.fetchone('SELECT 1') is not None
+        except Exception:
+            return False
+    
     def _classify_performance(self, speedup: float) -> str:
         """Classify performance tier based on speedup"""
         if speedup >= 30: